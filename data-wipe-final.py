@@ -106,6 +106,39 @@ class DriveDetector:
             return os.path.splitdrive(path)[0].upper() == os.path.splitdrive(os.environ['SYSTEMDRIVE'])[0].upper()
         return os.path.realpath(path) == '/'
 
+# ----- Certificate Outbox -----
+class CertificateOutbox:
+    """Certificate data persisted as soon as a wipe completes, until the certificate is saved"""
+    def __init__(self, outbox_dir=None):
+        self.outbox_dir = outbox_dir or os.path.join(os.path.expanduser("~"), ".cleanslate", "outbox")
+        os.makedirs(self.outbox_dir, exist_ok=True)
+
+    def put(self, cert_data):
+        # Write-then-rename so a crash leaves either the whole record or nothing
+        path = os.path.join(self.outbox_dir, f"{cert_data['certificate_id']}.json")
+        with open(path + ".tmp", 'w') as f:
+            json.dump(cert_data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def pending(self):
+        records = []
+        for name in sorted(os.listdir(self.outbox_dir)):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.outbox_dir, name)) as f:
+                        records.append(json.load(f))
+                except (OSError, ValueError):
+                    pass
+        return records
+
+    def ack(self, certificate_id):
+        try:
+            os.remove(os.path.join(self.outbox_dir, f"{certificate_id}.json"))
+        except FileNotFoundError:
+            pass
+
 # ----- Secure Wipe Engine -----
 class SecureWipeEngine:
     def __init__(self, callback=None):
@@ -113,6 +146,7 @@ class SecureWipeEngine:
         self.callback = callback
         self.temp_storage = tempfile.mkdtemp(prefix="cleanslate_temp_")
         self.undo_stack = []
+        self.outbox = CertificateOutbox()
 
     def _update_ui(self, message, progress=0):
         if self.callback:
@@ -160,23 +194,29 @@ class SecureWipeEngine:
 
             self._update_ui("NIST SP 800-88 Clear operation successful. Generating certificate...", 100)
 
-            completion_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cert_data = {
-                "certificate_id": str(uuid.uuid4()),
-                "status": "Success",
-                "wipe_method": "NIST SP 800-88 Clear (3-Pass)",
-                "start_time": start_time,
-                "completion_time": completion_time,
-                "device_details": device_details
-            }
-            cert_string = json.dumps(cert_data, sort_keys=True)
-            cert_data["verification_hash"] = hashlib.sha256(cert_string.encode()).hexdigest()
-            return cert_data
+            return self._issue_certificate_data("NIST SP 800-88 Clear (3-Pass)", start_time,
+                                                device_details=device_details)
 
         except Exception as e:
             self._update_ui(f"ERROR: Drive wipe failed - {e}", 0)
             return None
 
+    def _issue_certificate_data(self, wipe_method, start_time, **details):
+        completion_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cert_data = {
+            "certificate_id": str(uuid.uuid4()),
+            "status": "Success",
+            "wipe_method": wipe_method,
+            "start_time": start_time,
+            "completion_time": completion_time,
+            **details
+        }
+        cert_string = json.dumps(cert_data, sort_keys=True)
+        cert_data["verification_hash"] = hashlib.sha256(cert_string.encode()).hexdigest()
+        # Persist before anything else so a crash cannot lose the certificate
+        self.outbox.put(cert_data)
+        return cert_data
+
     def wipe_target(self, target_paths, start_time):
         self._update_ui("Starting wipe (moving files to temporary storage)...")
         self.undo_stack = []
@@ -268,18 +308,8 @@ class SecureWipeEngine:
             self.temp_storage = tempfile.mkdtemp(prefix="cleanslate_temp_")
             self._update_ui("Permanent delete successful.", 100)
 
-            completion_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cert_data = {
-                "certificate_id": str(uuid.uuid4()),
-                "status": "Success",
-                "wipe_method": "Secure File Deletion (with Undo)",
-                "start_time": self.start_time,
-                "completion_time": completion_time,
-                "wiped_targets": self.original_targets
-            }
-            cert_string = json.dumps(cert_data, sort_keys=True)
-            cert_data["verification_hash"] = hashlib.sha256(cert_string.encode()).hexdigest()
-            return cert_data
+            return self._issue_certificate_data("Secure File Deletion (with Undo)", self.start_time,
+                                                wiped_targets=self.original_targets)
         except Exception as e:
             self._update_ui(f"ERROR: Failed to permanently delete temp files - {e}")
             return None
@@ -304,6 +334,11 @@ class CleanSlateApp:
         self.create_widgets()
         self.full_reset()
 
+        # Certificates from wipes that finished before a crash or early exit
+        for cert_data in self.wipe_engine.outbox.pending():
+            self.log(f"Unsaved certificate {cert_data['certificate_id']} from a previous session", "WARNING")
+            self.root.after(0, self.prompt_save_certificate, cert_data)
+
     def setup_styles(self):
         style = ttk.Style()
         style.theme_use('clam')
@@ -505,11 +540,12 @@ By using CleanSlate, you are not just protecting your data; you are making a tan
         if save_path:
             try:
                 self.certificate_generator.generate(cert_data, save_path)
+                self.wipe_engine.outbox.ack(cert_data['certificate_id'])
                 self.log(f"Successfully saved PDF and JSON certificates to: {save_path}"); messagebox.showinfo("Certificate Saved", f"Wipe certificate saved to:\n{save_path}")
             except Exception as e:
                 self.log(f"Error saving certificate: {e}", "ERROR"); messagebox.showerror("Save Error", f"Could not save the certificate.\nError: {e}")
         else:
-            self.log("Certificate saving canceled by user.", "WARNING")
+            self.log("Certificate saving canceled by user. It will be offered again on next start.", "WARNING")
 
     def wipe_and_schedule_delete(self):
         start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
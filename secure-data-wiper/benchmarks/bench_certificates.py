@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+PDF certificate rendering benchmark
+
+Renders the same batch of certificates twice in one process: once with the
+layout resources (style sheet, table style, static flowables) rebuilt for
+every certificate, as before they were cached, and once reusing the
+per-process cache. Reports certificates per second for both and appends the
+results to a JSON-lines history file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY = os.path.join(APP_DIR, "benchmarks", "results", "certificate_render.jsonl")
+sys.path.insert(0, APP_DIR)
+
+from utils import certificate_generator
+from utils.certificate_generator import CertificateGenerator
+
+def sample_wipe_data(index):
+    return {
+        "wipe_method": "DoD 5220.22-M (3-pass)",
+        "target_type": "Device",
+        "target_path": f"/dev/sd{chr(ord('a') + index % 26)}",
+        "start_time": "2025-01-01T00:00:00",
+        "end_time": "2025-01-01T01:00:00",
+        "bytes_wiped": 1024 ** 3 * (index + 1),
+        "passes_completed": 3,
+        "verification_status": "Verified",
+        "duration": 3600
+    }
+
+def render_rate(generator, certificates, cached):
+    """Certificates per second for rendering `certificates` to PDF"""
+    certificate_generator._pdf_resources.cache_clear()
+    start = time.perf_counter()
+    for cert_data in certificates:
+        if not cached:
+            certificate_generator._pdf_resources.cache_clear()
+        generator._save_pdf_certificate(cert_data, cert_data["certificate_id"])
+    return len(certificates) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200, help="Certificates rendered per run")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines file to append results to")
+    parser.add_argument("--no-record", action="store_true", help="Do not append to the history file")
+    args = parser.parse_args()
+
+    if not certificate_generator.HAS_REPORTLAB:
+        print("ReportLab is not installed; nothing to benchmark")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp)
+        certificates = [generator._build_certificate(sample_wipe_data(i))[0] for i in range(args.count)]
+        # Warm up imports and font metrics so neither run pays for them
+        render_rate(generator, certificates[:5], cached=True)
+        uncached = render_rate(generator, certificates, cached=False)
+        cached = render_rate(generator, certificates, cached=True)
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "count": args.count,
+        "uncached_per_second": uncached,
+        "cached_per_second": cached,
+        "speedup": cached / uncached
+    }
+    print(f"Rebuilt per certificate: {uncached:8.1f} certificates/s")
+    print(f"Cached per process:      {cached:8.1f} certificates/s  ({cached / uncached:.2f}x)")
+
+    if not args.no_record:
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"Results appended to {args.history}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Startup import-time benchmark
+
+Runs `python -X importtime` for the application's entry modules in fresh
+interpreters, reports the median cumulative import time, checks that heavy
+optional dependencies stay off the startup path, and appends the results to
+a JSON-lines history file so regressions can be tracked over time.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY = os.path.join(APP_DIR, "benchmarks", "results", "startup_importtime.jsonl")
+
+# Entry modules and the packages they must not import at startup
+TARGETS = {
+    "utils.certificate_generator": ["reportlab", "numpy"],
+    "utils.wipe_engine": ["reportlab", "numpy"],
+    "main": ["reportlab", "numpy"],
+}
+
+def measure(module, runs):
+    """Median cumulative import time (microseconds) and the set of modules imported"""
+    totals = []
+    imported = set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=APP_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+        
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            name = name.strip()
+            imported.add(name)
+            if name == module:
+                totals.append(int(cumulative.strip()))
+    return statistics.median(totals), imported
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines file to append results to")
+    parser.add_argument("--no-record", action="store_true", help="Do not append to the history file")
+    args = parser.parse_args()
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "modules": {}
+    }
+    failed = False
+    for module, forbidden in TARGETS.items():
+        try:
+            median_us, imported = measure(module, args.runs)
+        except RuntimeError as e:
+            print(f"{module}: skipped ({str(e).splitlines()[-1]})")
+            continue
+        
+        leaked = sorted(p for p in forbidden if any(m == p or m.startswith(p + ".") for m in imported))
+        record["modules"][module] = {"median_ms": median_us / 1000, "modules_imported": len(imported),
+                                     "eager_imports": leaked}
+        status = f"eagerly imports {', '.join(leaked)}" if leaked else "ok"
+        print(f"{module:32} {median_us / 1000:8.1f} ms  {len(imported):4} modules  {status}")
+        failed = failed or bool(leaked)
+
+    if not args.no_record:
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"Results appended to {args.history}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
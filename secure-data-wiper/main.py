@@ -3,6 +3,7 @@ CleanSlate - Professional Data Sanitization Tool
 NIST SP 800-88 Compliant
 """
 
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 import threading
@@ -100,8 +101,24 @@ except Exception as e:
         def stop_wipe(self):
             self.stop_flag = True
 
+try:
+    from utils.logger import SecureWipeLogger
+except:
+    SecureWipeLogger = None
+
+try:
+    from utils.metrics import MetricsServer, WipeMetrics
+except:
+    MetricsServer = WipeMetrics = None
+
+try:
+    from utils.profiling import JobProfiler
+except:
+    JobProfiler = None
+
 try:
     from utils.certificate_generator import CertificateGenerator
+    from utils.certificate_queue import CertificateQueue
 except:
     class CertificateGenerator:
         def generate_certificate(self, data):
@@ -110,10 +127,23 @@ except:
                 'json_path': 'certificates/cert.json',
                 'pdf_path': None
             }
+    
+    class CertificateQueue:
+        def __init__(self, generator, on_complete=None):
+            self.generator = generator
+            self.on_complete = on_complete
+            self.recovered = 0
+        def submit(self, wipe_data):
+            result = self.generator.generate_certificate(wipe_data)
+            if self.on_complete:
+                self.on_complete(result)
+            return result['certificate_id']
 
 
 class CleanSlateApp:
-    def __init__(self, root):
+    def __init__(self, root, metrics_address=None, profile=False, profile_memory=False,
+                 log_level="INFO", console_level="INFO", metrics_allow_remote=False, merkle_hashing=False,
+                 stream_hash=None):
         self.root = root
         self.root.title("CleanSlate - Professional Data Sanitization")
         self.root.geometry("900x700")
@@ -123,16 +153,45 @@ class CleanSlateApp:
         self.selected_files = []
         self.selected_folder = None
         self.stop_requested = False
+        self.verification_reports = []
+        self.latency_reports = []
+        self.merkle_reports = []
+        self.write_hashes = []
         
         # Initialize components
         self.drive_detector = SimpleDriveDetector()
         self.wipe_engine = SecureWipeEngine()
+        self.log_levels = {"file_level": log_level, "console_level": console_level}
+        for attribute, level in self.log_levels.items():
+            setattr(self.wipe_engine, attribute, level)
+        self.engine_options = {"merkle_hashing": merkle_hashing, "stream_hash": stream_hash}
+        for attribute, value in self.engine_options.items():
+            setattr(self.wipe_engine, attribute, value)
+        if SecureWipeLogger is not None:
+            # Engine messages reach logs/ and the console through a background writer
+            self.wipe_engine.logger = SecureWipeLogger(console=True)
+        self.profiler = None
+        if (profile or profile_memory) and JobProfiler is not None:
+            # Reports go next to the job logs
+            log_dir = getattr(self.wipe_engine.logger, "log_dir", "logs")
+            self.profiler = JobProfiler(log_dir, trace_memory=profile_memory)
+            self.wipe_engine.profiler = self.profiler
         self.cert_generator = CertificateGenerator()
         
         # Setup UI
         self.setup_styles()
         self.create_widgets()
         
+        # Certificates are rendered in the background from a persistent outbox
+        self.cert_queue = CertificateQueue(self.cert_generator, on_complete=self.certificate_ready)
+        self.metrics = None
+        self.metrics_server = None
+        if metrics_address and WipeMetrics is not None:
+            self.start_metrics(metrics_address, metrics_allow_remote)
+        
+        if self.cert_queue.recovered:
+            self.log(f"Generating {self.cert_queue.recovered} certificate(s) left over from a previous session", "WARNING")
+        
         # Load drives
         self.refresh_drives()
     
@@ -268,6 +327,10 @@ class CleanSlateApp:
         ttk.Checkbutton(check_frame, text="Generate certificate", 
                        variable=self.generate_cert).grid(row=0, column=2, padx=10)
         
+        self.record_latency = tk.BooleanVar(value=False)
+        ttk.Checkbutton(check_frame, text="Record I/O latency", 
+                       variable=self.record_latency).grid(row=0, column=3, padx=10)
+        
         # Action buttons
         action_frame = ttk.Frame(main_frame)
         action_frame.grid(row=row, column=0, pady=10)
@@ -415,6 +478,12 @@ class CleanSlateApp:
                 pattern = WipePattern.TRIPLE_RANDOM
             
             success = False
+            self.verification_reports = []
+            self.latency_reports = []
+            self.merkle_reports = []
+            self.write_hashes = []
+            # Folder and drive wipes run on the instance engine
+            self.wipe_engine.latency_histograms = self.record_latency.get()
             
             # Wipe files
             if self.selected_files:
@@ -438,11 +507,18 @@ class CleanSlateApp:
                     try:
                         # Import the actual wipe engine
                         from utils.wipe_engine import SecureWipeEngine as RealWipeEngine
-                        real_engine = RealWipeEngine()
+                        # Share the app's logger so file wipes reach logs/ and the event stream
+                        real_engine = RealWipeEngine(logger=self.wipe_engine.logger,
+                                                     latency_histograms=self.record_latency.get(),
+                                                     **self.log_levels, **self.engine_options)
+                        real_engine.metrics = self.metrics
+                        real_engine.profiler = self.profiler
                         wipe_result = real_engine.wipe_file(file_path, pattern, self.verify_wipe.get())
+                        self.collect_reports(real_engine)
                     except:
                         # Fallback to instance engine
                         wipe_result = self.wipe_engine.wipe_file(file_path, pattern, self.verify_wipe.get())
+                        self.collect_reports(self.wipe_engine)
                     
                     if wipe_result:
                         self.log(f"✓ Successfully wiped: {os.path.basename(file_path)}", "SUCCESS")
@@ -461,6 +537,7 @@ class CleanSlateApp:
                 self.log(f"Wiping folder: {self.selected_folder}")
                 files_wiped, files_failed = self.wipe_engine.wipe_directory(
                     self.selected_folder, pattern, recursive=True)
+                self.collect_reports(self.wipe_engine)
                 
                 if files_wiped > 0:
                     success = True
@@ -500,7 +577,9 @@ class CleanSlateApp:
                             self.update_progress(50, "Wiping test file...")
                             
                             # Wipe the test file
-                            if self.wipe_engine.wipe_file(test_file, pattern, self.verify_wipe.get()):
+                            wipe_result = self.wipe_engine.wipe_file(test_file, pattern, self.verify_wipe.get())
+                            self.collect_reports(self.wipe_engine)
+                            if wipe_result:
                                 success = True
                                 self.log(f"✓ Successfully wiped test file on {drive_path}", "SUCCESS")
                                 self.log("Note: Full drive wipe requires selecting all files/folders", "INFO")
@@ -533,6 +612,37 @@ class CleanSlateApp:
             self.wipe_btn.config(state='normal')
             self.stop_btn.config(state='disabled')
     
+    def start_metrics(self, address, allow_remote=False):
+        """Serve Prometheus metrics for this station's wipes on `address`"""
+        try:
+            self.metrics = WipeMetrics()
+            logger = self.wipe_engine.logger
+            if logger is not None:
+                self.metrics.add_gauge("log_queue_depth", "Log entries waiting to be written",
+                                       lambda: logger.stats()["queued"])
+                self.metrics.add_gauge("log_dropped_entries", "Log entries dropped because the queue was full",
+                                       lambda: logger.dropped)
+            if hasattr(self.cert_queue, "depth"):
+                self.metrics.add_gauge("certificate_queue_depth", "Certificates waiting to be generated",
+                                       self.cert_queue.depth)
+            self.wipe_engine.metrics = self.metrics
+            self.metrics_server = MetricsServer(self.metrics, address, allow_remote).start()
+            self.log(f"Serving metrics on {address}")
+        except (OSError, ValueError) as e:
+            self.metrics = None
+            self.wipe_engine.metrics = None
+            self.log(f"Metrics endpoint unavailable on {address}: {e}", "WARNING")
+    
+    def collect_reports(self, engine):
+        """Keep the per-target results of a finished wipe for its certificate"""
+        stats = getattr(engine, "wipe_stats", {})
+        for key, reports in (("verification", self.verification_reports),
+                             ("latency", self.latency_reports),
+                             ("merkle", self.merkle_reports),
+                             ("write_hash", self.write_hashes)):
+            if stats.get(key):
+                reports.append(stats[key])
+    
     def stop_wipe(self):
         """Stop wipe operation"""
         self.stop_requested = True
@@ -542,6 +652,13 @@ class CleanSlateApp:
     def generate_certificate(self):
         """Generate wipe certificate"""
         try:
+            # A read-back that found mismatches must not yield a "Verified" certificate
+            if not self.verify_wipe.get():
+                verification_status = "Not Verified"
+            elif all(report["verified"] for report in self.verification_reports):
+                verification_status = "Verified"
+            else:
+                verification_status = "Verification Failed"
             wipe_data = {
                 "wipe_method": self.wipe_method.get(),
                 "target_type": "Files/Folder",
@@ -550,19 +667,38 @@ class CleanSlateApp:
                 "end_time": datetime.now().isoformat(),
                 "bytes_wiped": 0,
                 "passes_completed": 1,
-                "verification_status": "Verified" if self.verify_wipe.get() else "Not Verified",
+                "verification_status": verification_status,
                 "duration": 0
             }
+            # Read-back reports are per target, so only a single-file wipe carries one
+            if len(self.verification_reports) == 1:
+                wipe_data["verification_report"] = self.verification_reports[0]
+            if len(self.latency_reports) == 1:
+                wipe_data["latency"] = self.latency_reports[0]
+            if len(self.merkle_reports) == 1:
+                wipe_data["merkle"] = self.merkle_reports[0]
+            if len(self.write_hashes) == 1:
+                wipe_data["write_hash"] = self.write_hashes[0]
             
-            result = self.cert_generator.generate_certificate(wipe_data)
-            if result:
-                self.log(f"Certificate generated: {result['certificate_id']}", "SUCCESS")
-                messagebox.showinfo("Certificate Generated", 
-                                  f"Certificate ID: {result['certificate_id']}\n"
-                                  f"Saved to certificates folder")
+            certificate_id = self.cert_queue.submit(wipe_data)
+            self.log(f"Certificate {certificate_id} queued for generation")
         except Exception as e:
             self.log(f"Certificate generation failed: {str(e)}", "ERROR")
     
+    def certificate_ready(self, result):
+        """Called from the certificate queue thread when a certificate is written"""
+        self.root.after(0, self._show_certificate_result, result)
+    
+    def _show_certificate_result(self, result):
+        if result.get('error'):
+            self.log(f"Certificate generation failed for {result['certificate_id']}: {result['error']} "
+                     f"(will retry on next start)", "ERROR")
+            return
+        self.log(f"Certificate generated: {result['certificate_id']}", "SUCCESS")
+        messagebox.showinfo("Certificate Generated", 
+                          f"Certificate ID: {result['certificate_id']}\n"
+                          f"Saved to certificates folder")
+    
     def view_certificates(self):
         """Open certificates folder"""
         cert_dir = os.path.join(os.path.dirname(__file__), "certificates")
@@ -599,8 +735,30 @@ class CleanSlateApp:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="CleanSlate data sanitization tool")
+    parser.add_argument("--metrics", metavar="ADDRESS",
+                        help="Serve Prometheus metrics on host:port, a port on 127.0.0.1, or a Unix socket path")
+    parser.add_argument("--metrics-allow-remote", action="store_true",
+                        help="Allow --metrics to listen on a non-loopback address such as 0.0.0.0")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile each wipe job with cProfile and write a report next to its log")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Also track allocations per pass with tracemalloc (implies --profile)")
+    parser.add_argument("--merkle", action="store_true",
+                        help="Hash the final pass into a Merkle tree and embed its root in certificates")
+    parser.add_argument("--stream-hash", choices=("sha256", "blake2b"),
+                        help="Digest everything the final pass writes and embed it in certificates")
+    parser.add_argument("--log-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                        help="Lowest engine message level written to the log file (default: INFO)")
+    parser.add_argument("--console-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                        help="Lowest engine message level printed to the console (default: INFO)")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = CleanSlateApp(root)
+    app = CleanSlateApp(root, metrics_address=args.metrics, profile=args.profile,
+                        profile_memory=args.profile_memory, log_level=args.log_level,
+                        console_level=args.console_level, metrics_allow_remote=args.metrics_allow_remote,
+                        merkle_hashing=args.merkle, stream_hash=args.stream_hash)
     root.mainloop()
 
 
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Tests for the streaming byte statistics used by wipe verification
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+
+from utils.byte_statistics import ByteStatistics, RegionStatistics
+import utils.byte_statistics as byte_statistics
+from utils.wipe_engine import SecureWipeEngine
+
+def test_streaming_matches_single_buffer():
+    np = pytest.importorskip("numpy")
+    data = os.urandom(100000) + b"\x00" * 5000 + b"SENSITIVE DATA " * 300
+    
+    whole = ByteStatistics()
+    whole.update(data)
+    streamed = ByteStatistics()
+    for start in range(0, len(data), 777):
+        streamed.update(memoryview(data)[start:start + 777])
+    
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    assert whole.ones == streamed.ones == int(bits.sum())
+    assert whole.transitions == streamed.transitions == int(np.count_nonzero(bits[1:] != bits[:-1]))
+    assert whole.results() == streamed.results()
+
+def test_classification():
+    random_stats = ByteStatistics()
+    random_stats.update(os.urandom(1024 * 1024))
+    assert random_stats.classify() == "random"
+    assert random_stats.shannon_entropy() > 7.99
+    
+    zero_stats = ByteStatistics()
+    zero_stats.update(b"\x00" * 4096)
+    assert zero_stats.classify() == "uniform"
+    assert zero_stats.shannon_entropy() == 0.0
+    
+    text_stats = ByteStatistics()
+    text_stats.update(b"Customer record: account 12345, balance 678.90\n" * 2000)
+    assert text_stats.classify() == "structured"
+
+def test_pure_python_fallback():
+    data = b"\x00" * 3000 + bytes(range(256)) * 20 + os.urandom(1024 * 1024)
+    saved = byte_statistics.HAS_NUMPY
+    byte_statistics.HAS_NUMPY = False
+    try:
+        stats = ByteStatistics()
+        stats.update(data[:1000])
+        rest = ByteStatistics()
+        rest.update(memoryview(data)[1000:])
+        stats.merge(rest)
+        # Only the histogram is kept: bit counts and the runs test need NumPy
+        assert isinstance(stats.histogram, list) and sum(stats.histogram) == len(data)
+        assert stats.histogram[0] >= 3020 and stats.histogram[255] >= 20
+        assert stats.runs_p_value() is None
+        results = stats.results()
+        assert results["bytes"] == len(data) and results["distinct_values"] == 256
+        assert results["runs_p"] is None
+        assert stats.classify() == "structured"
+        entropy, chi_square = stats.shannon_entropy(), stats.chi_square()
+        
+        random_stats = ByteStatistics()
+        random_stats.update(os.urandom(1024 * 1024))
+        assert random_stats.classify() == "random"
+        uniform = ByteStatistics()
+        uniform.update(b"\xaa" * 5000)
+        assert uniform.classify() == "uniform" and uniform.shannon_entropy() == 0.0
+    finally:
+        byte_statistics.HAS_NUMPY = saved
+    
+    if saved:
+        vectorised = ByteStatistics()
+        vectorised.update(data)
+        assert list(vectorised.histogram) == stats.histogram
+        assert vectorised.shannon_entropy() == pytest.approx(entropy)
+        assert vectorised.chi_square() == pytest.approx(chi_square)
+
+def test_regions_and_merge():
+    regions = RegionStatistics(region_size=4096)
+    regions.update(1000, os.urandom(5000) + b"\x00" * 10000)
+    results = regions.results()
+    assert [r["offset"] for r in results["regions"]] == [0, 4096, 8192, 12288]
+    assert sum(r["bytes"] for r in results["regions"]) == 15000
+    assert results["regions"][-1]["classification"] == "uniform"
+    assert results["overall"]["bytes"] == 15000
+
+def test_engine_statistical_fallback():
+    engine = SecureWipeEngine()
+    with tempfile.TemporaryDirectory() as tmp:
+        wiped = os.path.join(tmp, "wiped.bin")
+        with open(wiped, "wb") as f:
+            f.write(os.urandom(256 * 1024))
+        assert engine.verify_wipe(wiped)
+        assert engine.wipe_stats["verification"]["mode"] == "statistical"
+        
+        leftover = os.path.join(tmp, "leftover.bin")
+        with open(leftover, "wb") as f:
+            f.write(b"\x00" * 100000 + b"SENSITIVE DATA " * 100)
+        assert not engine.verify_wipe(leftover)
+
+if __name__ == "__main__":
+    test_streaming_matches_single_buffer()
+    test_classification()
+    test_pure_python_fallback()
+    test_regions_and_merge()
+    test_engine_statistical_fallback()
+    print("All byte statistics tests passed")
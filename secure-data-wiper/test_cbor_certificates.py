@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Tests for deterministic CBOR encoding and CBOR-primary certificates
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils import cbor
+from utils.certificate_generator import CertificateGenerator
+from utils.signing import signing_payload
+
+def test_rfc8949_deterministic_vectors():
+    vectors = [
+        (0, "00"), (24, "1818"), (1000, "1903e8"), (2 ** 32, "1b0000000100000000"),
+        (-1000, "3903e7"), (1.5, "f93e00"), (100000.0, "fa47c35000"), (1.1, "fb3ff199999999999a"),
+        (None, "f6"), (True, "f5"), (b"\x01\x02", "420102"), ("IETF", "6449455446"),
+        ([1, [2, 3]], "8201820203"),
+        # Map keys sort by encoded length, then bytes: "a" < "c" < "bb"
+        ({"bb": 1, "c": 3, "a": 2}, "a3616102616303626262" + "01"),
+    ]
+    for value, encoded in vectors:
+        assert cbor.dumps(value).hex() == encoded, value
+        assert cbor.loads(bytes.fromhex(encoded)) == value
+
+def test_malformed_input_is_rejected():
+    for data in (b"", b"\x62a", b"\x00\x00", b"\x9f"):
+        try:
+            cbor.loads(data)
+        except cbor.CBORDecodeError:
+            continue
+        assert False, f"{data!r} accepted"
+
+def test_cbor_only_certificates_render_on_demand():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp, output_formats=())
+        result = generator.generate_certificate({
+            "wipe_method": "Random (1-pass)",
+            "target_path": "/dev/sdc",
+            "bytes_wiped": 500 * 1024 ** 3,
+            "duration": 1234.5,
+            "verification_status": "Verified"
+        })
+        assert result["json_path"] is None and result["pdf_path"] is None
+        assert generator.verify_certificate(result["certificate_id"])["valid"]
+
+        json_path = generator.export_certificate(result["certificate_id"], "json")
+        pdf_path = generator.export_certificate(result["certificate_id"], "pdf")
+        entry = generator.find_certificate(result["certificate_id"])
+        assert entry["json_path"] == str(json_path) and entry["pdf_path"] == str(pdf_path)
+        assert os.path.getsize(result["cbor_path"]) < os.path.getsize(json_path)
+
+        # The JSON rendering re-encodes to exactly the signed CBOR payload
+        assert generator.verify_certificate(str(json_path))["valid"]
+        with open(json_path) as f:
+            cert_data = json.load(f)
+        cert_data["wipe_details"]["duration"] = 1234.0
+        with open(json_path, "w") as f:
+            json.dump(cert_data, f)
+        assert not generator.verify_certificate(str(json_path))["valid"]
+
+def test_payload_is_encoded_once_and_reused():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp)
+        cert_data, payload = generator._build_certificate({"wipe_method": "Zeros (1-pass)",
+                                                           "verification_report": {"mode": "full"}})
+        # The spliced verification block encodes exactly like a fresh encoding
+        assert payload == signing_payload(cert_data, "cbor")
+        verification = dict(cert_data["verification"])
+        verification_hash = verification.pop("hash")
+        assert verification_hash == hashlib.sha256(cbor.dumps(verification)).hexdigest()
+        try:
+            cbor.prepend_entry(cbor.dumps({"a": 1}), "hash", verification_hash)
+            assert False, "out-of-order key accepted"
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_rfc8949_deterministic_vectors()
+    test_malformed_input_is_rejected()
+    test_cbor_only_certificates_render_on_demand()
+    test_payload_is_encoded_once_and_reused()
+    print("All CBOR certificate tests passed")
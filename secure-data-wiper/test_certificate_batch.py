@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Tests for batch certificate generation
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.certificate_generator import CertificateGenerator
+
+def _wipe_record(index):
+    return {
+        "wipe_method": "DoD 5220.22-M (3-pass)",
+        "target_type": "Device",
+        "target_path": f"/dev/sd{chr(ord('a') + index)}",
+        "start_time": "2025-01-01T00:00:00",
+        "end_time": "2025-01-01T01:00:00",
+        "bytes_wiped": 1024 ** 3 * (index + 1),
+        "passes_completed": 3,
+        "verification_status": "Verified",
+        "duration": 3600
+    }
+
+def test_generate_batch():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(os.path.join(tmp, "certificates"))
+        results = list(generator.generate_batch([_wipe_record(i) for i in range(6)], workers=2))
+        
+        assert len(results) == 6
+        assert len({r["certificate_id"] for r in results}) == 6
+        for result in results:
+            assert "error" not in result
+            assert os.path.exists(result["json_path"])
+            assert os.path.exists(result["pdf_path"])
+            assert generator.verify_certificate(result["json_path"])["valid"]
+
+def test_failed_batch_logs_the_certificates_it_wrote():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(os.path.join(tmp, "certificates"), output_formats=("json",))
+        save_json = generator._save_json_certificate
+        saved = []
+        
+        def failing_save(cert_data, cert_id):
+            if len(saved) == 2:
+                raise OSError(28, "No space left on device")
+            saved.append(cert_id)
+            return save_json(cert_data, cert_id)
+        
+        generator._save_json_certificate = failing_save
+        try:
+            list(generator.generate_batch([_wipe_record(i) for i in range(5)]))
+            assert False, "save failure swallowed"
+        except OSError:
+            pass
+        
+        # Three CBOR files were written: each is in the ledger and the index
+        assert len(list(generator.cert_dir.glob("cert_*.cbor"))) == 3
+        assert generator.ledger.size == 3 and generator.index.count() == 3
+        audit = generator.audit_ledger()
+        assert audit["certificates"] == 3 and not audit["missing"] and not audit["altered"]
+
+if __name__ == "__main__":
+    test_generate_batch()
+    test_failed_batch_logs_the_certificates_it_wrote()
+    print("Batch certificate test passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Tests for the append-only certificate ledger and its proofs
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from utils.certificate_generator import CertificateGenerator
+from utils.ledger import (CertificateLedger, leaf_hash, verify_consistency, verify_inclusion,
+                          verify_membership, verify_tree_head)
+
+def _digest(i):
+    return hashlib.sha256(str(i).encode()).hexdigest()
+
+def test_inclusion_and_consistency_proofs():
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = CertificateLedger(tmp)
+        roots = [ledger.root()]
+        for i in range(33):
+            ledger.append(f"CS-TEST-{i:04d}", _digest(i), sync=False)
+            roots.append(ledger.root())
+
+        for size in (1, 2, 7, 8, 13, 33):
+            for index in range(size):
+                proof = ledger.inclusion_proof(index, size)
+                assert len(proof) <= size.bit_length()
+                leaf = leaf_hash(ledger.entry(index))
+                assert verify_inclusion(leaf, index, size, proof, roots[size])
+                assert not verify_inclusion(leaf, index, size, proof, roots[size - 1])
+
+        for first in range(0, 34):
+            for second in (first, 16, 21, 33):
+                if second < first:
+                    continue
+                proof = ledger.consistency_proof(first, second)
+                assert verify_consistency(first, second, roots[first], roots[second], proof), (first, second)
+                if 0 < first < second:
+                    assert not verify_consistency(first, second, roots[first - 1], roots[second], proof)
+
+        # Each entry chains to the log as it stood before it
+        assert ledger.entry(20)["previous_root"] == roots[20].hex()
+
+def test_reload_drops_torn_tail():
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = CertificateLedger(tmp)
+        ledger.append_many([(f"CS-TEST-{i:04d}", _digest(i)) for i in range(5)])
+        root = ledger.root()
+        # Crash midway through the next append
+        with open(ledger.entries_path, "ab") as f:
+            f.write(b'{"index": 5, "certificate_id": "CS-TE')
+        with open(ledger.leaves_path, "ab") as f:
+            f.write(b"\x00" * 12)
+
+        reopened = CertificateLedger(tmp)
+        assert reopened.size == 5 and reopened.root() == root
+        reopened.append("CS-TEST-0005", _digest(5))
+        assert CertificateLedger(tmp).entry(5)["certificate_id"] == "CS-TEST-0005"
+
+def test_issued_certificates_are_logged_and_audited():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp, output_formats=())
+        ids = [generator.generate_certificate({"wipe_method": "Zeros (1-pass)", "target_path": f"/tmp/f{i}"})
+               ["certificate_id"] for i in range(3)]
+        bundle = generator.prove_certificate(ids[1])
+        trusted = generator._trusted_keys()
+        if trusted:
+            assert verify_tree_head(bundle["tree_head"], trusted)
+        assert verify_membership(bundle, trusted_keys=trusted)
+        assert not verify_membership(bundle, payload_digest="0" * 64)
+
+        assert generator.audit_ledger()["missing"] == []
+        os.remove(generator.find_certificate(ids[2])["cbor_path"])
+        audit = generator.audit_ledger()
+        assert audit["certificates"] == 3 and audit["missing"] == [ids[2]] and audit["altered"] == []
+
+def test_append_throughput():
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = CertificateLedger(tmp)
+        start = time.perf_counter()
+        for batch in range(10):
+            ledger.append_many([(f"CS-TEST-{batch}-{i}", _digest(i)) for i in range(500)])
+        rate = ledger.size / (time.perf_counter() - start)
+        assert rate > 1000, rate
+        assert len(ledger.inclusion_proof(1234)) <= 13
+
+if __name__ == "__main__":
+    test_inclusion_and_consistency_proofs()
+    test_reload_drops_torn_tail()
+    test_issued_certificates_are_logged_and_audited()
+    test_append_throughput()
+    print("All certificate ledger tests passed")
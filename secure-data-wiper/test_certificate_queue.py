@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Tests for background certificate generation through the outbox
+"""
+
+import glob
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.certificate_generator import CertificateGenerator
+from utils.certificate_queue import CertificateOutbox, CertificateQueue
+
+def _wipe_data(index):
+    return {
+        "wipe_method": "DoD 5220.22-M (3-pass)",
+        "target_type": "Device",
+        "target_path": f"/dev/sd{chr(ord('a') + index)}",
+        "bytes_wiped": 1024 ** 3,
+        "passes_completed": 3,
+        "verification_status": "Verified"
+    }
+
+def test_queued_certificates_are_generated_and_acknowledged():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp)
+        completed = []
+        cert_queue = CertificateQueue(generator, on_complete=completed.append)
+        ids = [cert_queue.submit(_wipe_data(i)) for i in range(4)]
+        cert_queue.join()
+        cert_queue.close()
+
+        assert sorted(r["certificate_id"] for r in completed) == sorted(ids)
+        assert all("error" not in r and r["pdf_path"] for r in completed)
+        assert cert_queue.outbox.pending() == []
+        for certificate_id in ids:
+            assert generator.verify_certificate(certificate_id)["valid"]
+
+def test_records_survive_a_crash():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp)
+        outbox = CertificateOutbox(os.path.join(tmp, "outbox"))
+        # Crash before rendering: only the outbox record exists
+        outbox.put("CS-TEST-0001", _wipe_data(0))
+        # Crash after rendering but before the record was acknowledged
+        generator.generate_certificate(_wipe_data(1), certificate_id="CS-TEST-0002")
+        outbox.put("CS-TEST-0002", _wipe_data(1))
+
+        completed = []
+        cert_queue = CertificateQueue(generator, on_complete=completed.append)
+        assert cert_queue.recovered == 2
+        cert_queue.join()
+        cert_queue.close()
+
+        assert sorted(r["certificate_id"] for r in completed) == ["CS-TEST-0001", "CS-TEST-0002"]
+        assert outbox.pending() == []
+        assert len(glob.glob(os.path.join(tmp, "cert_CS-TEST-0002_*.json"))) == 1
+        assert generator.find_certificate("CS-TEST-0001")["pdf_path"]
+
+def test_crash_between_ledger_and_index_is_not_logged_twice():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp)
+        outbox = CertificateOutbox(os.path.join(tmp, "outbox"))
+        outbox.put("CS-TEST-0003", _wipe_data(2))
+        # Signed, saved and logged, then the process died before indexing
+        cert_data, payload = generator._build_certificate(_wipe_data(2), "CS-TEST-0003")
+        cbor_path = generator._save_cbor_certificate(cert_data, "CS-TEST-0003", payload)
+        generator.ledger.append("CS-TEST-0003", generator._payload_digest(cert_data, payload))
+
+        generator = CertificateGenerator(tmp)
+        cert_queue = CertificateQueue(generator)
+        cert_queue.join()
+        cert_queue.close()
+
+        assert generator.ledger.size == 1
+        assert glob.glob(os.path.join(tmp, "cert_CS-TEST-0003_*.cbor")) == [str(cbor_path)]
+        entry = generator.find_certificate("CS-TEST-0003")
+        assert entry["cbor_path"] == str(cbor_path) and entry["pdf_path"]
+        assert entry["verification_hash"] == cert_data["verification"]["hash"]
+        assert generator.audit_ledger()["altered"] == []
+        assert outbox.pending() == []
+
+if __name__ == "__main__":
+    test_queued_certificates_are_generated_and_acknowledged()
+    test_records_survive_a_crash()
+    test_crash_between_ledger_and_index_is_not_logged_twice()
+    print("All certificate queue tests passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Tests for Ed25519 certificate signing and bulk verification
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.certificate_generator import CertificateGenerator
+from utils.signing import legacy_signature
+
+def _wipe_data():
+    return {
+        "wipe_method": "NIST 800-88 Clear",
+        "target_type": "Device",
+        "target_path": "/dev/sdb",
+        "bytes_wiped": 1024 ** 3,
+        "passes_completed": 1,
+        "verification_status": "Verified"
+    }
+
+def _rewrite(path, cert_data):
+    with open(path, "w") as f:
+        json.dump(cert_data, f)
+
+def test_signature_detects_tampering_and_untrusted_keys():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp)
+        result = generator.generate_certificate(_wipe_data())
+        check = generator.verify_certificate(result["json_path"])
+        assert check["valid"] and check["trusted"] and check["algorithm"] == "Ed25519"
+        assert check["key_id"] == generator.signer.key_id
+        assert oct(os.stat(generator.signer.key_path).st_mode & 0o777) == "0o600"
+
+        with open(result["json_path"]) as f:
+            cert_data = json.load(f)
+        cert_data["wipe_details"]["bytes_wiped"] = 1
+        _rewrite(result["json_path"], cert_data)
+        assert not generator.verify_certificate(result["json_path"])["valid"]
+
+        # A certificate correctly signed by some other key is not accepted
+        other = CertificateGenerator(os.path.join(tmp, "other"))
+        forged = other.generate_certificate(_wipe_data())
+        check = generator.verify_certificate(forged["json_path"])
+        assert not check["valid"] and "untrusted" in check["message"]
+
+def test_legacy_digest_downgrade_is_rejected():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp)
+        result = generator.generate_certificate(_wipe_data())
+        with open(result["json_path"]) as f:
+            cert_data = json.load(f)
+        # Anyone can forge a certificate and recompute its legacy digest
+        cert_data["wipe_details"]["verification_status"] = "FORGED"
+        cert_data["digital_signature"] = legacy_signature(cert_data)
+        _rewrite(result["json_path"], cert_data)
+        check = generator.verify_certificate(result["json_path"])
+        assert not check["valid"] and not check["trusted"] and check["algorithm"] == "SHA-512"
+        assert check["integrity_only"]
+
+def test_no_trusted_keys_fails_verification():
+    with tempfile.TemporaryDirectory() as tmp:
+        signed = CertificateGenerator(os.path.join(tmp, "issuer")).generate_certificate(_wipe_data())
+        # No signing key in this directory and none given explicitly
+        verifier = CertificateGenerator(os.path.join(tmp, "empty"))
+        assert not verifier.signer.key_path.exists()
+        check = verifier.verify_certificate(signed["json_path"])
+        assert not check["valid"] and check["message"] == "No trusted signing keys configured"
+
+def test_verify_many_reports_each_certificate():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp)
+        results = [generator.generate_certificate(_wipe_data()) for _ in range(40)]
+        # Tamper with the signed CBOR form, which bulk verification reads
+        with open(results[7]["cbor_path"], "rb") as f:
+            data = f.read()
+        with open(results[7]["cbor_path"], "wb") as f:
+            f.write(data.replace(b"NIST 800-88 Clear", b"NIST 800-88 Purge"))
+
+        report = generator.verify_many(workers=2, chunk_size=8)
+        assert report["total"] == 40 and report["valid"] == 39 and report["invalid"] == 1
+        assert report["certificates_per_second"] > 0
+        invalid = [r for r in report["results"] if not r["valid"]]
+        assert invalid[0]["path"] == results[7]["cbor_path"]
+
+if __name__ == "__main__":
+    test_signature_detects_tampering_and_untrusted_keys()
+    test_legacy_digest_downgrade_is_rejected()
+    test_no_trusted_keys_fails_verification()
+    test_verify_many_reports_each_certificate()
+    print("All certificate signing tests passed")
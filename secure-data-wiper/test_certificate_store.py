@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Tests for the SQLite certificate index
+"""
+
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.certificate_generator import CertificateGenerator
+from utils.certificate_store import CertificateIndex
+
+def _cert(index):
+    return {
+        "certificate_id": f"CS-20250101-{index:08X}",
+        "timestamp": f"2025-01-{index % 28 + 1:02d}T00:00:{index % 60:02d}.{index:06d}",
+        "wipe_details": {
+            "wipe_method": ["DoD 5220.22-M (3-pass)", "Random (1-pass)"][index % 2],
+            "verification_status": "Verified" if index % 10 else "Failed",
+            "target_path": f"/dev/sd{index % 26}",
+            "target_info": {"serial": f"SN{index % 5000:05d}"}
+        },
+        "verification": {"hash": f"{index:064x}"}
+    }
+
+def test_index_lookups_are_fast():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CertificateIndex(os.path.join(tmp, "index.db"))
+        index.add_many([(c["certificate_id"], c["wipe_details"]["target_info"]["serial"], c["timestamp"],
+                         c["wipe_details"]["wipe_method"], c["wipe_details"]["verification_status"],
+                         c["wipe_details"]["target_path"], c["verification"]["hash"], None, None, None)
+                        for c in map(_cert, range(50000))])
+        assert index.count() == 50000
+        
+        start = time.perf_counter()
+        entry = index.get("CS-20250101-00001234")
+        by_serial = index.find(device_serial="SN00042")
+        failed = index.find(status="Failed", method="DoD 5220.22-M (3-pass)", limit=10)
+        elapsed = time.perf_counter() - start
+        
+        assert entry["device_serial"] == "SN04660"
+        assert len(by_serial) == 10 and all(r["device_serial"] == "SN00042" for r in by_serial)
+        assert by_serial == sorted(by_serial, key=lambda r: r["timestamp"], reverse=True)
+        assert len(failed) == 10 and all(r["status"] == "Failed" for r in failed)
+        assert elapsed < 0.5
+        index.close()
+
+def test_generator_indexes_and_verifies_by_id():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(os.path.join(tmp, "certificates"))
+        result = generator.generate_certificate({
+            "wipe_method": "Random (1-pass)",
+            "target_path": "/dev/sdb",
+            "target_info": {"serial": "WD-123"},
+            "verification_status": "Verified"
+        })
+        
+        entry = generator.find_certificate(result["certificate_id"])
+        assert entry["json_path"] == result["json_path"]
+        assert entry["pdf_path"] == result["pdf_path"]
+        assert generator.index.find(device_serial="WD-123")[0]["certificate_id"] == result["certificate_id"]
+        assert generator.verify_certificate(result["certificate_id"])["valid"]
+        
+        # The index can be rebuilt from the files on disk
+        rebuilt = CertificateIndex(os.path.join(tmp, "rebuilt.db"))
+        assert rebuilt.rebuild_from_directory(generator.cert_dir) == 1
+        assert rebuilt.get(result["certificate_id"])["pdf_path"] == result["pdf_path"]
+        rebuilt.close()
+
+if __name__ == "__main__":
+    test_index_lookups_are_fast()
+    test_generator_indexes_and_verifies_by_id()
+    print("All certificate store tests passed")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Tests for the bulk certificate verification command
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.certificate_generator import CertificateGenerator
+from utils.certificate_verifier import main
+
+def _issue(generator, count):
+    return list(generator.generate_batch([{"wipe_method": "Zeros (1-pass)", "target_path": f"/dev/sd{i}"}
+                                          for i in range(count)]))
+
+def test_recursive_directory_verification_with_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_dir = os.path.join(tmp, "certificates")
+        generator = CertificateGenerator(cert_dir, output_formats=("json",))
+        results = _issue(generator, 30)
+        # Archive a few certificates into a nested directory
+        archive = os.path.join(cert_dir, "archive", "2025")
+        os.makedirs(archive)
+        for result in results[:5]:
+            shutil.move(result["cbor_path"], archive)
+        with open(results[20]["cbor_path"], "rb") as f:
+            data = f.read()
+        with open(results[20]["cbor_path"], "wb") as f:
+            f.write(data.replace(b"Zeros (1-pass)", b"Zeros (7-pass)"))
+
+        report_path = os.path.join(tmp, "audit.jsonl")
+        code = main([cert_dir, "--cert-dir", cert_dir, "--workers", "2", "--chunk-size", "4",
+                     "--report", report_path, "--quiet"])
+        assert code == 1
+        with open(report_path) as f:
+            lines = [json.loads(line) for line in f]
+        summary = lines[-1]["summary"]
+        # The archived certificates are found through their JSON copies and the moved CBOR files
+        assert summary["total"] == 35 and summary["invalid"] == 1
+        assert summary["invalid_paths"] == [results[20]["cbor_path"]]
+        assert len(lines) == 36 and all("path" in line for line in lines[:-1])
+
+def test_index_verification_by_date():
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = CertificateGenerator(tmp, output_formats=())
+        _issue(generator, 6)
+        assert main(["--index", "--cert-dir", tmp, "--since", "2000-01-01", "--quiet"]) == 0
+        assert main(["--index", "--cert-dir", tmp, "--trusted-key", "0" * 16, "--quiet"]) == 1
+
+def test_certificates_signed_by_another_key_fail():
+    with tempfile.TemporaryDirectory() as tmp:
+        station = os.path.join(tmp, "station")
+        auditor = os.path.join(tmp, "auditor")
+        _issue(CertificateGenerator(station, output_formats=()), 3)
+        # The auditor's own key is the only trusted one
+        CertificateGenerator(auditor, output_formats=())._generate_signature({"certificate_id": "key"})
+        
+        report_path = os.path.join(tmp, "audit.jsonl")
+        assert main([station, "--cert-dir", auditor, "--workers", "1", "--report", report_path, "--quiet"]) == 1
+        with open(report_path) as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[-1]["summary"]["invalid"] == 3 and lines[-1]["summary"]["trusted"] == 0
+        assert all(line["message"].startswith("Certificate signed by untrusted key") for line in lines[:-1])
+        assert main([station, "--cert-dir", station, "--workers", "1", "--quiet"]) == 0
+
+def test_missing_cert_dir_is_not_created():
+    with tempfile.TemporaryDirectory() as tmp:
+        missing = os.path.join(tmp, "nowhere")
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                main([tmp, "--cert-dir", missing])
+            assert False, "missing certificate directory accepted"
+        except SystemExit as e:
+            assert e.code == 2
+        assert not os.path.exists(missing)
+
+if __name__ == "__main__":
+    test_recursive_directory_verification_with_report()
+    test_index_verification_by_date()
+    test_certificates_signed_by_another_key_fail()
+    test_missing_cert_dir_is_not_created()
+    print("All certificate verifier tests passed")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Tests for the wipe engine's I/O latency histograms
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.certificate_generator import CertificateGenerator
+from utils.latency import LatencyHistogram, _bucket, _bucket_upper
+from utils.wipe_engine import SecureWipeEngine, WipePattern
+
+def test_buckets_bound_their_values():
+    for ns in list(range(5000)) + [10 ** 6 + 17, 3 * 10 ** 9]:
+        index = _bucket(ns)
+        assert ns <= _bucket_upper(index)
+        # Sub-buckets keep the reported bound within 1/16 of the value
+        assert _bucket_upper(index) - ns <= ns / 16 + 1
+
+def test_percentiles():
+    histogram = LatencyHistogram()
+    for ns in range(1, 1001):
+        histogram.record(ns * 1000)
+    assert histogram.count == 1000
+    assert histogram.min == 1000 and histogram.max == 10 ** 6
+    assert 500000 <= histogram.percentile(50) <= 500000 * 17 / 16
+    assert 990000 <= histogram.percentile(99) <= 10 ** 6
+    assert histogram.percentile(100) == 10 ** 6
+    summary = histogram.summary()
+    assert summary["count"] == 1000 and summary["max_us"] == 1000.0
+    assert LatencyHistogram().summary()["p99_us"] == 0
+
+def test_device_wipe_records_each_pass():
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(os.urandom(3 * 1024 * 1024 + 100))
+
+        engine = SecureWipeEngine(latency_histograms=True)
+        assert engine.wipe_device(image, WipePattern.DOD_522022M)
+        latency = engine.wipe_stats["latency"]
+        assert [p["pass_number"] for p in latency["passes"]] == [1, 2, 3]
+        first, _, last = (p["operations"] for p in latency["passes"])
+        assert set(first) == {"pattern", "write", "fsync"}
+        assert set(last) == {"rng", "write", "fsync"}
+        assert last["write"]["count"] == last["rng"]["count"] > 0
+        assert last["write"]["p50_us"] <= last["write"]["p99_us"] <= last["write"]["max_us"]
+        assert latency["verify"]["read"]["count"] > 0
+
+        cert = CertificateGenerator(tmp)
+        assert cert._describe_latency(latency).startswith("Pass 3: write p50")
+
+def test_disabled_by_default():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "secret.txt")
+        with open(path, "wb") as f:
+            f.write(os.urandom(10000))
+        engine = SecureWipeEngine()
+        assert engine.wipe_file(path, WipePattern.SINGLE_RANDOM)
+        assert "latency" not in engine.wipe_stats
+        assert engine.verifier.latency is None
+
+def test_directory_job_shares_histograms():
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(3):
+            with open(os.path.join(tmp, f"file{i}.bin"), "wb") as f:
+                f.write(os.urandom(5000))
+        engine = SecureWipeEngine(latency_histograms=True)
+        assert engine.wipe_directory(tmp, WipePattern.SINGLE_RANDOM) == (3, 0)
+        operations = engine.wipe_stats["latency"]["passes"][0]["operations"]
+        # Two 4 KB writes per file, one fsync per file
+        assert operations["write"]["count"] == 6
+        assert operations["fsync"]["count"] == 3
+
+if __name__ == "__main__":
+    test_buckets_bound_their_values()
+    test_percentiles()
+    test_device_wipe_records_each_pass()
+    test_disabled_by_default()
+    test_directory_job_shares_histograms()
+    print("All latency tests passed")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Tests for the queue-backed SecureWipeLogger
+"""
+
+import glob
+import gzip
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import date
+from io import StringIO
+sys.path.append(os.path.dirname(__file__))
+
+from utils.logger import SecureWipeLogger, log_segment_key
+from utils.wipe_engine import SecureWipeEngine, WipePattern
+
+def _read(logger):
+    with open(logger.log_file) as f:
+        return f.read()
+
+def test_entries_are_batched_and_flushed():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = SecureWipeLogger(tmp)
+        for i in range(5000):
+            logger.log(f"Wiped file {i}")
+        assert logger.flush(timeout=10)
+        text = _read(logger)
+        assert "[INFO] Wiped file 0\n" in text and "[INFO] Wiped file 4999\n" in text
+        assert logger.stats()["written"] == 5000
+        logger.close()
+
+def test_errors_are_on_disk_when_log_returns():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = SecureWipeLogger(tmp)
+        logger.log("Executing pass 1 of 3")
+        logger.log("Error wiping file x: disk removed", "ERROR")
+        text = _read(logger)
+        assert text.index("Executing pass 1") < text.index("[ERROR] Error wiping file x")
+        logger.close()
+
+def test_full_queue_drops_and_counts():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = SecureWipeLogger(tmp, max_queue=4, batch_size=1)
+        release = threading.Event()
+        write = logger._write
+        def stalled_write(batch):
+            release.wait()
+            return write(batch)
+        logger._write = stalled_write
+
+        logger.log("first")  # Taken by the writer, which then stalls
+        while logger._queue.qsize():
+            pass
+        for i in range(10):
+            logger.log(f"burst {i}", "DEBUG")
+        assert logger.dropped == 6 and logger.dropped_by_level == {"DEBUG": 6}
+
+        release.set()
+        logger.flush(timeout=10)
+        text = _read(logger)
+        assert "burst 3" in text and "burst 4" not in text
+        assert "6 log entries dropped" in text
+        logger.close()
+
+def test_size_rotation_compresses_segments():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = SecureWipeLogger(tmp, max_bytes=20000, batch_size=50)
+        for i in range(3000):
+            logger.log(f"Wiped file {i:05d}")
+            if i % 50 == 0:
+                logger.flush()
+        logger.close()
+
+        segments = sorted(glob.glob(os.path.join(tmp, "wiper_*.log.gz")), key=log_segment_key)
+        assert len(segments) >= 4 and logger.rotations == len(segments)
+        lines = []
+        for path in segments + [str(logger.log_file)]:
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt") as f:
+                lines.extend(line for line in f if "Wiped file" in line)
+            assert os.path.getsize(path) < 25000
+        assert [line[-6:-1] for line in lines] == [f"{i:05d}" for i in range(3000)]
+
+def test_date_rotation_and_retention():
+    with tempfile.TemporaryDirectory() as tmp:
+        stale = os.path.join(tmp, "wiper_20000101.log")
+        with open(stale, "w") as f:
+            f.write("old\n")
+        os.utime(stale, (time.time() - 400 * 86400,) * 2)
+
+        logger = SecureWipeLogger(tmp, retention_days=90)
+        logger.log("before midnight")
+        logger.flush()
+        first_day = logger.log_file
+        logger._today = lambda: date(2099, 1, 1)
+        logger.log("after midnight")
+        logger.close()
+
+        assert logger.log_file.name == "wiper_20990101.log"
+        assert not os.path.exists(first_day) and not os.path.exists(stale + ".gz")
+        with gzip.open(str(first_day) + ".gz", "rt") as f:
+            assert "before midnight" in f.read()
+        with open(logger.log_file) as f:
+            assert "after midnight" in f.read()
+
+def test_console_and_file_thresholds():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = SecureWipeLogger(tmp, console=True, level="INFO", console_level="WARNING")
+        console = StringIO()
+        with redirect_stdout(console):
+            logger.log("Pass detail", "DEBUG")
+            logger.log("Starting wipe")
+            logger.log("Verification failed", "WARNING")
+            logger.log("Forced to the console", echo=True)
+            logger.flush(timeout=10)
+        text = _read(logger)
+        assert "Pass detail" not in text
+        assert "Starting wipe" in text and "Verification failed" in text
+        assert console.getvalue().count("\n") == 2
+        assert "[WARNING] Verification failed" in console.getvalue()
+        assert "Forced to the console" in console.getvalue()
+        logger.close()
+
+def test_disabled_engine_messages_are_never_formatted():
+    class Loud:
+        def __str__(self):
+            raise AssertionError("formatted a disabled message")
+
+    engine = SecureWipeEngine()
+    console = StringIO()
+    with redirect_stdout(console):
+        engine.debug("Wiped %s", Loud())
+        engine.log("Wiped %s", "DEBUG", Loud())
+        engine.info("Wiped %d files", 3)
+    assert console.getvalue().endswith("[INFO] Wiped 3 files\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = os.path.join(tmp, "data")
+        os.mkdir(data)
+        for i in range(3):
+            with open(os.path.join(data, f"file{i}.bin"), "wb") as f:
+                f.write(os.urandom(100))
+        logger = SecureWipeLogger(os.path.join(tmp, "logs"))
+        engine = SecureWipeEngine(logger=logger, console_level="WARNING", file_level="DEBUG")
+        console = StringIO()
+        with redirect_stdout(console):
+            assert engine.wipe_directory(data, WipePattern.SINGLE_RANDOM) == (3, 0)
+        logger.flush(timeout=10)
+        text = _read(logger)
+        # Per-file messages are DEBUG inside a directory job
+        assert text.count("[DEBUG] File successfully wiped and deleted") == 3
+        assert "[INFO] Directory wipe completed" in text
+        assert console.getvalue() == ""
+        logger.close()
+
+if __name__ == "__main__":
+    test_entries_are_batched_and_flushed()
+    test_errors_are_on_disk_when_log_returns()
+    test_full_queue_drops_and_counts()
+    test_size_rotation_compresses_segments()
+    test_date_rotation_and_retention()
+    test_console_and_file_thresholds()
+    test_disabled_engine_messages_are_never_formatted()
+    print("All logger tests passed")
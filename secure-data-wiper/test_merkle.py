@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Tests for Merkle region hashing of the final wipe pass
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.merkle import MerkleTree, RegionHasher, audit_region, hash_leaf, verify_proof
+from utils.wipe_engine import SecureWipeEngine, WipePattern
+
+def test_proofs_for_every_leaf_count():
+    for count in range(1, 12):
+        leaves = [hash_leaf(bytes([i]) * 16) for i in range(count)]
+        tree = MerkleTree(leaves, region_size=16)
+        root = tree.root.hex()
+        for index in range(count):
+            proof = tree.proof(index)
+            assert len(proof) <= max(1, (count - 1).bit_length())
+            assert verify_proof(leaves[index], proof, root)
+            assert not verify_proof(hash_leaf(b"tampered"), proof, root)
+
+def test_region_hasher_matches_whole_regions():
+    data = os.urandom(10 * 1000 + 7)
+    hasher = RegionHasher(region_size=1000)
+    for start in range(0, len(data), 333):
+        hasher.update(data[start:start + 333])
+    tree = hasher.finish()
+    assert tree.size == len(data)
+    assert tree.leaves == [hash_leaf(data[i:i + 1000]) for i in range(0, len(data), 1000)]
+
+def test_device_wipe_regions_can_be_audited():
+    region = 64 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(os.urandom(10 * region + 1234))
+
+        engine = SecureWipeEngine(merkle_hashing=True)
+        engine.merkle_region_size = region
+        engine.merkle_leaves_dir = os.path.join(tmp, "merkle")
+        assert engine.wipe_device(image, WipePattern.SINGLE_RANDOM)
+        merkle = engine.wipe_stats["merkle"]
+        assert merkle["leaf_count"] == 11 and merkle["size"] == 10 * region + 1234
+
+        # The leaves are saved with the job, and the Merkle block records where
+        leaves_path = merkle["leaves_file"]
+        assert os.path.dirname(leaves_path) == os.path.realpath(engine.merkle_leaves_dir)
+        tree = MerkleTree.load_leaves(leaves_path, merkle)
+        assert tree.root.hex() == merkle["root"]
+        for index in (0, 5, 10):
+            assert audit_region(image, merkle, index, tree.proof(index))
+
+        with open(image, "r+b") as f:
+            f.seek(5 * region + 100)
+            flipped = f.read(1)[0] ^ 0xFF
+            f.seek(5 * region + 100)
+            f.write(bytes([flipped]))
+        assert not audit_region(image, merkle, 5, tree.proof(5))
+        assert audit_region(image, merkle, 4, tree.proof(4))
+
+        with open(leaves_path, "r+b") as f:
+            f.write(b"\xff")
+        try:
+            MerkleTree.load_leaves(leaves_path, merkle)
+            assert False, "tampered leaves file accepted"
+        except ValueError:
+            pass
+
+def test_directory_jobs_record_no_merkle_block():
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(os.urandom(100000))
+        data = os.path.join(tmp, "data")
+        os.mkdir(data)
+        for i in range(3):
+            with open(os.path.join(data, f"file{i}.bin"), "wb") as f:
+                f.write(os.urandom(5000))
+
+        engine = SecureWipeEngine(merkle_hashing=True)
+        engine.merkle_leaves_dir = os.path.join(tmp, "merkle")
+        assert engine.wipe_device(image, WipePattern.SINGLE_RANDOM)
+        assert "merkle" in engine.wipe_stats
+        # A single root would only cover the last file, and the device's block is stale
+        assert engine.wipe_directory(data, WipePattern.SINGLE_RANDOM) == (3, 0)
+        assert "merkle" not in engine.wipe_stats and engine.merkle_tree is None
+        assert len(os.listdir(engine.merkle_leaves_dir)) == 1
+
+if __name__ == "__main__":
+    test_proofs_for_every_leaf_count()
+    test_region_hasher_matches_whole_regions()
+    test_device_wipe_regions_can_be_audited()
+    test_directory_jobs_record_no_merkle_block()
+    print("All Merkle tests passed")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Tests for the Prometheus metrics endpoint
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import urllib.request
+sys.path.append(os.path.dirname(__file__))
+
+from utils.metrics import MetricsServer, WipeMetrics, is_loopback
+from utils.wipe_engine import SecureWipeEngine, WipePattern
+
+def parse(text):
+    """{series: value} for every sample in an exposition"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        series, value = line.rsplit(" ", 1)
+        samples[series] = float(value)
+    return samples
+
+def test_finished_jobs_are_counted():
+    metrics = WipeMetrics()
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(os.urandom(2 * 1024 * 1024))
+        engine = SecureWipeEngine()
+        engine.metrics = metrics
+        assert engine.wipe_device(image, WipePattern.DOD_522022M, verify=False)
+        # A directory cannot be opened for writing: the job starts, then fails
+        assert not engine.wipe_file(tmp, WipePattern.SINGLE_RANDOM)
+
+        samples = parse(metrics.render())
+        assert samples["cleanslate_active_jobs"] == 0
+        assert samples[f'cleanslate_bytes_written_total{{device="{image}"}}'] == 3 * 2 * 1024 * 1024
+        assert samples['cleanslate_jobs_total{operation="device",status="completed"}'] == 1
+        assert samples['cleanslate_jobs_total{operation="file",status="failed"}'] == 1
+        assert samples['cleanslate_errors_total{operation="file"}'] == 1
+
+def test_active_job_progress_is_visible_during_a_wipe():
+    metrics = WipeMetrics()
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(os.urandom(4 * 1024 * 1024))
+        engine = SecureWipeEngine()
+        engine.metrics = metrics
+        scraped = []
+
+        class Probe:
+            """Keystream stand-in that scrapes once the second pass is half written"""
+            def read(self, offset, length):
+                if engine.job.pass_number == 2 and offset == 2 * 1024 * 1024 and not scraped:
+                    scraped.append(metrics.render())
+                return b"\x55" * length
+
+        original = engine._timed
+        engine._timed = lambda f, expected, pattern_data, recorder: (f, Probe())
+        assert engine.wipe_device(image, [b"\x00", b"\x55"], verify=False)
+        engine._timed = original
+
+        samples = parse(scraped[0])
+        assert samples["cleanslate_active_jobs"] == 1
+        active = {series.split("{")[0]: value for series, value in samples.items() if "job=" in series}
+        assert active["cleanslate_job_pass"] == 2
+        assert active["cleanslate_job_passes"] == 2
+        assert active["cleanslate_job_pass_progress_ratio"] == 0.5
+        assert active["cleanslate_job_bytes_written"] == 6 * 1024 * 1024
+        assert active["cleanslate_job_average_throughput_bytes_per_second"] > 0
+
+def test_http_and_unix_socket_endpoints():
+    metrics = WipeMetrics()
+    metrics.add_gauge("certificate_queue_depth", "Certificates waiting to be generated", lambda: 7)
+    server = MetricsServer(metrics, "127.0.0.1:0").start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            body = response.read().decode()
+        assert "cleanslate_certificate_queue_depth 7" in body
+        assert "# TYPE cleanslate_bytes_written_total counter" in body
+    finally:
+        server.close()
+
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "metrics.sock")
+        server = MetricsServer(metrics, path).start()
+        try:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(path)
+            client.sendall(b"GET /metrics HTTP/1.0\r\n\r\n")
+            response = b""
+            while True:
+                data = client.recv(65536)
+                if not data:
+                    break
+                response += data
+            client.close()
+            assert response.startswith(b"HTTP/1.0 200")
+            assert b"cleanslate_active_jobs 0" in response
+        finally:
+            server.close()
+        assert not os.path.exists(path)
+
+def test_only_loopback_unless_allowed():
+    assert is_loopback("127.0.0.1") and is_loopback("localhost") and is_loopback("[::1]")
+    assert not is_loopback("0.0.0.0") and not is_loopback("192.0.2.7")
+    try:
+        MetricsServer(WipeMetrics(), "0.0.0.0:0")
+        assert False, "wildcard address accepted"
+    except ValueError:
+        pass
+    MetricsServer(WipeMetrics(), "0.0.0.0:0", allow_remote=True).close()
+
+def test_unix_socket_never_replaces_other_files():
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "metrics.sock")
+        with open(path, "w") as f:
+            f.write("not a socket")
+        try:
+            MetricsServer(WipeMetrics(), path)
+            assert False, "regular file replaced"
+        except FileExistsError:
+            pass
+        with open(path) as f:
+            assert f.read() == "not a socket"
+        os.remove(path)
+
+        # A stale socket from a crashed run is replaced, a live one is not
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = MetricsServer(WipeMetrics(), path).start()
+        try:
+            try:
+                MetricsServer(WipeMetrics(), path)
+                assert False, "live socket replaced"
+            except OSError:
+                pass
+        finally:
+            server.close()
+
+if __name__ == "__main__":
+    test_finished_jobs_are_counted()
+    test_active_job_progress_is_visible_during_a_wipe()
+    test_http_and_unix_socket_endpoints()
+    test_only_loopback_unless_allowed()
+    test_unix_socket_never_replaces_other_files()
+    print("All metrics tests passed")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Tests for wipe job profiling reports
+"""
+
+import os
+import pstats
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.profiling import JobProfiler, builtin_name
+from utils.wipe_engine import SecureWipeEngine, WipePattern
+
+def test_builtin_names():
+    assert builtin_name("<built-in method posix.fsync>") == "fsync"
+    assert builtin_name("<method 'write' of '_io.BufferedRandom' objects>") == "write"
+    assert builtin_name("wipe_device") is None
+
+def test_device_wipe_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(os.urandom(2 * 1024 * 1024))
+        engine = SecureWipeEngine()
+        engine.profiler = JobProfiler(os.path.join(tmp, "logs"), trace_memory=True)
+        assert engine.wipe_device(image, WipePattern.DOD_522022M)
+
+        report_path = engine.wipe_stats["profile_report"]
+        with open(report_path) as f:
+            report = f.read()
+        assert "Operation: device" in report and "Status: completed" in report
+        assert "I/O system calls:" in report
+        for number in (1, 2, 3):
+            assert f"Pass {number}: " in report
+        assert "allocated" in report and "LARGEST LIVE ALLOCATIONS" in report
+        assert "wipe_device" in report
+
+        stats = pstats.Stats(report_path[:-len(".txt")] + ".prof")
+        assert any(function == "wipe_device" for _, _, function in stats.stats)
+
+def test_directory_job_is_one_profile():
+    with tempfile.TemporaryDirectory() as tmp:
+        data = os.path.join(tmp, "data")
+        os.mkdir(data)
+        for i in range(3):
+            with open(os.path.join(data, f"file{i}.bin"), "wb") as f:
+                f.write(os.urandom(5000))
+        engine = SecureWipeEngine()
+        engine.profiler = JobProfiler(os.path.join(tmp, "logs"))
+        assert engine.wipe_directory(data, WipePattern.SINGLE_RANDOM) == (3, 0)
+        assert len(engine.profiler.reports) == 1
+        with open(engine.profiler.reports[0]) as f:
+            report = f.read()
+        assert "Operation: directory" in report
+        assert "Pass 1: " in report and "over 3 files" in report
+        assert "allocated" not in report
+
+if __name__ == "__main__":
+    test_builtin_names()
+    test_device_wipe_report()
+    test_directory_job_is_one_profile()
+    print("All profiling tests passed")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+"""
+Tests for full read-back wipe verification
+"""
+
+import os
+import sys
+import tempfile
+import threading
+sys.path.append(os.path.dirname(__file__))
+
+from utils.keystream import Keystream
+from utils.verification import (ExpectedContent, ReadbackVerifier, SamplingVerifier,
+                                measure_cache_effect)
+from utils.wipe_engine import SecureWipeEngine, WipePattern
+import utils.verification as verification
+
+def _write_expected(path, expected, size):
+    with open(path, "wb") as f:
+        f.write(expected.read(0, size))
+
+def test_pattern_readback_matches():
+    expected = ExpectedContent(pattern_data=b'\x92\x49\x24' * 170 + b'\x92\x49')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pattern.bin")
+        _write_expected(path, expected, 3 * 1024 * 1024 + 123)
+        
+        result = ReadbackVerifier(chunk_size=1024 * 1024).verify(path, expected)
+        assert result["verified"]
+        assert result["bytes_checked"] == 3 * 1024 * 1024 + 123
+        assert result["mismatch_ranges"] == []
+
+def test_keystream_is_reproducible():
+    stream = Keystream()
+    whole = stream.read(0, 3 * Keystream.BLOCK_SIZE)
+    again = Keystream(stream.seed)
+    assert again.read(Keystream.BLOCK_SIZE - 10, 20) == whole[Keystream.BLOCK_SIZE - 10:Keystream.BLOCK_SIZE + 10]
+    assert Keystream().read(0, 64) != whole[:64]
+
+def test_mismatch_ranges_reported():
+    expected = ExpectedContent(keystream=Keystream())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random.bin")
+        _write_expected(path, expected, 2 * 1024 * 1024)
+        # Inverted bytes differ from the keystream at every position, so
+        # each corruption is reported as exactly one range
+        with open(path, "r+b") as f:
+            for offset, length in ((1000, 9), (1024 * 1024 - 4, 8)):  # second straddles a read chunk
+                f.seek(offset)
+                f.write(bytes(b ^ 0xFF for b in expected.read(offset, length)))
+        
+        for has_numpy in (True, False):
+            if has_numpy and not verification.HAS_NUMPY:
+                continue
+            saved = verification.HAS_NUMPY
+            verification.HAS_NUMPY = has_numpy
+            try:
+                result = ReadbackVerifier(chunk_size=1024 * 1024).verify(path, expected)
+            finally:
+                verification.HAS_NUMPY = saved
+            
+            assert not result["verified"]
+            first, second = result["mismatch_ranges"]
+            assert first[0] <= 1000 and first[1] >= 1009
+            assert second[0] <= 1024 * 1024 - 4 and second[1] >= 1024 * 1024 + 4
+            if has_numpy:
+                assert result["mismatch_ranges"] == [[1000, 1009], [1024 * 1024 - 4, 1024 * 1024 + 4]]
+
+def test_engine_wipe_verifies_whole_file():
+    engine = SecureWipeEngine()
+    for pattern in (WipePattern.DOD_522022M, [b'\xAA' * 512]):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "secret.txt")
+            with open(path, "w") as f:
+                f.write("SENSITIVE DATA " * 5000)
+            
+            assert engine.wipe_file(path, pattern, verify=True)
+            assert engine.wipe_stats["verification"]["verified"]
+            assert engine.wipe_stats["verification"]["bytes_checked"] == 75000
+
+def test_sampling_offsets_spread_and_reproducible():
+    sampler = SamplingVerifier(percent=5, sector_size=4096)
+    size = 1000 * 4096 + 100
+    offsets = sampler.sample_offsets(size, "seed")
+    assert len(offsets) == 50
+    assert offsets == sampler.sample_offsets(size, "seed")
+    assert len(set(offsets)) == len(offsets) and offsets == sorted(offsets)
+    assert offsets[0] < size // 10 and offsets[-1] > size - size // 10
+
+def test_sampling_detects_corrupt_sector():
+    expected = ExpectedContent(keystream=Keystream())
+    sampler = SamplingVerifier(percent=100, sector_size=4096, workers=4)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random.bin")
+        _write_expected(path, expected, 64 * 4096 + 10)
+        
+        result = sampler.verify(path, expected, seed="abc")
+        assert result["verified"] and result["sample_count"] == 65
+        assert result["bytes_checked"] == 64 * 4096 + 10
+        
+        with open(path, "r+b") as f:
+            f.seek(10 * 4096 + 7)
+            f.write(bytes([expected.read(10 * 4096 + 7, 1)[0] ^ 0xFF]))
+        result = sampler.verify(path, expected, seed="abc")
+        assert not result["verified"]
+        assert result["failed_offsets"] == [10 * 4096]
+
+def test_sampled_statistics_cover_every_sampled_byte():
+    expected = ExpectedContent(keystream=Keystream())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random.bin")
+        _write_expected(path, expected, 8 * 1024 * 1024)
+        
+        # 4MB regions straddle the boundaries between the workers' batches
+        sampler = SamplingVerifier(percent=10, workers=8, region_size=4 * 1024 * 1024)
+        result = sampler.verify(path, expected, seed="regions")
+        assert result["verified"]
+        statistics = result["statistics"]
+        assert statistics["overall"]["bytes"] == result["bytes_checked"]
+        assert sum(region["bytes"] for region in statistics["regions"]) == result["bytes_checked"]
+
+def test_pipelined_device_wipe():
+    engine = SecureWipeEngine()
+    engine.verify_window_size = 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(b"OLD FILESYSTEM " * 600000)
+        
+        assert engine.wipe_device(image, WipePattern.DOD_522022M)
+        report = engine.wipe_stats["verification"]
+        assert report["verified"] and report["mode"] == "pipelined"
+        assert report["bytes_checked"] == 9000000
+        assert report["windows_checked"] == 9
+        assert os.path.getsize(image) == 9000000
+
+def test_pipelined_wipe_aborts_on_bad_window():
+    class FailingMediumVerifier(ReadbackVerifier):
+        def check_range(self, reader, expected, start, end, tally, stop_flag=None):
+            # Simulate a medium that loses the first byte of every window
+            with open(reader.path, "r+b") as f:
+                f.seek(start)
+                f.write(bytes([expected.read(start, 1)[0] ^ 0xFF]))
+            return super().check_range(reader, expected, start, end, tally, stop_flag)
+    
+    engine = SecureWipeEngine()
+    engine.verify_window_size = 1024 * 1024
+    engine.verifier = FailingMediumVerifier(cache_mode="none")
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(bytes(32 * 1024 * 1024))
+        
+        assert not engine.wipe_device(image, WipePattern.SINGLE_RANDOM)
+        report = engine.wipe_stats["verification"]
+        assert not report["verified"]
+        assert report["first_mismatch_offset"] == 0
+        assert report["windows_checked"] < 32
+
+def test_pipelined_wipe_logs_a_failed_verifier():
+    class BrokenVerifier(ReadbackVerifier):
+        def check_range(self, reader, expected, start, end, tally, stop_flag=None):
+            raise OSError(5, "Input/output error")
+    
+    engine = SecureWipeEngine()
+    engine.verify_window_size = 1024 * 1024
+    engine.verifier = BrokenVerifier(cache_mode="none")
+    errors = []
+    engine.error = lambda message, *args: errors.append(message % args)
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(bytes(8 * 1024 * 1024))
+        
+        assert not engine.wipe_device(image, WipePattern.SINGLE_RANDOM)
+        report = engine.wipe_stats["verification"]
+        assert report["first_mismatch_offset"] is None
+        assert any("Input/output error" in message for message in errors)
+        assert not any("offset None" in message for message in errors)
+
+class _FlakyWriter:
+    """Writes at most `limit` bytes per call, and fails once `fail_after` calls are made"""
+    def __init__(self, f, limit=None, fail_after=None):
+        self.f = f
+        self.limit = limit
+        self.fail_after = fail_after
+        self.calls = 0
+    
+    def write(self, data):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise OSError(5, "Input/output error")
+        return self.f.write(data[:self.limit] if self.limit else data)
+    
+    def flush(self):
+        self.f.flush()
+
+def test_failed_write_stops_helper_threads():
+    engine = SecureWipeEngine(merkle_hashing=True, stream_hash="sha256")
+    engine.verify_window_size = 1024 * 1024
+    engine._timed = lambda f, expected, pattern_data, recorder: (_FlakyWriter(f, fail_after=3), expected)
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(bytes(8 * 1024 * 1024))
+        path = os.path.join(tmp, "secret.bin")
+        with open(path, "wb") as f:
+            f.write(bytes(64 * 1024))
+        
+        before = set(threading.enumerate())
+        assert not engine.wipe_device(image, WipePattern.SINGLE_RANDOM)
+        assert not engine.wipe_file(path, WipePattern.SINGLE_RANDOM)
+        assert set(threading.enumerate()) <= before
+
+def test_short_device_writes_are_completed():
+    engine = SecureWipeEngine()
+    engine._timed = lambda f, expected, pattern_data, recorder: (_FlakyWriter(f, limit=100000), expected)
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(b"OLD FILESYSTEM " * 200000)
+        
+        assert engine.wipe_device(image, WipePattern.SINGLE_RANDOM)
+        assert engine.wipe_stats["verification"]["verified"]
+        assert os.path.getsize(image) == 3000000
+
+def test_cache_bypassing_modes():
+    expected = ExpectedContent(keystream=Keystream())
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(__file__))) as tmp:
+        path = os.path.join(tmp, "random.bin")
+        _write_expected(path, expected, 2 * 1024 * 1024 + 4097)
+        
+        for cache_mode in ("direct", "drop", "none"):
+            result = ReadbackVerifier(chunk_size=1024 * 1024, cache_mode=cache_mode).verify(path, expected)
+            assert result["verified"], cache_mode
+            assert result["bytes_checked"] == 2 * 1024 * 1024 + 4097
+            assert result["cache_mode"] in ("direct", "drop", "none")
+            
+            result = SamplingVerifier(percent=10, cache_mode=cache_mode).verify(path, expected)
+            assert result["verified"], cache_mode
+        
+        measurement = measure_cache_effect(path)
+        assert measurement["cached_mbps"] > 0 and measurement["media_mbps"] > 0
+
+def test_direct_mode_without_o_direct_drops_the_cache():
+    if not hasattr(os, "O_DIRECT"):
+        return
+    expected = ExpectedContent(pattern_data=b"\x00")
+    real_open, real_drop = os.open, verification.drop_page_cache
+    dropped = []
+    
+    def rejecting_open(path, flags, *args):
+        if flags & os.O_DIRECT:
+            raise OSError(22, "Invalid argument")
+        return real_open(path, flags, *args)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "zeros.bin")
+        _write_expected(path, expected, 100000)
+        verification.os.open = rejecting_open
+        try:
+            for can_drop, mode in ((True, "drop"), (False, "none")):
+                verification.drop_page_cache = lambda *args: dropped.append(args) or can_drop
+                dropped.clear()
+                result = ReadbackVerifier(cache_mode="direct").verify(path, expected)
+                assert result["verified"] and result["cache_mode"] == mode
+                assert dropped
+                result = SamplingVerifier(percent=50, cache_mode="direct", workers=2).verify(path, expected)
+                assert result["verified"] and result["cache_mode"] == mode
+        finally:
+            verification.os.open = real_open
+            verification.drop_page_cache = real_drop
+
+if __name__ == "__main__":
+    test_pattern_readback_matches()
+    test_keystream_is_reproducible()
+    test_mismatch_ranges_reported()
+    test_engine_wipe_verifies_whole_file()
+    test_sampling_offsets_spread_and_reproducible()
+    test_sampling_detects_corrupt_sector()
+    test_sampled_statistics_cover_every_sampled_byte()
+    test_pipelined_device_wipe()
+    test_pipelined_wipe_aborts_on_bad_window()
+    test_pipelined_wipe_logs_a_failed_verifier()
+    test_failed_write_stops_helper_threads()
+    test_short_device_writes_are_completed()
+    test_cache_bypassing_modes()
+    test_direct_mode_without_o_direct_drops_the_cache()
+    print("All read-back verification tests passed")
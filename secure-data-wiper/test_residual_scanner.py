@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Tests for the post-wipe residual data scanner
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.residual_scanner import MultiPatternMatcher, ResidualScanner, build_patterns
+import utils.residual_scanner as residual_scanner
+
+def test_matcher_finds_overlapping_patterns():
+    patterns = [("abc", b"abc"), ("abcd", b"abcd"), ("bcd", b"bcd"), ("zz", b"zz")]
+    data = b"xxabcdxxzzzabc"
+    for has_numpy in (True, False):
+        saved = residual_scanner.HAS_NUMPY
+        residual_scanner.HAS_NUMPY = has_numpy and saved
+        try:
+            hits = sorted(MultiPatternMatcher(patterns).find(data))
+        finally:
+            residual_scanner.HAS_NUMPY = saved
+        assert hits == [(2, "abc"), (2, "abcd"), (3, "bcd"), (8, "zz"), (9, "zz"), (11, "abc")]
+
+def test_scan_reports_hits_across_segments():
+    segment = 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        data = bytearray(4 * segment)
+        data[100:105] = b"%PDF-"
+        canary = "ACME-CONFIDENTIAL".encode("utf-16-le")
+        data[2 * segment - 10:2 * segment - 10 + len(canary)] = canary  # straddles a segment
+        data[3 * segment + 5:3 * segment + 13] = b"EFI PART"
+        with open(image, "wb") as f:
+            f.write(data)
+        
+        scanner = ResidualScanner(canaries=["ACME-CONFIDENTIAL"], workers=2,
+                                  segment_size=segment, chunk_size=256 * 1024)
+        report = scanner.scan(image)
+        assert report["complete"]
+        assert report["hits"] == [
+            {"offset": 100, "pattern": "PDF document"},
+            {"offset": 2 * segment - 10, "pattern": "canary 'ACME-CONFIDENTIAL' (UTF-16)"},
+            {"offset": 3 * segment + 5, "pattern": "GPT header"},
+        ]
+        
+        with open(image, "wb") as f:
+            f.write(bytes(len(data)))
+        assert scanner.scan(image)["hit_count"] == 0
+
+def test_chance_hits_on_random_data_are_not_residual():
+    size = 4 * 1024 * 1024
+    signatures = {"two bytes": b"\x12\x34", "long": b"ACME-CONFIDENTIAL"}
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        data = bytearray(os.urandom(size))
+        with open(image, "wb") as f:
+            f.write(data)
+        scanner = ResidualScanner(signatures, workers=1)
+        report = scanner.scan(image)
+        # About 64 chance matches of the 2-byte signature
+        assert report["hit_counts"]["two bytes"] > 0
+        assert report["expected_random_hits"]["two bytes"] == size / 65536
+        assert not report["residual"]
+        # After a fixed-pattern pass the same hits are residual
+        assert scanner.scan(image, random_fill=False)["residual"]
+
+        data[1000:1017] = b"ACME-CONFIDENTIAL"
+        for i in range(300):
+            data[2000 + 4 * i:2002 + 4 * i] = b"\x12\x34"
+        with open(image, "wb") as f:
+            f.write(data)
+        report = scanner.scan(image)
+        assert set(report["residual_hits"]) == {"two bytes", "long"}
+
+def test_rejects_single_byte_patterns():
+    try:
+        build_patterns({"too short": b"\x00"})
+    except ValueError:
+        return
+    assert False, "single-byte pattern accepted"
+
+if __name__ == "__main__":
+    test_matcher_finds_overlapping_patterns()
+    test_scan_reports_hits_across_segments()
+    test_chance_hits_on_random_data_are_not_residual()
+    test_rejects_single_byte_patterns()
+    print("All residual scanner tests passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Tests for the inline hash of final-pass data
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.stream_hash import BackgroundHasher
+from utils.wipe_engine import SecureWipeEngine, WipePattern
+
+def test_background_hasher_matches_hashlib():
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    hasher = BackgroundHasher("blake2b")
+    hasher.start()
+    for start in range(0, len(data), 4096):
+        hasher.update(data[start:start + 4096])
+    summary = hasher.finish()
+    assert summary == {"algorithm": "blake2b", "digest": hashlib.blake2b(data).hexdigest(), "bytes": len(data)}
+
+def test_file_wipe_records_final_pass_digest():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "secret.txt")
+        with open(path, "wb") as f:
+            f.write(b"confidential" * 10000)
+
+        engine = SecureWipeEngine(stream_hash="sha256")
+        assert engine.wipe_file(path, [b"\x00" * 512, b"\xab" * 512])
+        assert engine.wipe_stats["write_hash"]["digest"] == hashlib.sha256(b"\xab" * 120000).hexdigest()
+
+def test_device_wipe_digest_and_merkle_share_the_helper_thread():
+    with tempfile.TemporaryDirectory() as tmp:
+        image = os.path.join(tmp, "disk.img")
+        with open(image, "wb") as f:
+            f.write(os.urandom(5 * 1024 * 1024 + 99))
+
+        engine = SecureWipeEngine(stream_hash="sha256", merkle_hashing=True)
+        assert engine.wipe_device(image, WipePattern.SINGLE_RANDOM)
+        with open(image, "rb") as f:
+            assert engine.wipe_stats["write_hash"]["digest"] == hashlib.sha256(f.read()).hexdigest()
+        assert engine.wipe_stats["merkle"]["size"] == 5 * 1024 * 1024 + 99
+
+def test_rejects_unknown_algorithm():
+    try:
+        BackgroundHasher("md5")
+    except ValueError:
+        return
+    assert False, "md5 accepted"
+
+if __name__ == "__main__":
+    test_background_hasher_matches_hashlib()
+    test_file_wipe_records_final_pass_digest()
+    test_device_wipe_digest_and_merkle_share_the_helper_thread()
+    test_rejects_unknown_algorithm()
+    print("All stream hash tests passed")
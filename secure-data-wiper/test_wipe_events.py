@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Tests for the structured wipe event stream and its throughput query tool
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from utils.logger import SecureWipeLogger
+from utils.wipe_engine import SecureWipeEngine, WipePattern
+from utils.wipe_events import main, read_events, throughput
+
+def _run_jobs(tmp):
+    logger = SecureWipeLogger(os.path.join(tmp, "logs"))
+    engine = SecureWipeEngine(logger=logger)
+    engine.job_metadata = {"device_model": "TestDisk 1000"}
+    image = os.path.join(tmp, "disk.img")
+    with open(image, "wb") as f:
+        f.write(b"\x5a" * 4 * 1024 * 1024)
+    assert engine.wipe_device(image, WipePattern.DOD_522022M, verify=True)
+
+    folder = os.path.join(tmp, "folder")
+    os.makedirs(folder)
+    for i in range(5):
+        with open(os.path.join(folder, f"f{i}.txt"), "w") as f:
+            f.write("SENSITIVE " * 100)
+    assert engine.wipe_directory(folder, WipePattern.SINGLE_RANDOM) == (5, 0)
+    logger.close()
+    return logger
+
+def test_engine_writes_job_and_pass_events():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = _run_jobs(tmp)
+        events = list(read_events([logger.log_dir]))
+        kinds = [event["event"] for event in events]
+        assert kinds == (["job_start"] + ["pass_start", "pass_end"] * 3 + ["verify", "job_end"] +
+                         ["job_start", "job_end"])
+
+        device_start, directory_start = events[0], events[-2]
+        assert device_start["method"] == "DOD_522022M" and device_start["device_model"] == "TestDisk 1000"
+        assert directory_start["operation"] == "directory" and directory_start["files"] == 5
+        assert all(event["job"] == device_start["job"] for event in events[:9])
+        assert events[2]["bytes"] == 4 * 1024 * 1024 and events[2]["fsync_seconds"] >= 0
+        assert events[7]["passed"] and events[8]["status"] == "completed"
+        assert events[-1]["files_wiped"] == 5 and events[-1]["bytes"] == 5000
+
+def test_throughput_by_model_method_and_pass():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = _run_jobs(tmp)
+        rows = throughput(read_events([logger.log_dir]))
+        assert [(row["device_model"], row["method"], row["pass_number"]) for row in rows] == [
+            ("TestDisk 1000", "DOD_522022M", 1), ("TestDisk 1000", "DOD_522022M", 2),
+            ("TestDisk 1000", "DOD_522022M", 3)]
+        assert all(row["count"] == 1 and row["bytes"] == 4 * 1024 * 1024 and row["mbps"] > 0 for row in rows)
+
+        jobs = throughput(read_events([logger.events_file]), ("operation",), level="job")
+        assert [(row["operation"], row["count"]) for row in jobs] == [("device", 1), ("directory", 1)]
+        assert main([str(logger.log_dir), "--level", "job", "--by", "method", "--operation", "device"]) == 0
+
+if __name__ == "__main__":
+    test_engine_writes_job_and_pass_events()
+    test_throughput_by_model_method_and_pass()
+    print("All wipe event tests passed")
@@ -0,0 +1,216 @@
+"""
+Byte Statistics Module
+Streaming entropy and randomness tests for wipe verification
+"""
+
+import importlib.util
+import math
+from functools import lru_cache
+
+# NumPy is only imported when the first buffer is analysed; checking for it
+# here keeps it off the startup path of the GUI and the wipe engine
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+REGION_SIZE = 64 * 1024 * 1024  # 64MB regions
+MIN_TEST_BYTES = 256 * 5  # Chi-square needs ~5 expected counts per byte value
+P_VALUE_THRESHOLD = 0.0001
+
+@lru_cache(maxsize=None)
+def _bit_tables():
+    """Bit-count lookup tables, built once per process"""
+    import numpy as np
+    values = np.arange(256, dtype=np.uint8)
+    # Set bits per byte value, and bit transitions inside each byte (MSB first)
+    popcount = np.unpackbits(values[:, None], axis=1).sum(axis=1).astype(np.int64)
+    inner_transitions = np.unpackbits(((values ^ (values >> 1)) & 0x7F)[:, None], axis=1).sum(axis=1).astype(np.int64)
+    # Bytes are histogrammed in little-endian pairs (low byte first), which
+    # halves the bincount work and gives the boundary inside each pair for free
+    pairs = np.arange(65536, dtype=np.uint32)
+    pair_boundary = ((pairs & 1) != (pairs >> 15)).astype(np.int64)
+    return popcount, inner_transitions, pair_boundary
+
+def _chi_square_p_value(chi_square, dof):
+    """Upper-tail p-value using the Wilson-Hilferty approximation"""
+    if dof <= 0:
+        return 0.0
+    z = ((chi_square / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+class ByteStatistics:
+    """Accumulates a byte histogram and bit-run counts over streamed buffers"""
+
+    def __init__(self):
+        if HAS_NUMPY:
+            import numpy as np
+            self.histogram = np.zeros(256, dtype=np.int64)
+        else:
+            self.histogram = [0] * 256
+        self.total_bytes = 0
+        self.ones = 0
+        self.transitions = 0
+        self._first_bit = None
+        self._last_bit = None
+
+    def update(self, data):
+        """Add a buffer (bytes, bytearray or memoryview) to the statistics"""
+        n = len(data)
+        if n == 0:
+            return
+        self.total_bytes += n
+
+        if not HAS_NUMPY:
+            data = bytes(data)
+            for value in range(256):
+                self.histogram[value] += data.count(value.to_bytes(1, "little"))
+            return
+
+        import numpy as np
+        popcount, inner_transitions, pair_boundary = _bit_tables()
+        arr = np.frombuffer(data, dtype=np.uint8)
+        first_bit = int(arr[0]) >> 7
+        if self._first_bit is None:
+            self._first_bit = first_bit
+        elif self._last_bit != first_bit:
+            self.transitions += 1
+        self._last_bit = int(arr[-1]) & 1
+
+        # Fill patterns are the common case after a wipe: one byte value throughout
+        value = int(arr[0])
+        if arr.min() == arr.max():
+            self.histogram[value] += n
+            self.ones += int(popcount[value]) * n
+            self.transitions += int(inner_transitions[value]) * n + ((value & 1) != (value >> 7)) * (n - 1)
+            return
+
+        even = n - n % 2
+        pairs = np.bincount(arr[:even].view("<u2"), minlength=65536)
+        grid = pairs.reshape(256, 256)  # [high byte, low byte]
+        counts = grid.sum(axis=0) + grid.sum(axis=1)
+        if n % 2:
+            counts[arr[-1]] += 1
+        self.histogram += counts
+        self.ones += int(counts @ popcount)
+
+        # Bit transitions: inside bytes and pairs via lookup tables, the
+        # remaining odd byte boundaries via LSB/MSB comparison
+        transitions = int(counts @ inner_transitions) + int(pairs @ pair_boundary)
+        transitions += int(np.count_nonzero((arr[1:-1:2] & 1) != (arr[2::2] >> 7)))
+        self.transitions += transitions
+
+    def merge(self, other):
+        """Append the statistics of a buffer stream that followed this one"""
+        if other.total_bytes == 0:
+            return
+        if self._first_bit is None:
+            self._first_bit = other._first_bit
+        elif other._first_bit is not None and self._last_bit != other._first_bit:
+            self.transitions += 1
+        self._last_bit = other._last_bit
+        self.histogram = self.histogram + other.histogram if HAS_NUMPY else [
+            a + b for a, b in zip(self.histogram, other.histogram)]
+        self.total_bytes += other.total_bytes
+        self.ones += other.ones
+        self.transitions += other.transitions
+
+    def shannon_entropy(self):
+        """Entropy in bits per byte (0 to 8)"""
+        if self.total_bytes == 0:
+            return 0.0
+        if HAS_NUMPY:
+            import numpy as np
+            p = self.histogram[self.histogram > 0] / self.total_bytes
+            return float(-(p * np.log2(p)).sum())
+        return -sum((c / self.total_bytes) * math.log2(c / self.total_bytes)
+                    for c in self.histogram if c)
+
+    def chi_square(self):
+        """Chi-square statistic against a uniform byte distribution"""
+        if self.total_bytes == 0:
+            return 0.0
+        expected = self.total_bytes / 256
+        if HAS_NUMPY:
+            return float(((self.histogram - expected) ** 2).sum() / expected)
+        return sum((c - expected) ** 2 for c in self.histogram) / expected
+
+    def runs_p_value(self):
+        """P-value of the NIST SP 800-22 runs test over the bit stream"""
+        if not HAS_NUMPY:
+            return None
+        n = self.total_bytes * 8
+        if n == 0:
+            return 0.0
+        pi = self.ones / n
+        # The runs test only applies once the frequency test passes
+        if abs(pi - 0.5) >= 2 / math.sqrt(n):
+            return 0.0
+        runs = self.transitions + 1
+        return math.erfc(abs(runs - 2 * n * pi * (1 - pi)) / (2 * math.sqrt(2 * n) * pi * (1 - pi)))
+
+    def classify(self):
+        """'empty', 'uniform' (single fill byte), 'random' or 'structured'"""
+        if self.total_bytes == 0:
+            return "empty"
+        if max(self.histogram) == self.total_bytes:
+            return "uniform"
+        if self.total_bytes < MIN_TEST_BYTES:
+            return "structured"
+        chi_p = _chi_square_p_value(self.chi_square(), 255)
+        runs_p = self.runs_p_value()
+        if chi_p >= P_VALUE_THRESHOLD and (runs_p is None or runs_p >= P_VALUE_THRESHOLD):
+            return "random"
+        return "structured"
+
+    def results(self):
+        """Summary of the accumulated statistics"""
+        chi_square = self.chi_square()
+        return {
+            "bytes": self.total_bytes,
+            "entropy": self.shannon_entropy(),
+            "chi_square": chi_square,
+            "chi_square_p": _chi_square_p_value(chi_square, 255) if self.total_bytes else 0.0,
+            "runs_p": self.runs_p_value(),
+            "distinct_values": int(sum(1 for c in self.histogram if c)),
+            "classification": self.classify()
+        }
+
+class RegionStatistics:
+    """ByteStatistics kept separately for fixed-size regions of a target"""
+
+    def __init__(self, region_size=REGION_SIZE):
+        self.region_size = region_size
+        self.regions = {}
+
+    def update(self, offset, data):
+        """Add `data` read at byte `offset`, splitting it at region boundaries"""
+        view = memoryview(data)
+        while len(view):
+            index, start = divmod(offset, self.region_size)
+            take = min(self.region_size - start, len(view))
+            self.regions.setdefault(index, ByteStatistics()).update(view[:take])
+            view = view[take:]
+            offset += take
+
+    def merge(self, other):
+        """Add statistics gathered over later offsets; a region both cover is merged, not replaced"""
+        for index in sorted(other.regions):
+            region = self.regions.get(index)
+            if region is None:
+                self.regions[index] = other.regions[index]
+            else:
+                region.merge(other.regions[index])
+
+    def overall(self):
+        """Statistics merged across every region"""
+        total = ByteStatistics()
+        for index in sorted(self.regions):
+            total.merge(self.regions[index])
+        return total
+
+    def results(self):
+        """Overall and per-region summaries"""
+        return {
+            "region_size": self.region_size,
+            "overall": self.overall().results(),
+            "regions": [dict(offset=index * self.region_size, **self.regions[index].results())
+                        for index in sorted(self.regions)]
+        }
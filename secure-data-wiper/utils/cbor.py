@@ -0,0 +1,196 @@
+"""
+CBOR Module
+Deterministic CBOR (RFC 8949 section 4.2.1) encoding for certificates
+"""
+
+import struct
+from functools import lru_cache
+
+# Major types
+_UINT, _NINT, _BYTES, _TEXT, _ARRAY, _MAP, _SIMPLE = 0, 1, 2, 3, 4, 5, 7
+_FALSE, _TRUE, _NULL = b"\xf4", b"\xf5", b"\xf6"
+
+class CBORDecodeError(ValueError):
+    pass
+
+class Encoded(bytes):
+    """An item that is already deterministic CBOR, written out unchanged"""
+
+def _head(major, value):
+    """Initial byte(s) with the argument in its shortest form"""
+    if value < 24:
+        return bytes([major << 5 | value])
+    if value < 0x100:
+        return bytes([major << 5 | 24, value])
+    if value < 0x10000:
+        return bytes([major << 5 | 25]) + value.to_bytes(2, "big")
+    if value < 0x100000000:
+        return bytes([major << 5 | 26]) + value.to_bytes(4, "big")
+    if value < 0x10000000000000000:
+        return bytes([major << 5 | 27]) + value.to_bytes(8, "big")
+    raise ValueError("Integers beyond 64 bits are not supported")
+
+def _encode_float(value):
+    """Shortest of half, single and double precision that keeps the value exact"""
+    if value != value:
+        return b"\xf9\x7e\x00"  # Canonical NaN
+    for fmt, prefix in (("e", b"\xf9"), ("f", b"\xfa")):
+        try:
+            packed = struct.pack(">" + fmt, value)
+        except OverflowError:
+            continue
+        if struct.unpack(">" + fmt, packed)[0] == value:
+            return prefix + packed
+    return b"\xfb" + struct.pack(">d", value)
+
+@lru_cache(maxsize=4096)
+def _encode_text_key(key):
+    # Certificates reuse the same few dozen field names
+    data = key.encode("utf-8")
+    return _head(_TEXT, len(data)) + data
+
+def _encode(obj, out):
+    kind = type(obj)
+    if kind is str:
+        data = obj.encode("utf-8")
+        out.append(_head(_TEXT, len(data)))
+        out.append(data)
+    elif kind is dict:
+        if all(type(key) is str for key in obj):
+            # Text keys: bytewise order of the encodings is (length, UTF-8 bytes)
+            keys = sorted((_encode_text_key(key), key) for key in obj)
+        else:
+            keys = sorted((dumps(key), key) for key in obj)
+        out.append(_head(_MAP, len(keys)))
+        for encoded, key in keys:
+            out.append(encoded)
+            _encode(obj[key], out)
+    elif kind is int:
+        out.append(_head(_UINT, obj) if obj >= 0 else _head(_NINT, -1 - obj))
+    elif kind is Encoded:
+        out.append(obj)
+    elif obj is None:
+        out.append(_NULL)
+    elif obj is True:
+        out.append(_TRUE)
+    elif obj is False:
+        out.append(_FALSE)
+    elif kind is float:
+        out.append(_encode_float(obj))
+    elif kind in (list, tuple):
+        out.append(_head(_ARRAY, len(obj)))
+        for item in obj:
+            _encode(item, out)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        out.append(_head(_BYTES, len(data)))
+        out.append(data)
+    elif isinstance(obj, int):
+        _encode(int(obj), out)
+    elif isinstance(obj, float):
+        out.append(_encode_float(float(obj)))
+    elif isinstance(obj, str):
+        _encode(str(obj), out)
+    elif isinstance(obj, dict):
+        _encode(dict(obj), out)
+    elif isinstance(obj, (list, tuple)):
+        _encode(list(obj), out)
+    else:
+        raise TypeError(f"Cannot CBOR-encode {type(obj).__name__}")
+
+def dumps(obj):
+    """Encode `obj` in deterministic CBOR"""
+    out = []
+    _encode(obj, out)
+    return b"".join(out)
+
+def prepend_entry(encoded_map, key, value):
+    """Add text `key` to an encoded map whose keys all sort after it
+
+    Lets a digest of a map's encoding be stored inside the map without
+    encoding the rest of it a second time.
+    """
+    initial = encoded_map[0]
+    if initial >> 5 != _MAP:
+        raise ValueError("Not an encoded map")
+    info = initial & 0x1F
+    if info < 24:
+        count, pos = info, 1
+    elif 24 <= info <= 27:
+        size = 1 << (info - 24)
+        count, pos = int.from_bytes(encoded_map[1:1 + size], "big"), 1 + size
+    else:
+        raise ValueError("Indefinite-length maps are not supported")
+    encoded_key = _encode_text_key(key)
+    if count:
+        _, end = _decode(encoded_map, pos)
+        if encoded_map[pos:end] <= encoded_key:
+            raise ValueError(f"{key!r} does not sort before the map's keys")
+    return Encoded(_head(_MAP, count + 1) + encoded_key + dumps(value) + encoded_map[pos:])
+
+_FLOATS = {25: (">e", 2), 26: (">f", 4), 27: (">d", 8)}
+_SIMPLE_VALUES = {20: False, 21: True, 22: None}
+
+def _decode(data, pos):
+    initial = data[pos]
+    pos += 1
+    major = initial >> 5
+    info = initial & 0x1F
+
+    if major == _SIMPLE:
+        if info in _SIMPLE_VALUES:
+            return _SIMPLE_VALUES[info], pos
+        if info not in _FLOATS:
+            raise CBORDecodeError(f"Unsupported simple value {info}")
+        fmt, size = _FLOATS[info]
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+
+    if info < 24:
+        value = info
+    elif info == 24:
+        value = data[pos]
+        pos += 1
+    elif info <= 27:
+        size = 1 << (info - 24)
+        value = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+    else:
+        raise CBORDecodeError("Indefinite lengths are not used in certificates")
+
+    if major == _TEXT:
+        end = pos + value
+        if end > len(data):
+            raise CBORDecodeError("Unexpected end of data")
+        return data[pos:end].decode("utf-8"), end
+    if major == _MAP:
+        result = {}
+        for _ in range(value):
+            key, pos = _decode(data, pos)
+            result[key], pos = _decode(data, pos)
+        return result, pos
+    if major == _UINT:
+        return value, pos
+    if major == _ARRAY:
+        items = []
+        for _ in range(value):
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos
+    if major == _NINT:
+        return -1 - value, pos
+    if major == _BYTES:
+        end = pos + value
+        if end > len(data):
+            raise CBORDecodeError("Unexpected end of data")
+        return bytes(data[pos:end]), end
+    raise CBORDecodeError(f"Unsupported major type {major}")
+
+def loads(data):
+    """Decode a single CBOR item occupying all of `data`"""
+    try:
+        obj, pos = _decode(data, 0)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise CBORDecodeError(f"Malformed CBOR: {e}")
+    if pos != len(data):
+        raise CBORDecodeError("Trailing data after CBOR item")
+    return obj
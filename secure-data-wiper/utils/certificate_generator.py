@@ -1,6 +1,6 @@
 """
 Certificate Generator Module
-Generates digitally signed, tamper-proof wipe certificates in PDF and JSON formats
+Generates digitally signed, tamper-proof wipe certificates in CBOR, JSON and PDF formats
 """
 
 import json
@@ -9,28 +9,236 @@ import os
 from datetime import datetime
 import uuid
 import base64
+import importlib.util
 from pathlib import Path
+import time
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from itertools import islice
 
 try:
-    from reportlab.lib.pagesizes import letter, A4
+    from utils.certificate_store import CertificateIndex, encode_certificate, index_row, read_certificate
+    from utils.ledger import CertificateLedger
+    from utils import cbor
+    from utils.signing import (HAS_CRYPTOGRAPHY, CertificateSigner, legacy_signature, signing_payload,
+                               verify_signature)
+except ImportError:
+    from certificate_store import CertificateIndex, encode_certificate, index_row, read_certificate
+    from ledger import CertificateLedger
+    import cbor
+    from signing import (HAS_CRYPTOGRAPHY, CertificateSigner, legacy_signature, signing_payload,
+                         verify_signature)
+
+# ReportLab is only imported when the first PDF is rendered; checking for it
+# here keeps it off the startup path of the GUI and headless runs
+HAS_REPORTLAB = importlib.util.find_spec("reportlab") is not None
+
+@lru_cache(maxsize=None)
+def _pdf_resources():
+    """Styles, table style and static flowables, built once per process"""
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+    from reportlab.platypus import Paragraph, Spacer, TableStyle
     from reportlab.lib import colors
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-    from reportlab.pdfgen import canvas
-    HAS_REPORTLAB = True
-except ImportError:
-    HAS_REPORTLAB = False
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+    
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='CenterTitle',
+                             parent=styles['Title'],
+                             alignment=TA_CENTER,
+                             fontSize=24,
+                             spaceAfter=30))
+    
+    styles.add(ParagraphStyle(name='CenterSubtitle',
+                             parent=styles['Normal'],
+                             alignment=TA_CENTER,
+                             fontSize=14,
+                             spaceAfter=20))
+    
+    styles.add(ParagraphStyle(name='Justify',
+                             parent=styles['Normal'],
+                             alignment=TA_JUSTIFY))
+    
+    footer_text = """
+    <font size='8'>
+    This certificate confirms that the data wiping operation was performed according to 
+    NIST SP 800-88 Rev. 1 guidelines. The digital signature ensures the authenticity and 
+    integrity of this certificate. This certificate can be verified using the verification 
+    hash and digital signature provided above.
+    </font>
+    """
+    
+    return {
+        "styles": styles,
+        "header": [Paragraph("DATA WIPE CERTIFICATE", styles['CenterTitle']),
+                   Paragraph("NIST SP 800-88 Rev. 1 Compliant", styles['CenterSubtitle']),
+                   Spacer(1, 0.2*inch)],
+        "wipe_details_heading": Paragraph("<b>WIPE DETAILS</b>", styles['Heading2']),
+        "verification_heading": Paragraph("<b>VERIFICATION</b>", styles['Heading2']),
+        "signature_heading": Paragraph("<b>DIGITAL SIGNATURE</b>", styles['Heading2']),
+        "footer": [Spacer(1, 0.5*inch), Paragraph(footer_text, styles['Justify'])],
+        "table_style": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+    }
+
+def _render_pdf(cert_dir, cert_data, cert_id):
+    """Process-pool worker: render one PDF certificate"""
+    return str(CertificateGenerator(cert_dir)._save_pdf_certificate(cert_data, cert_id))
+
+def _verify_chunk(cert_dir, trusted_keys, cert_paths):
+    """Process-pool worker: verify a chunk of certificate files"""
+    generator = CertificateGenerator(cert_dir, trusted_keys=trusted_keys)
+    return [dict(generator.verify_certificate(path), path=path) for path in cert_paths]
+
+def _chunked(paths, size):
+    """Lists of up to `size` path strings from any iterable"""
+    paths = iter(paths)
+    while True:
+        chunk = [str(path) for path in islice(paths, size)]
+        if not chunk:
+            return
+        yield chunk
+
+def find_certificate_files(directory, recursive=True):
+    """One file per certificate under `directory`: the CBOR form, or JSON for older certificates"""
+    paths = {}
+    for pattern in ("cert_*.cbor", "cert_*.json"):
+        matches = Path(directory).rglob(pattern) if recursive else Path(directory).glob(pattern)
+        for path in matches:
+            # Copies of one certificate in different directories are checked separately
+            paths.setdefault((path.parent, path.stem[5:].rsplit("_", 2)[0]), path)
+    return sorted(paths.values())
 
 class CertificateGenerator:
-    def __init__(self):
-        self.cert_dir = Path("certificates")
+    # Renderings written alongside the signed CBOR certificate at issue time;
+    # any others can be produced later with export_certificate()
+    OUTPUT_FORMATS = ("json", "pdf")
+    
+    def __init__(self, cert_dir="certificates", key_path=None, trusted_keys=None, output_formats=None):
+        self.cert_dir = Path(cert_dir)
         self.cert_dir.mkdir(exist_ok=True)
+        self._index = None
+        self._ledger = None
+        # Ed25519 signing key; the key pair is created on first signature
+        self.signer = CertificateSigner(key_path or self.cert_dir / "signing_key.pem") if HAS_CRYPTOGRAPHY else None
+        self.trusted_keys = trusted_keys
+        self.output_formats = tuple(self.OUTPUT_FORMATS if output_formats is None else output_formats)
+    
+    @property
+    def index(self):
+        """SQLite index of the certificates in cert_dir, opened on first use"""
+        if self._index is None:
+            self._index = CertificateIndex(self.cert_dir / "index.db")
+        return self._index
+    
+    @property
+    def ledger(self):
+        """Append-only Merkle log of every certificate issued from cert_dir"""
+        if self._ledger is None:
+            self._ledger = CertificateLedger(self.cert_dir / "ledger", self.signer)
+        return self._ledger
+        
+    def generate_certificate(self, wipe_data, certificate_id=None):
+        """Generate the signed CBOR certificate and its configured renderings"""
+        stored = None
+        if certificate_id is not None and self.ledger.index_of(certificate_id) is not None:
+            # Logged before a crash (outbox recovery): finish that certificate
+            # rather than issuing a second one under the same ID
+            stored = self._stored_cbor_certificate(certificate_id)
+        if stored is not None:
+            cert_data, payload, cbor_path = stored
+            cert_id = cert_data["certificate_id"]
+        else:
+            cert_data, payload = self._build_certificate(wipe_data, certificate_id)
+            cert_id = cert_data["certificate_id"]
+            
+            # The CBOR file is the signed primary form
+            cbor_path = self._save_cbor_certificate(cert_data, cert_id, payload)
+            self.ledger.append(cert_id, self._payload_digest(cert_data, payload))
+        
+        json_path = None
+        if "json" in self.output_formats:
+            json_path = self._save_json_certificate(cert_data, cert_id)
+        
+        pdf_path = None
+        if "pdf" in self.output_formats:
+            if HAS_REPORTLAB:
+                pdf_path = self._save_pdf_certificate(cert_data, cert_id)
+            else:
+                # Create simple text certificate as fallback
+                pdf_path = self._save_text_certificate(cert_data, cert_id)
+        
+        self.index.add(cert_data, json_path, pdf_path, cbor_path)
+        return self._certificate_result(cert_data, json_path, pdf_path, cbor_path)
+    
+    def generate_batch(self, wipe_records, workers=None):
+        """Generate certificates for many wipes, yielding results as they complete
+        
+        Certificate data, hashes, signatures, CBOR and JSON files are
+        produced in-process; PDF rendering, the expensive part, runs in a
+        process pool.
+        """
+        # Build and sign everything before the first file is written
+        records = [self._build_certificate(wipe_data) for wipe_data in wipe_records]
+        built, digests = [], []
+        try:
+            for cert_data, payload in records:
+                cert_id = cert_data["certificate_id"]
+                cbor_path = self._save_cbor_certificate(cert_data, cert_id, payload)
+                digests.append((cert_id, self._payload_digest(cert_data, payload)))
+                built.append((cert_data, None, cbor_path))
+                if "json" in self.output_formats:
+                    built[-1] = (cert_data, self._save_json_certificate(cert_data, cert_id), cbor_path)
+        finally:
+            # Certificates already on disk are logged and indexed even if a later save fails
+            if digests:
+                self.ledger.append_many(digests)
+                self.index.add_many([index_row(cert_data, json_path, None, cbor_path)
+                                     for cert_data, json_path, cbor_path in built])
+        
+        if "pdf" not in self.output_formats:
+            for cert_data, json_path, cbor_path in built:
+                yield self._certificate_result(cert_data, json_path, None, cbor_path)
+            return
+        
+        if not HAS_REPORTLAB:
+            for cert_data, json_path, cbor_path in built:
+                text_path = self._save_text_certificate(cert_data, cert_data["certificate_id"])
+                self.index.set_pdf_path(cert_data["certificate_id"], text_path)
+                yield self._certificate_result(cert_data, json_path, text_path, cbor_path)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_render_pdf, str(self.cert_dir), cert_data, cert_data["certificate_id"]):
+                       (cert_data, json_path, cbor_path) for cert_data, json_path, cbor_path in built}
+            for future in as_completed(futures):
+                cert_data, json_path, cbor_path = futures[future]
+                try:
+                    pdf_path = future.result()
+                    self.index.set_pdf_path(cert_data["certificate_id"], pdf_path)
+                    yield self._certificate_result(cert_data, json_path, pdf_path, cbor_path)
+                except Exception as e:
+                    result = self._certificate_result(cert_data, json_path, None, cbor_path)
+                    result["error"] = f"PDF rendering failed: {e}"
+                    yield result
+    
+    def _build_certificate(self, wipe_data, certificate_id=None):
+        """Assemble certificate data with its verification hash and signature
         
-    def generate_certificate(self, wipe_data):
-        """Generate both PDF and JSON certificates"""
-        cert_id = self._generate_cert_id()
+        Returns the certificate data and its signed CBOR payload. The payload
+        is encoded exactly once; the verification block's encoding, made to
+        compute its hash, is embedded without being encoded again. Signing,
+        the CBOR file and the ledger all reuse these bytes.
+        """
+        cert_id = certificate_id or self._generate_cert_id()
         timestamp = datetime.now()
         
         # Create certificate data
@@ -45,29 +253,34 @@ class CertificateGenerator:
                 "address": "NIST SP 800-88 Rev. 1 Compliant"
             },
             "wipe_details": wipe_data,
-            "verification": self._generate_verification_data(wipe_data),
-            "digital_signature": None  # Will be added after data is finalized
+            "verification": None
         }
+        cert_data["verification"], encoded_verification = self._generate_verification_data(wipe_data)
+        payload = cbor.dumps(dict(cert_data, verification=encoded_verification))
         
         # Generate digital signature
-        cert_data["digital_signature"] = self._generate_signature(cert_data)
-        
-        # Save JSON certificate
-        json_path = self._save_json_certificate(cert_data, cert_id)
-        
-        # Save PDF certificate if reportlab is available
-        pdf_path = None
-        if HAS_REPORTLAB:
-            pdf_path = self._save_pdf_certificate(cert_data, cert_id)
-        else:
-            # Create simple text certificate as fallback
-            pdf_path = self._save_text_certificate(cert_data, cert_id)
-        
+        cert_data["digital_signature"] = self._generate_signature(cert_data, payload)
+        return cert_data, payload
+    
+    def _stored_cbor_certificate(self, cert_id):
+        """(cert_data, payload, path) of a readable CBOR file already written for `cert_id`, or None"""
+        for path in sorted(self.cert_dir.glob(f"cert_{cert_id}_*.cbor")):
+            try:
+                cert_data, payload = read_certificate(path)
+            except Exception:
+                continue  # Torn by the crash
+            if cert_data.get("certificate_id") == cert_id:
+                return cert_data, payload, path
+        return None
+    
+    def _certificate_result(self, cert_data, json_path, pdf_path, cbor_path=None):
+        """Summary returned to callers for a generated certificate"""
         return {
-            "certificate_id": cert_id,
-            "json_path": str(json_path),
+            "certificate_id": cert_data["certificate_id"],
+            "cbor_path": str(cbor_path) if cbor_path else None,
+            "json_path": str(json_path) if json_path else None,
             "pdf_path": str(pdf_path) if pdf_path else None,
-            "timestamp": timestamp.isoformat(),
+            "timestamp": cert_data["timestamp"],
             "verification_hash": cert_data["verification"]["hash"]
         }
     
@@ -76,7 +289,7 @@ class CertificateGenerator:
         return f"CS-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8].upper()}"
     
     def _generate_verification_data(self, wipe_data):
-        """Generate verification data for the certificate"""
+        """Generate verification data for the certificate and its CBOR encoding"""
         verification = {
             "method": wipe_data.get("wipe_method", "Unknown"),
             "passes": wipe_data.get("passes_completed", 0),
@@ -86,38 +299,92 @@ class CertificateGenerator:
             "duration_seconds": wipe_data.get("duration", 0),
             "target_info": wipe_data.get("target_info", {}),
             "verification_status": wipe_data.get("verification_status", "Not Verified"),
-            "hash": None
+            "report": wipe_data.get("verification_report"),
+            "residual_scan": wipe_data.get("residual_scan"),
+            "merkle": wipe_data.get("merkle"),
+            "write_hash": wipe_data.get("write_hash")
         }
         
-        # Generate hash of verification data
-        data_str = json.dumps(verification, sort_keys=True)
-        verification["hash"] = hashlib.sha256(data_str.encode()).hexdigest()
+        # Hash the deterministic CBOR encoding, then splice the hash into it
+        encoded = cbor.dumps(verification)
+        verification["hash"] = hashlib.sha256(encoded).hexdigest()
+        
+        return verification, cbor.prepend_entry(encoded, "hash", verification["hash"])
+    
+    def _describe_verification_report(self, report):
+        """One-line summary of a read-back verification report"""
+        if not report:
+            return None
+        if report.get("mode") == "sample":
+            return (f"Sampled {report['percent']}% ({report['sample_count']:,} sectors of "
+                    f"{report['sector_size']} bytes, seed {report['sample_seed']}): "
+                    f"{report['failed_count']:,} failed")
+        if report.get("mode") == "statistical":
+            overall = report['statistics']['overall']
+            return (f"Statistical scan of {report['bytes_checked']:,} bytes: "
+                    f"entropy {overall['entropy']:.3f} bits/byte, {overall['classification']}")
+        return (f"Full read-back of {report['bytes_checked']:,} bytes: "
+                f"{report['mismatched_bytes']:,} mismatched bytes")
+    
+    def _describe_latency(self, latency):
+        """One-line summary of the final pass's I/O latency histograms"""
+        if not latency or not latency.get("passes"):
+            return None
+        final_pass = latency["passes"][-1]
+        operations = final_pass["operations"]
+        parts = [f"{operation} p50 {operations[operation]['p50_us']:,.0f} us / "
+                 f"p99 {operations[operation]['p99_us']:,.0f} us"
+                 for operation in ("write", "fsync") if operation in operations]
+        read = latency.get("verify", {}).get("read")
+        if read and read["count"]:
+            parts.append(f"verify read p50 {read['p50_us']:,.0f} us / p99 {read['p99_us']:,.0f} us")
+        return f"Pass {final_pass['pass_number']}: " + ", ".join(parts) if parts else None
+    
+    def _generate_signature(self, cert_data, payload=None):
+        """Generate digital signature for the certificate (over `payload` when given)"""
+        if self.signer is not None:
+            return self.signer.sign(cert_data, payload)
+        # Without cryptography only an unkeyed digest can be produced
+        return legacy_signature(cert_data)
+    
+    def _trusted_keys(self):
+        """Key IDs accepted on verification: explicit ones, else our own signing key
         
-        return verification
+        Never None: with no key configured the set is empty and every
+        certificate fails verification.
+        """
+        if self.trusted_keys is not None:
+            return set(self.trusted_keys)
+        if self.signer is not None and self.signer.key_path.exists():
+            return {self.signer.key_id}
+        return set()
+    
+    def _payload_digest(self, cert_data, payload=None):
+        """SHA-256 of the CBOR payload, the value recorded in the ledger"""
+        if payload is None:
+            payload = signing_payload(cert_data, "cbor")
+        return hashlib.sha256(payload).hexdigest()
     
-    def _generate_signature(self, cert_data):
-        """Generate digital signature for the certificate"""
-        # In production, this would use proper cryptographic signing
-        # For MVP, we'll use SHA-256 hash
-        data_copy = cert_data.copy()
-        data_copy.pop("digital_signature", None)
+    def _save_cbor_certificate(self, cert_data, cert_id, payload=None):
+        """Save the CBOR payload and signature as a compact CBOR file"""
+        filename = f"cert_{cert_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.cbor"
+        filepath = self.cert_dir / filename
         
-        data_str = json.dumps(data_copy, sort_keys=True)
-        signature = hashlib.sha512(data_str.encode()).hexdigest()
+        if payload is None:
+            payload = signing_payload(cert_data, "cbor")
+        with open(filepath, 'wb') as f:
+            f.write(encode_certificate(payload, cert_data["digital_signature"]))
         
-        return {
-            "algorithm": "SHA-512",
-            "signature": signature,
-            "timestamp": datetime.now().isoformat()
-        }
+        return filepath
     
     def _save_json_certificate(self, cert_data, cert_id):
         """Save certificate as JSON file"""
         filename = f"cert_{cert_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         filepath = self.cert_dir / filename
         
+        # One dumps() call: json.dump() streams through the pure-Python encoder
         with open(filepath, 'w') as f:
-            json.dump(cert_data, f, indent=2)
+            f.write(json.dumps(cert_data, indent=2))
         
         return filepath
     
@@ -126,6 +393,14 @@ class CertificateGenerator:
         if not HAS_REPORTLAB:
             return None
         
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+        
+        # Layout resources are shared by every certificate rendered in this process
+        resources = _pdf_resources()
+        styles = resources['styles']
+        
         filename = f"cert_{cert_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         filepath = self.cert_dir / filename
         
@@ -137,28 +412,8 @@ class CertificateGenerator:
         # Container for the 'Flowable' objects
         elements = []
         
-        # Define styles
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name='CenterTitle',
-                                 parent=styles['Title'],
-                                 alignment=TA_CENTER,
-                                 fontSize=24,
-                                 spaceAfter=30))
-        
-        styles.add(ParagraphStyle(name='CenterSubtitle',
-                                 parent=styles['Normal'],
-                                 alignment=TA_CENTER,
-                                 fontSize=14,
-                                 spaceAfter=20))
-        
-        styles.add(ParagraphStyle(name='Justify',
-                                 parent=styles['Normal'],
-                                 alignment=TA_JUSTIFY))
-        
         # Title
-        elements.append(Paragraph("DATA WIPE CERTIFICATE", styles['CenterTitle']))
-        elements.append(Paragraph("NIST SP 800-88 Rev. 1 Compliant", styles['CenterSubtitle']))
-        elements.append(Spacer(1, 0.2*inch))
+        elements.extend(resources['header'])
         
         # Organization info
         org_text = f"""
@@ -175,7 +430,7 @@ class CertificateGenerator:
         elements.append(Spacer(1, 0.2*inch))
         
         # Wipe details section
-        elements.append(Paragraph("<b>WIPE DETAILS</b>", styles['Heading2']))
+        elements.append(resources['wipe_details_heading'])
         elements.append(Spacer(1, 0.1*inch))
         
         wipe_details = cert_data['wipe_details']
@@ -193,50 +448,48 @@ class CertificateGenerator:
         
         # Create table
         table = Table(details_data, colWidths=[2.5*inch, 3.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        table.setStyle(resources['table_style'])
         
         elements.append(table)
         elements.append(Spacer(1, 0.3*inch))
         
         # Verification section
-        elements.append(Paragraph("<b>VERIFICATION</b>", styles['Heading2']))
+        elements.append(resources['verification_heading'])
         elements.append(Spacer(1, 0.1*inch))
         
         verification = cert_data['verification']
         elements.append(Paragraph(f"<b>Verification Hash:</b>", styles['Normal']))
         elements.append(Paragraph(f"<font size='8'>{verification['hash']}</font>", styles['Normal']))
+        report_summary = self._describe_verification_report(verification.get('report'))
+        if report_summary:
+            elements.append(Paragraph(f"<b>Read-back:</b> {report_summary}", styles['Normal']))
+        write_hash = verification.get('write_hash')
+        if write_hash:
+            elements.append(Paragraph(f"<b>Written Data Hash ({write_hash['algorithm']}):</b>", styles['Normal']))
+            elements.append(Paragraph(f"<font size='8'>{write_hash['digest']}</font>", styles['Normal']))
+        merkle = verification.get('merkle')
+        if merkle:
+            elements.append(Paragraph(f"<b>Merkle Root ({merkle['leaf_count']} x {merkle['region_size']:,} byte regions):</b>", styles['Normal']))
+            elements.append(Paragraph(f"<font size='8'>{merkle['root']}</font>", styles['Normal']))
+        latency_summary = self._describe_latency(wipe_details.get('latency'))
+        if latency_summary:
+            elements.append(Paragraph(f"<b>I/O Latency:</b> {latency_summary}", styles['Normal']))
         elements.append(Spacer(1, 0.2*inch))
         
         # Digital signature
-        elements.append(Paragraph("<b>DIGITAL SIGNATURE</b>", styles['Heading2']))
+        elements.append(resources['signature_heading'])
         elements.append(Spacer(1, 0.1*inch))
         
         signature = cert_data['digital_signature']
         elements.append(Paragraph(f"<b>Algorithm:</b> {signature['algorithm']}", styles['Normal']))
+        if signature.get('key_id'):
+            elements.append(Paragraph(f"<b>Signing Key ID:</b> {signature['key_id']}", styles['Normal']))
         elements.append(Paragraph(f"<b>Signature:</b>", styles['Normal']))
         elements.append(Paragraph(f"<font size='8'>{signature['signature']}</font>", styles['Normal']))
         elements.append(Spacer(1, 0.3*inch))
         
         # Footer
-        elements.append(Spacer(1, 0.5*inch))
-        footer_text = """
-        <font size='8'>
-        This certificate confirms that the data wiping operation was performed according to 
-        NIST SP 800-88 Rev. 1 guidelines. The digital signature ensures the authenticity and 
-        integrity of this certificate. This certificate can be verified using the verification 
-        hash and digital signature provided above.
-        </font>
-        """
-        elements.append(Paragraph(footer_text, styles['Justify']))
+        elements.extend(resources['footer'])
         
         # Build PDF
         doc.build(elements)
@@ -277,12 +530,27 @@ class CertificateGenerator:
             
             f.write("VERIFICATION\n")
             f.write("-" * 40 + "\n")
-            f.write(f"Verification Hash:\n{cert_data['verification']['hash']}\n\n")
+            f.write(f"Verification Hash:\n{cert_data['verification']['hash']}\n")
+            report_summary = self._describe_verification_report(cert_data['verification'].get('report'))
+            if report_summary:
+                f.write(f"Read-back: {report_summary}\n")
+            write_hash = cert_data['verification'].get('write_hash')
+            if write_hash:
+                f.write(f"Written Data Hash ({write_hash['algorithm']}):\n{write_hash['digest']}\n")
+            merkle = cert_data['verification'].get('merkle')
+            if merkle:
+                f.write(f"Merkle Root ({merkle['leaf_count']} x {merkle['region_size']:,} byte regions):\n{merkle['root']}\n")
+            latency_summary = self._describe_latency(wipe_details.get('latency'))
+            if latency_summary:
+                f.write(f"I/O Latency: {latency_summary}\n")
+            f.write("\n")
             
             f.write("DIGITAL SIGNATURE\n")
             f.write("-" * 40 + "\n")
             signature = cert_data['digital_signature']
             f.write(f"Algorithm: {signature['algorithm']}\n")
+            if signature.get('key_id'):
+                f.write(f"Signing Key ID: {signature['key_id']}\n")
             f.write(f"Signature:\n{signature['signature']}\n")
             f.write(f"Timestamp: {signature['timestamp']}\n\n")
             
@@ -293,36 +561,155 @@ class CertificateGenerator:
         
         return filepath
     
+    def find_certificate(self, certificate_id):
+        """Look up a certificate's index entry (paths, serial, method, status) by ID"""
+        return self.index.get(certificate_id)
+    
+    def _resolve_certificate_path(self, certificate):
+        """Path of a certificate given as a file path or certificate ID (CBOR preferred)"""
+        certificate = str(certificate)
+        if os.path.exists(certificate):
+            return certificate
+        entry = self.index.get(certificate)
+        if entry:
+            return entry['cbor_path'] or entry['json_path'] or certificate
+        return certificate
+    
+    def load_certificate(self, certificate):
+        """Certificate data from a CBOR/JSON file path or a certificate ID"""
+        return read_certificate(self._resolve_certificate_path(certificate))[0]
+    
+    def export_certificate(self, certificate, fmt):
+        """Render a stored certificate as "json", "pdf" or "txt" on demand; returns the new path"""
+        cert_data = self.load_certificate(certificate)
+        cert_id = cert_data["certificate_id"]
+        if fmt == "json":
+            path = self._save_json_certificate(cert_data, cert_id)
+            column = "json_path"
+        elif fmt == "pdf" and HAS_REPORTLAB:
+            path = self._save_pdf_certificate(cert_data, cert_id)
+            column = "pdf_path"
+        elif fmt in ("pdf", "txt"):
+            path = self._save_text_certificate(cert_data, cert_id)
+            column = "pdf_path"
+        else:
+            raise ValueError(f"Unknown certificate format: {fmt}")
+        self.index.set_path(cert_id, column, path)
+        return path
+    
     def verify_certificate(self, cert_path):
-        """Verify a certificate's authenticity"""
+        """Verify a certificate's authenticity, given its CBOR/JSON path or certificate ID"""
         try:
-            if cert_path.endswith('.json'):
-                with open(cert_path, 'r') as f:
-                    cert_data = json.load(f)
-            else:
-                return {"valid": False, "error": "Only JSON certificates can be verified"}
-            
-            # Verify digital signature
-            stored_signature = cert_data.get('digital_signature', {}).get('signature')
-            
-            # Recalculate signature
-            data_copy = cert_data.copy()
-            data_copy.pop('digital_signature', None)
-            data_str = json.dumps(data_copy, sort_keys=True)
-            calculated_signature = hashlib.sha512(data_str.encode()).hexdigest()
+            cert_path = self._resolve_certificate_path(cert_path)
+            if not cert_path.endswith(('.cbor', '.json')):
+                return {"valid": False, "error": "Only CBOR or JSON certificates can be verified"}
             
-            is_valid = stored_signature == calculated_signature
-            
-            return {
-                "valid": is_valid,
+            # A CBOR file carries the exact signed bytes, so nothing is re-encoded
+            cert_data, payload = read_certificate(cert_path)
+            result = verify_signature(cert_data, self._trusted_keys(), payload)
+            result.update({
                 "certificate_id": cert_data.get('certificate_id'),
                 "timestamp": cert_data.get('timestamp'),
-                "verification_hash": cert_data.get('verification', {}).get('hash'),
-                "message": "Certificate is valid and authentic" if is_valid else "Certificate signature verification failed"
-            }
+                "verification_hash": cert_data.get('verification', {}).get('hash')
+            })
+            return result
             
         except Exception as e:
             return {"valid": False, "error": str(e)}
+    
+    def prove_certificate(self, certificate_id):
+        """Inclusion proof of a certificate in the ledger under a signed tree head"""
+        return self.ledger.prove(certificate_id)
+    
+    def audit_ledger(self):
+        """Check every logged certificate is still stored unaltered
+        
+        Returns the logged IDs whose certificate file is missing and those
+        whose stored payload no longer matches the ledger entry.
+        """
+        stored = {path.stem[5:].rsplit("_", 2)[0]: path for path in self._stored_certificates()}
+        logged = sorted(self.ledger.certificate_ids())
+        missing, altered = [], []
+        for certificate_id in logged:
+            path = stored.get(certificate_id)
+            if path is None:
+                missing.append(certificate_id)
+                continue
+            try:
+                cert_data, payload = read_certificate(str(path))
+                digest = self._payload_digest(cert_data, payload)
+            except Exception:
+                digest = None
+            if digest != self.ledger.entry(self.ledger.index_of(certificate_id))["payload_sha256"]:
+                altered.append(certificate_id)
+        return {
+            "tree_head": self.ledger.tree_head(),
+            "certificates": len(logged),
+            "missing": missing,
+            "altered": altered
+        }
+    
+    def _stored_certificates(self):
+        """One file per certificate in cert_dir: the CBOR form, or JSON for older certificates"""
+        return find_certificate_files(self.cert_dir, recursive=False)
+    
+    def indexed_certificates(self, since=None, until=None):
+        """Paths of the indexed certificates issued in [since, until), CBOR preferred"""
+        entries = self.index.find(since=since, until=until, limit=-1)
+        return [entry["cbor_path"] or entry["json_path"] for entry in entries
+                if entry["cbor_path"] or entry["json_path"]]
+    
+    def iter_verify(self, cert_paths, workers=None, chunk_size=256):
+        """Verify certificates in a process pool, yielding each result as its chunk completes
+        
+        Paths are handed out in chunks so each worker parses and checks a
+        few hundred certificates per round trip; only a few chunks per
+        worker are in flight, so memory stays flat for any number of paths.
+        """
+        trusted_keys = self._trusted_keys()
+        chunks = _chunked(cert_paths, chunk_size)
+        first = next(chunks, None)
+        second = next(chunks, None)
+        if second is None:
+            if first:
+                yield from _verify_chunk(str(self.cert_dir), trusted_keys, first)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            max_pending = 2 * (workers or os.cpu_count() or 1)
+            pending = {pool.submit(_verify_chunk, str(self.cert_dir), trusted_keys, chunk)
+                       for chunk in (first, second)}
+            for chunk in chunks:
+                pending.add(pool.submit(_verify_chunk, str(self.cert_dir), trusted_keys, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in as_completed(pending):
+                yield from future.result()
+    
+    def verify_many(self, cert_paths=None, workers=None, chunk_size=256):
+        """Verify many certificates in parallel (default: every certificate in cert_dir)
+        
+        Returns the per-certificate results with totals and certificates
+        per second.
+        """
+        if cert_paths is None:
+            cert_paths = self._stored_certificates()
+        
+        start_time = time.perf_counter()
+        results = list(self.iter_verify(cert_paths, workers, chunk_size))
+        duration = time.perf_counter() - start_time
+        
+        valid = sum(1 for result in results if result["valid"])
+        return {
+            "total": len(results),
+            "valid": valid,
+            "invalid": len(results) - valid,
+            "duration": duration,
+            "certificates_per_second": len(results) / duration if duration > 0 else 0.0,
+            "results": results
+        }
 
 # Example usage
 if __name__ == "__main__":
@@ -350,6 +737,7 @@ if __name__ == "__main__":
     result = generator.generate_certificate(wipe_data)
     print(f"Certificate generated:")
     print(f"  ID: {result['certificate_id']}")
+    print(f"  CBOR: {result['cbor_path']}")
     print(f"  JSON: {result['json_path']}")
     print(f"  PDF: {result['pdf_path']}")
     print(f"  Verification Hash: {result['verification_hash']}")
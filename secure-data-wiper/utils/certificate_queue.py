@@ -0,0 +1,143 @@
+"""
+Certificate Queue Module
+Background certificate generation backed by a persistent outbox
+"""
+
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+
+class CertificateOutbox:
+    """Completed-wipe records kept on disk until their certificate exists
+
+    Each record is a JSON file written under a temporary name, fsynced and
+    renamed into place, so after a crash a record is either complete or absent.
+    """
+
+    def __init__(self, outbox_dir="certificates/outbox"):
+        self.outbox_dir = Path(outbox_dir)
+        self.outbox_dir.mkdir(parents=True, exist_ok=True)
+
+    def put(self, certificate_id, wipe_data):
+        """Durably record a completed wipe awaiting its certificate"""
+        record = {
+            "certificate_id": certificate_id,
+            "queued_at": datetime.now().isoformat(),
+            "wipe_data": wipe_data
+        }
+        path = self.outbox_dir / f"{certificate_id}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(record, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._sync_directory()
+        return path
+
+    def pending(self):
+        """Records not yet acknowledged, oldest first"""
+        records = []
+        for path in sorted(self.outbox_dir.glob("*.json"), key=lambda p: p.stat().st_mtime):
+            try:
+                with open(path, "r") as f:
+                    records.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return records
+
+    def ack(self, certificate_id):
+        """Remove a record once its certificate has been written"""
+        try:
+            os.remove(self.outbox_dir / f"{certificate_id}.json")
+        except FileNotFoundError:
+            pass
+
+    def _sync_directory(self):
+        # Make the rename itself durable (not possible on Windows)
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.outbox_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+class CertificateQueue:
+    """Generates certificates on a background thread
+
+    `submit` persists the wipe record to the outbox and returns the new
+    certificate ID immediately; the worker renders the certificate and then
+    acknowledges the record. Records left over from a crash are re-queued
+    on start-up, and a certificate that was already written before the
+    crash is not generated twice.
+    """
+
+    def __init__(self, generator, outbox_dir=None, on_complete=None):
+        self.generator = generator
+        self.outbox = CertificateOutbox(outbox_dir or Path(generator.cert_dir) / "outbox")
+        self.on_complete = on_complete
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.recovered = self.recover()
+
+    def submit(self, wipe_data):
+        """Queue a completed wipe; returns the certificate ID it will carry"""
+        certificate_id = self.generator._generate_cert_id()
+        self.outbox.put(certificate_id, wipe_data)
+        self._queue.put((certificate_id, wipe_data))
+        return certificate_id
+
+    def recover(self):
+        """Re-queue every record left in the outbox; returns how many"""
+        records = self.outbox.pending()
+        for record in records:
+            self._queue.put((record["certificate_id"], record["wipe_data"]))
+        return len(records)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                result = self._generate(*item)
+                if self.on_complete:
+                    self.on_complete(result)
+            finally:
+                self._queue.task_done()
+
+    def _generate(self, certificate_id, wipe_data):
+        try:
+            entry = self.generator.find_certificate(certificate_id)
+            if entry and entry["cbor_path"] and (entry["pdf_path"] or "pdf" not in self.generator.output_formats):
+                # Written before a crash that happened ahead of the acknowledgement
+                result = {"certificate_id": certificate_id, "cbor_path": entry["cbor_path"],
+                          "json_path": entry["json_path"],
+                          "pdf_path": entry["pdf_path"], "timestamp": entry["timestamp"],
+                          "verification_hash": entry["verification_hash"]}
+            else:
+                result = self.generator.generate_certificate(wipe_data, certificate_id=certificate_id)
+        except Exception as e:
+            # The record stays in the outbox and is retried on the next start
+            return {"certificate_id": certificate_id, "error": str(e)}
+        self.outbox.ack(certificate_id)
+        return result
+
+    def depth(self):
+        """Certificates queued and not yet generated"""
+        return self._queue.qsize()
+
+    def join(self):
+        """Wait until every queued certificate has been generated"""
+        self._queue.join()
+
+    def close(self, wait=True):
+        """Stop the worker after the certificates already queued"""
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
@@ -0,0 +1,181 @@
+"""
+Certificate Store Module
+SQLite index of issued certificates for fast lookup and listing
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+try:
+    from utils import cbor
+except ImportError:
+    import cbor
+
+CERTIFICATE_FORMAT = "cleanslate-certificate/1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificates (
+    certificate_id    TEXT PRIMARY KEY,
+    device_serial     TEXT,
+    timestamp         TEXT NOT NULL,
+    method            TEXT,
+    status            TEXT,
+    target_path       TEXT,
+    verification_hash TEXT,
+    json_path         TEXT,
+    pdf_path          TEXT,
+    cbor_path         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_certificates_serial ON certificates (device_serial, timestamp);
+CREATE INDEX IF NOT EXISTS idx_certificates_timestamp ON certificates (timestamp);
+CREATE INDEX IF NOT EXISTS idx_certificates_method ON certificates (method, timestamp);
+CREATE INDEX IF NOT EXISTS idx_certificates_status ON certificates (status, timestamp);
+"""
+
+COLUMNS = ("certificate_id", "device_serial", "timestamp", "method", "status",
+           "target_path", "verification_hash", "json_path", "pdf_path", "cbor_path")
+
+def encode_certificate(payload, signature):
+    """CBOR file contents: the signed payload bytes and their signature block"""
+    return cbor.dumps({"format": CERTIFICATE_FORMAT, "payload": payload, "signature": signature})
+
+def read_certificate(path):
+    """Load a .cbor or .json certificate; returns (cert_data, signed payload or None)"""
+    path = Path(path)
+    if path.suffix == ".cbor":
+        with open(path, "rb") as f:
+            envelope = cbor.loads(f.read())
+        if not isinstance(envelope, dict) or envelope.get("format") != CERTIFICATE_FORMAT:
+            raise ValueError(f"{path.name} is not a certificate")
+        payload = envelope["payload"]
+        cert_data = cbor.loads(payload)
+        cert_data["digital_signature"] = envelope["signature"]
+        return cert_data, payload
+    with open(path, "r") as f:
+        return json.load(f), None
+
+def index_row(cert_data, json_path=None, pdf_path=None, cbor_path=None):
+    """Extract the indexed columns from certificate data"""
+    wipe_details = cert_data.get("wipe_details", {})
+    target_info = wipe_details.get("target_info") or {}
+    serial = wipe_details.get("device_serial") or target_info.get("serial")
+    return (
+        cert_data["certificate_id"],
+        str(serial) if serial is not None else None,
+        cert_data.get("timestamp", ""),
+        wipe_details.get("wipe_method"),
+        wipe_details.get("verification_status"),
+        wipe_details.get("target_path"),
+        cert_data.get("verification", {}).get("hash"),
+        str(json_path) if json_path else None,
+        str(pdf_path) if pdf_path else None,
+        str(cbor_path) if cbor_path else None,
+    )
+
+class CertificateIndex:
+    """Certificates keyed by ID, device serial, timestamp, method and status"""
+
+    def __init__(self, db_path="certificates/index.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets readers list certificates while a wipe station is writing
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Indexes created before CBOR certificates lack the cbor_path column
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(certificates)")}
+        if "cbor_path" not in existing:
+            self._conn.execute("ALTER TABLE certificates ADD COLUMN cbor_path TEXT")
+
+    def add(self, cert_data, json_path=None, pdf_path=None, cbor_path=None):
+        """Index one certificate (replacing any previous entry with the same ID)"""
+        self.add_many([index_row(cert_data, json_path, pdf_path, cbor_path)])
+
+    def add_many(self, rows):
+        """Index many rows from index_row() in a single transaction"""
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO certificates ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows)
+
+    def set_pdf_path(self, certificate_id, pdf_path):
+        """Record where a certificate's rendered PDF/TXT was written"""
+        self.set_path(certificate_id, "pdf_path", pdf_path)
+
+    def set_path(self, certificate_id, column, path):
+        """Record where one of a certificate's files (json_path, pdf_path, cbor_path) was written"""
+        if column not in ("json_path", "pdf_path", "cbor_path"):
+            raise ValueError(f"Not a path column: {column}")
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE certificates SET {column} = ? WHERE certificate_id = ?",
+                               (str(path) if path else None, certificate_id))
+
+    def get(self, certificate_id):
+        """Return the index entry for a certificate ID, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM certificates WHERE certificate_id = ?",
+                                     (certificate_id,)).fetchone()
+        return dict(row) if row else None
+
+    def find(self, device_serial=None, method=None, status=None, since=None, until=None,
+             limit=100, offset=0):
+        """List certificates matching all given filters, newest first"""
+        clauses, params = [], []
+        for column, value in (("device_serial", device_serial), ("method", method), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+
+        query = "SELECT * FROM certificates"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + [limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM certificates").fetchone()[0]
+
+    def rebuild_from_directory(self, cert_dir):
+        """Index every CBOR or JSON certificate already in `cert_dir`; returns the number indexed"""
+        cert_dir = Path(cert_dir)
+        # Files are named cert_<id>_<YYYYmmdd>_<HHMMSS>.<ext>; the formats of
+        # one certificate may carry different timestamps
+        files = {}
+        for path in cert_dir.iterdir():
+            if path.name.startswith("cert_") and path.suffix in (".cbor", ".json", ".pdf", ".txt"):
+                files.setdefault(path.stem[5:].rsplit("_", 2)[0], {}).setdefault(path.suffix, path)
+
+        rows = []
+        for paths in files.values():
+            # The CBOR file is the signed primary form; JSON is only a rendering of it
+            source = paths.get(".cbor") or paths.get(".json")
+            if source is None:
+                continue
+            try:
+                cert_data, _ = read_certificate(source)
+            except (OSError, ValueError, KeyError):
+                continue
+            if "certificate_id" not in cert_data:
+                continue
+            rows.append(index_row(cert_data, paths.get(".json"), paths.get(".pdf") or paths.get(".txt"),
+                                  paths.get(".cbor")))
+        self.add_many(rows)
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
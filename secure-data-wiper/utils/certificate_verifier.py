@@ -0,0 +1,119 @@
+"""
+Certificate Verifier Module
+Command-line bulk verification of stored certificates
+
+    python -m utils.certificate_verifier certificates/ archive/2025/ --report audit.jsonl
+    python -m utils.certificate_verifier --index --since 2025-01-01 --until 2026-01-01
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+try:
+    from utils.certificate_generator import CertificateGenerator, find_certificate_files
+except ImportError:
+    from certificate_generator import CertificateGenerator, find_certificate_files
+
+def collect_paths(sources, recursive=True):
+    """Certificate files named directly or found under the given directories"""
+    paths = []
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            paths.extend(find_certificate_files(source, recursive))
+        else:
+            paths.append(source)
+    return paths
+
+def verify(generator, cert_paths, workers=None, chunk_size=256, report=None, on_result=None):
+    """Verify `cert_paths`, streaming each result to `report` (a JSON Lines file) and `on_result`
+
+    Returns the summary, which is also written as the report's last line.
+    """
+    total = valid = trusted = 0
+    invalid = []
+    start_time = time.perf_counter()
+    for result in generator.iter_verify(cert_paths, workers, chunk_size):
+        total += 1
+        if result["valid"]:
+            valid += 1
+            trusted += bool(result.get("trusted"))
+        else:
+            invalid.append(result["path"])
+        if report is not None:
+            report.write(json.dumps(result, sort_keys=True) + "\n")
+        if on_result is not None:
+            on_result(result)
+    duration = time.perf_counter() - start_time
+
+    summary = {
+        "total": total,
+        "valid": valid,
+        "trusted": trusted,
+        "invalid": total - valid,
+        "invalid_paths": sorted(invalid),
+        "duration": duration,
+        "certificates_per_second": total / duration if duration > 0 else 0.0
+    }
+    if report is not None:
+        report.write(json.dumps({"summary": summary}, sort_keys=True) + "\n")
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify the signatures of stored wipe certificates")
+    parser.add_argument("sources", nargs="*", help="Certificate files or directories to search")
+    parser.add_argument("--index", action="store_true", help="Verify the certificates listed in the index")
+    parser.add_argument("--since", help="With --index: only certificates issued at or after this ISO date")
+    parser.add_argument("--until", help="With --index: only certificates issued before this ISO date")
+    parser.add_argument("--cert-dir", default="certificates",
+                        help="Certificate directory holding the index and signing key (default: certificates)")
+    parser.add_argument("--no-recursive", action="store_true", help="Do not descend into subdirectories")
+    parser.add_argument("--trusted-key", action="append", help="Trusted signing key ID (repeatable; "
+                        "default: the key in --cert-dir)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Certificates per work unit (default: 256)")
+    parser.add_argument("--report", help="Write per-certificate results and the summary as JSON Lines "
+                        "('-' for stdout)")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    args = parser.parse_args(argv)
+
+    if not args.sources and not args.index:
+        parser.error("give certificate files or directories, or --index")
+    # An audit must not create the directory it was pointed at
+    if not os.path.isdir(args.cert_dir):
+        parser.error(f"certificate directory not found: {args.cert_dir}")
+
+    generator = CertificateGenerator(args.cert_dir, trusted_keys=args.trusted_key)
+    cert_paths = collect_paths(args.sources, not args.no_recursive)
+    if args.index:
+        cert_paths.extend(generator.indexed_certificates(args.since, args.until))
+
+    # With the report on stdout the human-readable lines go to stderr
+    console = sys.stderr if args.report == "-" else sys.stdout
+
+    def print_invalid(result):
+        if not result["valid"] and not args.quiet:
+            print(f"INVALID  {result['path']}: {result.get('message') or result.get('error')}", file=console)
+
+    report = None
+    if args.report == "-":
+        report = sys.stdout
+    elif args.report:
+        report = open(args.report, "w")
+    try:
+        summary = verify(generator, cert_paths, args.workers, args.chunk_size, report, print_invalid)
+    finally:
+        if report is not None and report is not sys.stdout:
+            report.close()
+
+    print(f"Verified {summary['total']:,} certificates in {summary['duration']:.2f}s "
+          f"({summary['certificates_per_second']:,.0f}/s): {summary['valid']:,} valid "
+          f"({summary['trusted']:,} trusted), {summary['invalid']:,} invalid", file=console)
+    return 1 if summary["invalid"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
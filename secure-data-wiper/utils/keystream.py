@@ -0,0 +1,45 @@
+"""
+Keystream Module
+Seekable, reproducible random data for wipe passes
+"""
+
+import os
+import hashlib
+
+class Keystream:
+    """Deterministic random stream derived from a secret seed.
+
+    Each block is SHAKE-256(seed || block index), so any offset can be
+    regenerated later (e.g. for read-back verification) without storing
+    the data that was written.
+    """
+
+    BLOCK_SIZE = 1024 * 1024  # 1MB blocks
+
+    def __init__(self, seed=None):
+        self.seed = seed if seed is not None else os.urandom(32)
+        self._block_index = None
+        self._block = None
+
+    def block(self, index):
+        """Return keystream block number `index`"""
+        if index != self._block_index:
+            shake = hashlib.shake_256(self.seed + index.to_bytes(8, "little"))
+            self._block = shake.digest(self.BLOCK_SIZE)
+            self._block_index = index
+        return self._block
+
+    def read(self, offset, length):
+        """Return `length` keystream bytes starting at byte `offset`"""
+        index, start = divmod(offset, self.BLOCK_SIZE)
+        if start + length <= self.BLOCK_SIZE:
+            return self.block(index)[start:start + length]
+
+        parts = []
+        while length > 0:
+            take = min(self.BLOCK_SIZE - start, length)
+            parts.append(self.block(index)[start:start + take])
+            length -= take
+            index += 1
+            start = 0
+        return b"".join(parts)
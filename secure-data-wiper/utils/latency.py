@@ -0,0 +1,134 @@
+"""
+Latency Module
+HDR-style latency histograms for the wipe engine's I/O calls
+"""
+
+from time import perf_counter_ns
+
+# 16 linear sub-buckets per power of two keep every bucket within ~6% of its values
+SUB_BUCKETS = 16
+_SUB_BUCKET_BITS = 4
+
+def _bucket(ns):
+    if ns < 2 * SUB_BUCKETS:
+        return max(ns, 0)
+    shift = ns.bit_length() - _SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKETS + (ns >> shift)
+
+def _bucket_upper(index):
+    """Largest value (ns) that falls into bucket `index`"""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return ((index % SUB_BUCKETS + SUB_BUCKETS + 1) << shift) - 1
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in nanoseconds
+
+    Recording is a dictionary increment, so a histogram costs the same
+    whether it has seen ten samples or ten million.
+    """
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, ns):
+        index = _bucket(ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, percent):
+        """Upper bound (ns) of the bucket holding the given percentile"""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_upper(index), self.max)
+        return self.max
+
+    def summary(self):
+        """Counts and percentiles in microseconds"""
+        to_us = 1e-3
+        return {
+            "count": self.count,
+            "total_seconds": self.total * 1e-9,
+            "mean_us": self.total / self.count * to_us if self.count else 0.0,
+            "min_us": (self.min or 0) * to_us,
+            "p50_us": self.percentile(50) * to_us,
+            "p90_us": self.percentile(90) * to_us,
+            "p99_us": self.percentile(99) * to_us,
+            "p999_us": self.percentile(99.9) * to_us,
+            "max_us": self.max * to_us
+        }
+
+class LatencyRecorder:
+    """One histogram per operation ("rng", "write", "fsync", ...)"""
+
+    def __init__(self):
+        self.histograms = {}
+
+    def histogram(self, operation):
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = LatencyHistogram()
+        return histogram
+
+    def record(self, operation, ns):
+        self.histogram(operation).record(ns)
+
+    def summary(self):
+        return {operation: histogram.summary() for operation, histogram in sorted(self.histograms.items())
+                if histogram.count}
+
+class TimedWriter:
+    """File wrapper timing write() and flush() calls
+
+    The engine only wraps its file when histograms are enabled, so the
+    disabled path runs the plain file methods with no added checks.
+    """
+
+    def __init__(self, f, recorder):
+        self._f = f
+        self._write = recorder.histogram("write")
+        self._flush = recorder.histogram("flush")
+
+    def write(self, data):
+        started = perf_counter_ns()
+        n = self._f.write(data)
+        self._write.record(perf_counter_ns() - started)
+        return n
+
+    def flush(self):
+        started = perf_counter_ns()
+        self._f.flush()
+        self._flush.record(perf_counter_ns() - started)
+
+    def fileno(self):
+        return self._f.fileno()
+
+class TimedSource:
+    """Wrapper timing how long the pass content (keystream or pattern) takes to produce"""
+
+    def __init__(self, expected, histogram):
+        self._expected = expected
+        self._histogram = histogram
+
+    def read(self, offset, length):
+        started = perf_counter_ns()
+        data = self._expected.read(offset, length)
+        self._histogram.record(perf_counter_ns() - started)
+        return data
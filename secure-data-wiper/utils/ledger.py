@@ -0,0 +1,332 @@
+"""
+Certificate Ledger Module
+Append-only Merkle log of issued certificates with inclusion and consistency proofs
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from utils import cbor
+    from utils.signing import HAS_CRYPTOGRAPHY, SIGNATURE_ALGORITHM, public_key_id
+except ImportError:
+    import cbor
+    from signing import HAS_CRYPTOGRAPHY, SIGNATURE_ALGORITHM, public_key_id
+
+HASH_SIZE = 32
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+def leaf_hash(entry):
+    """RFC 9162 leaf hash of a ledger entry: SHA-256(0x00 || CBOR(entry))"""
+    return hashlib.sha256(b"\x00" + cbor.dumps(entry)).digest()
+
+def node_hash(left, right):
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+def _largest_power_of_two_below(n):
+    return 1 << ((n - 1).bit_length() - 1)
+
+def verify_inclusion(leaf, index, tree_size, proof, root):
+    """Check an inclusion proof (RFC 9162 section 2.1.3.2)"""
+    if index >= tree_size:
+        return False
+    fn, sn, r = index, tree_size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+def verify_consistency(first_size, second_size, first_root, second_root, proof):
+    """Check that a tree of `second_size` extends one of `first_size` (RFC 9162 section 2.1.4.2)"""
+    if first_size > second_size:
+        return False
+    if first_size == second_size:
+        return not proof and first_root == second_root
+    if first_size == 0:
+        return not proof
+    if first_size & (first_size - 1) == 0:
+        proof = [first_root] + list(proof)
+    if not proof:
+        return False
+    fn, sn = first_size - 1, second_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = proof[0]
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == first_root and sr == second_root
+
+def tree_head_payload(tree_head):
+    """Bytes covered by a signed tree head's signature"""
+    return cbor.dumps({key: tree_head[key] for key in ("tree_size", "root_hash", "timestamp")})
+
+def verify_tree_head(tree_head, trusted_keys=None):
+    """Check a signed tree head's Ed25519 signature"""
+    if not HAS_CRYPTOGRAPHY or not tree_head.get("signature"):
+        return False
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+
+    public_key = bytes.fromhex(tree_head["public_key"])
+    if trusted_keys is not None and public_key_id(public_key) not in trusted_keys:
+        return False
+    try:
+        Ed25519PublicKey.from_public_bytes(public_key).verify(base64.b64decode(tree_head["signature"]),
+                                                              tree_head_payload(tree_head))
+        return True
+    except (InvalidSignature, ValueError):
+        return False
+
+class CertificateLedger:
+    """Append-only transparency log of issued certificates
+
+    Leaf hashes are stored in leaves.bin (32 bytes each) and the entries
+    themselves in entries.jsonl. Every entry records the log root before
+    it was appended, chaining each certificate to all earlier ones. A
+    certificate re-issued under the same ID is appended again; lookups by
+    ID return its latest entry. Hashes of complete power-of-two subtrees
+    are kept in memory, so roots and proofs take O(log n) hashes.
+    """
+
+    def __init__(self, ledger_dir="certificates/ledger", signer=None):
+        self.ledger_dir = Path(ledger_dir)
+        self.ledger_dir.mkdir(parents=True, exist_ok=True)
+        self.signer = signer
+        self._lock = threading.Lock()
+        self._levels = [[]]  # _levels[h][i]: hash of leaves [i * 2^h, (i + 1) * 2^h)
+        self._positions = {}
+        self._offsets = []  # Byte offset of each entry in entries.jsonl
+        self._entries_end = 0
+        self._load()
+
+    @property
+    def leaves_path(self):
+        return self.ledger_dir / "leaves.bin"
+
+    @property
+    def entries_path(self):
+        return self.ledger_dir / "entries.jsonl"
+
+    def _load(self):
+        """Read the log, dropping any partially written tail left by a crash"""
+        leaves = b""
+        if self.leaves_path.exists():
+            with open(self.leaves_path, "rb") as f:
+                leaves = f.read()
+
+        entries_end = 0
+        count = 0
+        if self.entries_path.exists():
+            with open(self.entries_path, "rb") as f:
+                for line in f:
+                    if (count + 1) * HASH_SIZE > len(leaves) or not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    self._positions[entry["certificate_id"]] = count
+                    self._offsets.append(entries_end)
+                    entries_end += len(line)
+                    count += 1
+
+        with open(self.leaves_path, "ab") as f:
+            f.truncate(count * HASH_SIZE)
+        with open(self.entries_path, "ab") as f:
+            f.truncate(entries_end)
+        self._entries_end = entries_end
+        for i in range(count):
+            self._add_leaf(leaves[i * HASH_SIZE:(i + 1) * HASH_SIZE])
+
+    def _add_leaf(self, leaf):
+        self._levels[0].append(leaf)
+        height = 0
+        while len(self._levels[height]) % 2 == 0:
+            level = self._levels[height]
+            if height + 1 == len(self._levels):
+                self._levels.append([])
+            self._levels[height + 1].append(node_hash(level[-2], level[-1]))
+            height += 1
+
+    @property
+    def size(self):
+        """Number of entries in the log"""
+        return len(self._levels[0])
+
+    def _subtree(self, start, end):
+        """RFC 9162 MTH of leaves [start, end)"""
+        n = end - start
+        if n & (n - 1) == 0 and start % n == 0:
+            return self._levels[n.bit_length() - 1][start // n]
+        k = _largest_power_of_two_below(n)
+        return node_hash(self._subtree(start, start + k), self._subtree(start + k, end))
+
+    def root(self, tree_size=None):
+        """Root hash of the log at `tree_size` (default: current size)"""
+        tree_size = self.size if tree_size is None else tree_size
+        if tree_size == 0:
+            return EMPTY_ROOT
+        return self._subtree(0, tree_size)
+
+    def append(self, certificate_id, payload_digest, sync=True):
+        """Add one certificate; returns its leaf index"""
+        return self.append_many([(certificate_id, payload_digest)], sync)[0]
+
+    def append_many(self, certificates, sync=True):
+        """Add (certificate_id, payload SHA-256 hex) pairs with one write and fsync"""
+        with self._lock:
+            timestamp = datetime.now().isoformat()
+            indices, leaves, lines = [], [], []
+            for certificate_id, payload_digest in certificates:
+                entry = {
+                    "index": self.size,
+                    "certificate_id": certificate_id,
+                    "payload_sha256": payload_digest,
+                    "previous_root": self.root().hex(),
+                    "timestamp": timestamp
+                }
+                leaf = leaf_hash(entry)
+                self._add_leaf(leaf)
+                line = (json.dumps(entry, sort_keys=True) + "\n").encode()
+                self._positions[certificate_id] = entry["index"]
+                self._offsets.append(self._entries_end)
+                self._entries_end += len(line)
+                indices.append(entry["index"])
+                leaves.append(leaf)
+                lines.append(line)
+
+            # Entries are written before leaves: on reload the log is cut to
+            # the records present in both files
+            with open(self.entries_path, "ab") as f:
+                f.write(b"".join(lines))
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            with open(self.leaves_path, "ab") as f:
+                f.write(b"".join(leaves))
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            return indices
+
+    def entry(self, index):
+        """The stored entry at leaf `index`"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"No ledger entry {index}")
+        with open(self.entries_path, "rb") as f:
+            f.seek(self._offsets[index])
+            return json.loads(f.readline())
+
+    def certificate_ids(self):
+        """IDs of every certificate in the log"""
+        return list(self._positions)
+
+    def index_of(self, certificate_id):
+        """Leaf index of a certificate's latest entry, or None"""
+        return self._positions.get(certificate_id)
+
+    def inclusion_proof(self, index, tree_size=None):
+        """Audit path for leaf `index` in the tree of `tree_size` leaves"""
+        tree_size = self.size if tree_size is None else tree_size
+        if not 0 <= index < tree_size <= self.size:
+            raise IndexError(f"Leaf {index} is not in a tree of {tree_size}")
+        proof = []
+        start, end = 0, tree_size
+        while end - start > 1:
+            k = _largest_power_of_two_below(end - start)
+            if index < start + k:
+                proof.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._subtree(start, start + k))
+                start += k
+        return proof[::-1]
+
+    def consistency_proof(self, first_size, second_size=None):
+        """Proof that the log at `second_size` extends the log at `first_size`"""
+        second_size = self.size if second_size is None else second_size
+        if not 0 <= first_size <= second_size <= self.size:
+            raise IndexError(f"Cannot prove {first_size} -> {second_size}")
+        if first_size in (0, second_size):
+            return []
+        proof = []
+        m, start, end, complete = first_size, 0, second_size, True
+        while m != end:
+            k = _largest_power_of_two_below(end - start)
+            if m - start <= k:
+                proof.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._subtree(start, start + k))
+                start += k
+                complete = False
+        if not complete:
+            proof.append(self._subtree(start, end))
+        return proof[::-1]
+
+    def tree_head(self):
+        """Signed tree head for the current log"""
+        head = {
+            "tree_size": self.size,
+            "root_hash": self.root().hex(),
+            "timestamp": datetime.now().isoformat(),
+            "signature": None
+        }
+        if self.signer is not None:
+            signature = self.signer.private_key.sign(tree_head_payload(head))
+            head.update({
+                "algorithm": SIGNATURE_ALGORITHM,
+                "signature": base64.b64encode(signature).decode(),
+                "public_key": self.signer.public_key_bytes.hex(),
+                "key_id": self.signer.key_id
+            })
+        return head
+
+    def prove(self, certificate_id):
+        """Everything an auditor needs to check a certificate's membership"""
+        index = self._positions.get(certificate_id)
+        if index is None:
+            return None
+        tree_head = self.tree_head()
+        return {
+            "entry": self.entry(index),
+            "tree_head": tree_head,
+            "inclusion_proof": [h.hex() for h in self.inclusion_proof(index, tree_head["tree_size"])]
+        }
+
+def verify_membership(bundle, payload_digest=None, trusted_keys=None):
+    """Check a bundle from CertificateLedger.prove() against its tree head"""
+    entry, tree_head = bundle["entry"], bundle["tree_head"]
+    if payload_digest is not None and entry["payload_sha256"] != payload_digest:
+        return False
+    if trusted_keys is not None and not verify_tree_head(tree_head, trusted_keys):
+        return False
+    return verify_inclusion(leaf_hash(entry), entry["index"], tree_head["tree_size"],
+                            [bytes.fromhex(h) for h in bundle["inclusion_proof"]],
+                            bytes.fromhex(tree_head["root_hash"]))
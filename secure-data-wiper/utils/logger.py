@@ -2,29 +2,339 @@
 Logger module for Secure Data Wiper
 """
 
+import atexit
+import gzip
+import json
 import os
-from datetime import datetime
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import date, datetime
 from pathlib import Path
 
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+CRITICAL = 50
+
+# Severity of each level name, for threshold checks; unknown names count as INFO
+LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "SUCCESS": 25, "WARNING": WARNING, "ERROR": ERROR,
+          "CRITICAL": CRITICAL}
+
+# Levels that are never dropped and are on disk before log() returns
+FLUSH_LEVELS = ("ERROR", "CRITICAL")
+
+def level_number(level):
+    """Severity of a level given by name or number"""
+    if isinstance(level, int):
+        return level
+    return LEVELS.get(str(level).upper(), INFO)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # Size at which a day's log is rolled to a numbered segment
+DEFAULT_RETENTION_DAYS = 90
+
+_SWEEP = object()  # Compressor request: compress leftovers from earlier runs
+
+def log_segment_key(path):
+    """Chronological sort key for log files: a day's numbered segments come before its live file"""
+    parts = Path(path).name.split(".")
+    index = int(parts[1]) if len(parts) > 2 and parts[1].isdigit() else float("inf")
+    return parts[0], index
+
+class _Event(str):
+    """A JSON line destined for the event stream rather than the log"""
+
+class _Echo(str):
+    """A log line that is also printed to the console"""
+
+class _FlushRequest:
+    def __init__(self, sync=False):
+        self.sync = sync
+        self.done = threading.Event()
+
 class SecureWipeLogger:
-    def __init__(self, log_dir="logs"):
+    """Log file writer that keeps file and console I/O off the caller's thread
+
+    Entries go into a bounded queue drained by one writer thread, which
+    keeps the file open and writes whatever has accumulated in a single
+    call. When the queue is full, entries are dropped and counted rather
+    than blocking a wipe; the writer notes the count in the log. Entries at
+    a FLUSH_LEVELS level are never dropped: log() waits until they, and
+    everything queued before them, are written and fsynced.
+
+    The writer starts new files at midnight and rolls a day's file to a
+    numbered segment (wiper_20250101.1.log) once it would exceed
+    `max_bytes`. Finished files are gzipped by a second thread, which also
+    deletes files older than `retention_days`.
+
+    Entries below `level` are discarded before any formatting; with
+    `console`, entries at or above `console_level` are also printed.
+    """
+
+    def __init__(self, log_dir="logs", max_queue=10000, batch_size=512, console=False,
+                 flush_levels=FLUSH_LEVELS, max_bytes=DEFAULT_MAX_BYTES,
+                 retention_days=DEFAULT_RETENTION_DAYS, compress=True, level=DEBUG, console_level=INFO):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
-        self.log_file = self.log_dir / f"wiper_{datetime.now().strftime('%Y%m%d')}.log"
-        
-        # Create log file if not exists
-        if not self.log_file.exists():
-            with open(self.log_file, 'w') as f:
-                f.write(f"Secure Data Wiper Log - {datetime.now().isoformat()}\n")
-                f.write("="*80 + "\n")
-    
-    def log(self, message, level="INFO"):
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.compress = compress
+        self.batch_size = batch_size
+        # Echo entries to stdout from the writer thread
+        self.console = console
+        self.level = level_number(level)
+        self.console_level = level_number(console_level)
+        self.flush_levels = frozenset(flush_levels)
+
+        self.written = 0
+        self.rotations = 0
+        self.write_errors = 0
+        self.dropped = 0
+        self.dropped_by_level = {}
+        self._reported_drops = 0
+        self._drop_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._open_day(self._today())
+
+        self._compress_queue = queue.Queue()
+        self._compress_queue.put(_SWEEP)
+        self._compressor = threading.Thread(target=self._compress_rotated, name="SecureWipeLogger-compress",
+                                            daemon=True)
+        self._compressor.start()
+        self._thread = threading.Thread(target=self._run, name="SecureWipeLogger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _today(self):
+        return date.today()
+
+    def _open_day(self, day):
+        """Open (creating if needed) the log and event files for `day`"""
+        self._day = day
+        self.log_file = self.log_dir / f"wiper_{day.strftime('%Y%m%d')}.log"
+        # Structured events, one JSON object per line, next to the log
+        self.events_file = self.log_dir / f"events_{day.strftime('%Y%m%d')}.jsonl"
+        self._file = self._open_log(self.log_file)
+        self._events = open(self.events_file, 'a')
+
+    def _open_log(self, path):
+        f = open(path, 'a')
+        if f.tell() == 0:
+            f.write(f"Secure Data Wiper Log - {datetime.now().isoformat()}\n")
+            f.write("="*80 + "\n")
+        return f
+
+    def log(self, message, level="INFO", echo=None):
+        """Queue an entry; `echo` overrides the console_level decision for this entry"""
+        levelno = LEVELS.get(level, INFO)
+        if levelno < self.level:
+            return None
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] [{level}] {message}\n"
-        
-        # Write to file
-        with open(self.log_file, 'a') as f:
-            f.write(log_entry)
-        
+        if echo is None:
+            echo = self.console and levelno >= self.console_level
+        if echo:
+            log_entry = _Echo(log_entry)
+
+        if level in self.flush_levels and self._thread.is_alive():
+            self._queue.put(log_entry)
+            self.flush(sync=True)
+            return log_entry
+        try:
+            self._queue.put_nowait(log_entry)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+                self.dropped_by_level[level] = self.dropped_by_level.get(level, 0) + 1
         return log_entry
 
+    def event(self, event_type, **fields):
+        """Queue a structured event for the JSON Lines event stream"""
+        record = {"time": datetime.now().isoformat(), "event": event_type}
+        record.update(fields)
+        try:
+            self._queue.put_nowait(_Event(json.dumps(record, default=str) + "\n"))
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+                self.dropped_by_level["EVENT"] = self.dropped_by_level.get("EVENT", 0) + 1
+
+    def flush(self, sync=False, timeout=None):
+        """Wait until everything logged so far is written (and fsynced when `sync`)"""
+        if not self._thread.is_alive():
+            return False
+        request = _FlushRequest(sync)
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def stats(self):
+        """Counters for monitoring the logger itself"""
+        return {
+            "written": self.written,
+            "write_errors": self.write_errors,
+            "dropped": self.dropped,
+            "dropped_by_level": dict(self.dropped_by_level),
+            "queued": self._queue.qsize()
+        }
+
+    def close(self):
+        """Write out the queue, then stop the writer and compressor threads"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._compressor.is_alive():
+            self._compress_queue.put(None)
+            self._compressor.join()
+
+    def _run(self):
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not self._write(batch):
+                    return
+        finally:
+            self._file.close()
+            self._events.close()
+
+    def _write(self, batch):
+        """Write one batch; returns False once the stop marker is reached"""
+        lines = []
+        echoed = []
+        events = []
+        requests = []
+        running = True
+        for item in batch:
+            if item is None:
+                running = False
+            elif isinstance(item, _FlushRequest):
+                requests.append(item)
+            elif isinstance(item, _Event):
+                events.append(item)
+            else:
+                lines.append(item)
+                if isinstance(item, _Echo):
+                    echoed.append(item)
+
+        entries = len(lines)
+        dropped = self.dropped
+        if dropped != self._reported_drops:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            warning = (f"[{timestamp}] [WARNING] {dropped - self._reported_drops} log entries dropped "
+                       f"(queue full)\n")
+            lines.append(warning)
+            if self.console:
+                echoed.append(warning)
+            self._reported_drops = dropped
+
+        try:
+            text = "".join(lines)
+            event_text = "".join(events)
+            self._rotate(len(text), len(event_text))
+            if text:
+                self._file.write(text)
+                if echoed:
+                    sys.stdout.write("".join(echoed))
+                self.written += entries
+            if event_text:
+                self._events.write(event_text)
+                self._events.flush()
+            self._file.flush()
+            if any(request.sync for request in requests):
+                os.fsync(self._file.fileno())
+                os.fsync(self._events.fileno())
+        except (OSError, ValueError):
+            # A full or failing disk must not stop the wipe; count and carry on
+            self.write_errors += 1
+        finally:
+            for request in requests:
+                request.done.set()
+        return running
+
+    def _rotate(self, log_bytes, event_bytes):
+        """Start the day's files after midnight, or roll files that would outgrow max_bytes"""
+        today = self._today()
+        if today != self._day:
+            self._file.close()
+            self._events.close()
+            self._retire(self.log_file)
+            self._retire(self.events_file)
+            self._open_day(today)
+            return
+        if not self.max_bytes:
+            return
+        if log_bytes and 0 < self._file.tell() and self._file.tell() + log_bytes > self.max_bytes:
+            self._file.close()
+            self._retire(self._roll(self.log_file))
+            self._file = self._open_log(self.log_file)
+        if event_bytes and 0 < self._events.tell() and self._events.tell() + event_bytes > self.max_bytes:
+            self._events.close()
+            self._retire(self._roll(self.events_file))
+            self._events = open(self.events_file, 'a')
+
+    def _roll(self, path):
+        """Rename a full file to the day's next free segment number"""
+        stem, ext = path.name.split(".", 1)
+        number = 1
+        while any((self.log_dir / f"{stem}.{number}.{ext}{suffix}").exists() for suffix in ("", ".gz")):
+            number += 1
+        rolled = self.log_dir / f"{stem}.{number}.{ext}"
+        os.replace(path, rolled)
+        return rolled
+
+    def _retire(self, path):
+        self.rotations += 1
+        self._compress_queue.put(path)
+
+    def _compress_rotated(self):
+        while True:
+            path = self._compress_queue.get()
+            if path is None:
+                return
+            try:
+                if path is _SWEEP:
+                    for leftover in self._finished_files():
+                        if leftover.suffix != ".gz":
+                            self._gzip(leftover)
+                elif self.compress:
+                    self._gzip(path)
+                self._apply_retention()
+            except OSError:
+                self.write_errors += 1
+
+    def _finished_files(self):
+        """Log and event files other than the ones being written"""
+        current = (self.log_file, self.events_file)
+        return [path for pattern in ("wiper_*", "events_*") for path in self.log_dir.glob(pattern)
+                if path not in current and not path.name.endswith(".tmp")]
+
+    def _gzip(self, path):
+        if not self.compress or not path.exists():
+            return
+        compressed = path.with_name(path.name + ".gz")
+        tmp_path = path.with_name(path.name + ".gz.tmp")
+        with open(path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        # Keep the original modification time, which retention goes by
+        stat = path.stat()
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(tmp_path, compressed)
+        path.unlink()
+
+    def _apply_retention(self):
+        if not self.retention_days:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        for path in self._finished_files():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
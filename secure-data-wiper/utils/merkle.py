@@ -0,0 +1,145 @@
+"""
+Merkle Tree Module
+Region hashes of written content, provable in O(log n) against a single root
+"""
+
+import hashlib
+
+MERKLE_REGION_SIZE = 4 * 1024 * 1024  # 4MB leaves
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+def hash_leaf(region_data, algorithm="sha256"):
+    """Leaf hash of one region: H(0x00 || region)"""
+    h = hashlib.new(algorithm, LEAF_PREFIX)
+    h.update(region_data)
+    return h.digest()
+
+def hash_node(left, right, algorithm="sha256"):
+    """Interior node hash: H(0x01 || left || right)"""
+    return hashlib.new(algorithm, NODE_PREFIX + left + right).digest()
+
+class RegionHasher:
+    """Streams written data into per-region leaf hashes"""
+
+    def __init__(self, region_size=MERKLE_REGION_SIZE, algorithm="sha256"):
+        self.region_size = region_size
+        self.algorithm = algorithm
+        self.leaves = []
+        self.size = 0
+        self._current = None
+        self._filled = 0
+
+    def update(self, data):
+        """Add the next buffer of sequentially written data"""
+        view = memoryview(data)
+        while len(view):
+            if self._current is None:
+                self._current = hashlib.new(self.algorithm, LEAF_PREFIX)
+                self._filled = 0
+            take = min(self.region_size - self._filled, len(view))
+            self._current.update(view[:take])
+            self._filled += take
+            self.size += take
+            view = view[take:]
+            if self._filled == self.region_size:
+                self.leaves.append(self._current.digest())
+                self._current = None
+
+    def finish(self):
+        """Close the last partial region and return the tree"""
+        if self._current is not None:
+            self.leaves.append(self._current.digest())
+            self._current = None
+        return MerkleTree(self.leaves, self.region_size, self.size, self.algorithm)
+
+class MerkleTree:
+    """Binary Merkle tree over region leaf hashes
+
+    An odd node at the end of a level is promoted unchanged to the next
+    level, so a proof is at most ceil(log2(n)) sibling hashes.
+    """
+
+    def __init__(self, leaves, region_size=MERKLE_REGION_SIZE, size=None, algorithm="sha256"):
+        self.region_size = region_size
+        self.algorithm = algorithm
+        self.size = size if size is not None else len(leaves) * region_size
+        self.levels = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [hash_node(level[i], level[i + 1], algorithm) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @property
+    def leaves(self):
+        return self.levels[0]
+
+    @property
+    def root(self):
+        return self.levels[-1][0] if self.leaves else hashlib.new(self.algorithm).digest()
+
+    def proof(self, index):
+        """Sibling hashes from leaf `index` up to the root, as (side, hex digest) pairs"""
+        if not 0 <= index < len(self.leaves):
+            raise IndexError(f"Region {index} out of range")
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append(("left" if sibling < index else "right", level[sibling].hex()))
+            index //= 2
+        return path
+
+    def summary(self):
+        """Tree parameters and root for embedding in a certificate"""
+        return {
+            "algorithm": self.algorithm,
+            "region_size": self.region_size,
+            "size": self.size,
+            "leaf_count": len(self.leaves),
+            "root": self.root.hex(),
+            "leaf_hash": f"{self.algorithm}(0x00 || region)",
+            "node_hash": f"{self.algorithm}(0x01 || left || right)"
+        }
+
+    def save_leaves(self, path):
+        """Write the raw leaf digests so proofs can be produced later"""
+        with open(path, "wb") as f:
+            f.write(b"".join(self.leaves))
+
+    @classmethod
+    def load_leaves(cls, path, merkle_info):
+        """Rebuild a tree from a leaves file and a certificate's Merkle summary"""
+        digest_size = hashlib.new(merkle_info["algorithm"]).digest_size
+        with open(path, "rb") as f:
+            raw = f.read()
+        expected = merkle_info.get("leaves_sha256")
+        if expected and hashlib.sha256(raw).hexdigest() != expected:
+            raise ValueError(f"Leaves file {path} does not match the certificate")
+        leaves = [raw[i:i + digest_size] for i in range(0, len(raw), digest_size)]
+        return cls(leaves, merkle_info["region_size"], merkle_info["size"], merkle_info["algorithm"])
+
+def verify_proof(leaf_hash, proof, root_hex, algorithm="sha256"):
+    """Check a leaf hash against a root using a proof from MerkleTree.proof()"""
+    node = leaf_hash
+    for side, sibling_hex in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        node = hash_node(sibling, node, algorithm) if side == "left" else hash_node(node, sibling, algorithm)
+    return node.hex() == root_hex
+
+def audit_region(target_path, merkle_info, index, proof):
+    """Re-read region `index` of a target and prove it against the certificate root"""
+    region_size = merkle_info["region_size"]
+    start = index * region_size
+    length = min(region_size, merkle_info["size"] - start)
+    if length <= 0:
+        raise IndexError(f"Region {index} out of range")
+    with open(target_path, "rb") as f:
+        f.seek(start)
+        data = f.read(length)
+    if len(data) != length:
+        return False
+    return verify_proof(hash_leaf(data, merkle_info["algorithm"]), proof,
+                        merkle_info["root"], merkle_info["algorithm"])
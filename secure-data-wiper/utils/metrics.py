@@ -0,0 +1,276 @@
+"""
+Metrics Module
+Prometheus text-format metrics for long-running wipe stations
+
+    metrics = WipeMetrics()
+    engine.metrics = metrics
+    MetricsServer(metrics, "127.0.0.1:9464").start()      # or "/run/cleanslate/metrics.sock"
+"""
+
+import errno
+import ipaddress
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ADDRESS = "127.0.0.1:9464"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def device_label(path, whole_device=False):
+    """Name of the block device holding `path` (the path itself for device and image wipes)"""
+    if whole_device:
+        return str(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return str(path)
+    if stat.S_ISBLK(st.st_mode):
+        return str(path)
+    if hasattr(os, "major"):
+        dev = f"{os.major(st.st_dev)}:{os.minor(st.st_dev)}"
+        sys_path = f"/sys/dev/block/{dev}"
+        if os.path.exists(sys_path):
+            return "/dev/" + os.path.basename(os.path.realpath(sys_path))
+        return dev
+    return os.path.splitdrive(os.path.abspath(path))[0] or str(path)
+
+def is_loopback(host):
+    """Whether `host` (an address or a name) only reaches this machine"""
+    host = host.strip("[]")
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        pass
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except socket.gaierror:
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(a.split("%")[0]).is_loopback for a in addresses)
+
+def _remove_stale_socket(path):
+    """Unlink a socket left by a previous run; anything else at `path` is left alone"""
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError(errno.EEXIST, "Not a socket, refusing to replace it", path)
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        pass  # Nobody listening: stale
+    else:
+        raise OSError(errno.EADDRINUSE, "Socket is in use by another process", path)
+    finally:
+        probe.close()
+    os.unlink(path)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class JobProgress:
+    """Live counters of one wipe job
+
+    Only the engine thread writes these, with plain attribute stores from
+    its write loop; scrapes read them without locking. A scrape may see the
+    byte count one chunk behind the pass number, which is harmless here.
+    """
+
+    __slots__ = ("job_id", "operation", "target", "device", "passes", "size", "started",
+                 "pass_number", "pass_size", "pass_bytes", "pass_started", "bytes_written")
+
+    def __init__(self, job_id, operation, target, passes, size=None):
+        self.job_id = job_id
+        self.operation = operation
+        self.target = str(target)
+        self.device = None
+        self.passes = passes
+        self.size = size
+        self.started = time.monotonic()
+        self.pass_number = 0
+        self.pass_size = None
+        self.pass_bytes = 0
+        self.pass_started = self.started
+        self.bytes_written = 0
+
+    def start_pass(self, pass_number, size):
+        self.pass_number = pass_number
+        self.pass_size = size
+        self.pass_bytes = 0
+        self.pass_started = time.monotonic()
+
+class WipeMetrics:
+    """Counters shared by every engine in the process, rendered on scrape
+
+    Engines register a JobProgress when a job starts and hand it back when
+    it ends; only those two calls and scrapes take the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}
+        self._finished_bytes = {}
+        self._jobs = {}
+        self._errors = {}
+        self._gauges = []
+
+    def job_started(self, job):
+        job.device = device_label(job.target, job.operation == "device")
+        with self._lock:
+            self._active[id(job)] = job
+
+    def job_finished(self, job, status):
+        with self._lock:
+            if self._active.pop(id(job), None) is None:
+                return
+            self._finished_bytes[job.device] = self._finished_bytes.get(job.device, 0) + job.bytes_written
+            key = (job.operation, status)
+            self._jobs[key] = self._jobs.get(key, 0) + 1
+
+    def error(self, operation):
+        with self._lock:
+            self._errors[operation] = self._errors.get(operation, 0) + 1
+
+    def add_gauge(self, name, help_text, read):
+        """Export `read()` (e.g. a queue's size) as gauge `cleanslate_<name>` on every scrape"""
+        self._gauges.append((f"cleanslate_{name}", help_text, read))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        now = time.monotonic()
+        with self._lock:
+            active = list(self._active.values())
+            bytes_by_device = dict(self._finished_bytes)
+            jobs = dict(self._jobs)
+            errors = dict(self._errors)
+        for job in active:
+            bytes_by_device[job.device] = bytes_by_device.get(job.device, 0) + job.bytes_written
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+        metric("cleanslate_active_jobs", "gauge", "Wipe jobs in progress", [(None, len(active))])
+        metric("cleanslate_bytes_written_total", "counter", "Bytes written by wipe passes per device",
+               [({"device": device}, count) for device, count in sorted(bytes_by_device.items())])
+        metric("cleanslate_jobs_total", "counter", "Finished wipe jobs by operation and status",
+               [({"operation": operation, "status": status}, count)
+                for (operation, status), count in sorted(jobs.items())])
+        metric("cleanslate_errors_total", "counter", "Errors reported by wipe jobs",
+               [({"operation": operation}, count) for operation, count in sorted(errors.items())])
+
+        labels = [{"job": job.job_id, "operation": job.operation, "device": job.device, "target": job.target}
+                  for job in active]
+        metric("cleanslate_job_pass", "gauge", "Current pass of each active job",
+               [(label, job.pass_number) for label, job in zip(labels, active)])
+        metric("cleanslate_job_passes", "gauge", "Total passes of each active job",
+               [(label, job.passes) for label, job in zip(labels, active)])
+        metric("cleanslate_job_pass_progress_ratio", "gauge", "Fraction of the current pass written",
+               [(label, min(job.pass_bytes / job.pass_size, 1.0)) for label, job in zip(labels, active)
+                if job.pass_size])
+        metric("cleanslate_job_bytes_written", "gauge", "Bytes written so far by each active job",
+               [(label, job.bytes_written) for label, job in zip(labels, active)])
+        metric("cleanslate_job_throughput_bytes_per_second", "gauge",
+               "Write rate of each active job over its current pass",
+               [(label, job.pass_bytes / (now - job.pass_started)) for label, job in zip(labels, active)
+                if now > job.pass_started])
+        metric("cleanslate_job_average_throughput_bytes_per_second", "gauge",
+               "Write rate of each active job since it started",
+               [(label, job.bytes_written / (now - job.started)) for label, job in zip(labels, active)
+                if now > job.started])
+
+        for name, help_text, read in self._gauges:
+            try:
+                value = read()
+            except Exception:
+                continue
+            metric(name, "gauge", help_text, [(None, value)])
+        return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood stderr
+
+    def address_string(self):
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+if hasattr(socket, "AF_UNIX"):
+    class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def get_request(self):
+            request, _ = super().get_request()
+            return request, ("unix", 0)
+else:
+    _UnixHTTPServer = None
+
+class MetricsServer:
+    """Serves WipeMetrics over HTTP on a background thread
+
+    `address` is "host:port", a bare port (bound to 127.0.0.1), or a
+    filesystem path for a Unix socket. The metrics name every device and
+    target being wiped, so hosts other than loopback (e.g. 0.0.0.0) are
+    refused unless `allow_remote` is set.
+    """
+
+    def __init__(self, metrics, address=DEFAULT_ADDRESS, allow_remote=False):
+        self.metrics = metrics
+        self.address = str(address)
+        self.unix_path = None
+        if "/" in self.address or self.address.endswith(".sock"):
+            if _UnixHTTPServer is None:
+                raise OSError("Unix sockets are not supported on this platform")
+            self.unix_path = self.address
+            _remove_stale_socket(self.unix_path)
+            self._server = _UnixHTTPServer(self.unix_path, _MetricsHandler)
+        else:
+            host, _, port = self.address.rpartition(":")
+            host = host or "127.0.0.1"
+            if not allow_remote and not is_loopback(host):
+                raise ValueError(f"Refusing to serve metrics on non-loopback host {host} "
+                                 "without allow_remote")
+            self._server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+        self._server.metrics = metrics
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+
+    @property
+    def port(self):
+        return None if self.unix_path else self._server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._thread.is_alive():
+            self._server.shutdown()
+        self._server.server_close()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
@@ -0,0 +1,184 @@
+"""
+Profiling Module
+Optional cProfile and tracemalloc profiling of wipe jobs, with a report written next to the job log
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Built-in calls that spend their time in the kernel doing I/O
+IO_CALLS = frozenset(("fsync", "fdatasync", "write", "read", "readinto", "readline", "pread", "pwrite",
+                      "preadv", "pwritev", "flush", "open", "close", "lseek", "seek", "truncate",
+                      "posix_fadvise", "stat", "fstat", "rename", "replace", "remove", "unlink", "ioctl"))
+
+# Built-ins that block on other threads (verify-behind, background hashing)
+WAIT_CALLS = frozenset(("acquire", "acquire_lock", "sleep"))
+
+_BUILTIN_NAME = re.compile(r"<(?:built-in method (?:\w+\.)*(\w+)|method '(\w+)' of .*)>")
+
+def builtin_name(function):
+    """Bare name of a built-in from a pstats function label ("<built-in method posix.fsync>" -> "fsync")"""
+    match = _BUILTIN_NAME.fullmatch(function)
+    return match and (match.group(1) or match.group(2))
+
+def builtin_time(stats, names):
+    """Seconds and calls spent inside the named built-ins, from a pstats.Stats"""
+    seconds = 0.0
+    calls = 0
+    for (filename, _, function), (_, total_calls, own_time, _, _) in stats.stats.items():
+        if filename == "~" and builtin_name(function) in names:
+            seconds += own_time
+            calls += total_calls
+    return seconds, calls
+
+def _format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+
+class JobProfiler:
+    """Profiles each job of the engines it is attached to
+
+    The engine runs each top-level job through run(), and reports the
+    job and its passes through the job_* and pass_* hooks. cProfile
+    follows the thread running the job only. With `trace_memory`,
+    tracemalloc (process-wide) records how far each pass raised Python's
+    allocated memory. Every job leaves a text
+    report (profile_<job>.txt) and the raw cProfile data
+    (profile_<job>.prof, for pstats or snakeviz) in `report_dir`.
+    """
+
+    def __init__(self, report_dir="logs", trace_memory=False, top=25):
+        self.report_dir = Path(report_dir)
+        self.trace_memory = trace_memory
+        self.top = top
+        self.reports = []
+        self._profile = None
+        self._job = None
+
+    def run(self, function, *args, **kwargs):
+        """Call `function` (a wipe job) under the profiler; returns (its result, report path or None)"""
+        if self._profile is not None:
+            return function(*args, **kwargs), None  # One job at a time
+        profile = self._profile = cProfile.Profile()
+        self._job = None
+        self._status = None
+        self._passes = {}
+        self._pass_state = None
+        started_tracing = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        times = os.times()
+        wall = time.perf_counter()
+        try:
+            try:
+                profile.enable()
+            except ValueError:
+                return function(*args, **kwargs), None  # Another profiler is active on this thread
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                profile.disable()
+            wall = time.perf_counter() - wall
+            end_times = os.times()
+            allocation_sites = None
+            if tracemalloc.is_tracing():
+                allocation_sites = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            if self._job is None:
+                return result, None
+            return result, self._write_report(wall, end_times.user - times.user,
+                                              end_times.system - times.system, allocation_sites)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._profile = None
+
+    def job_started(self, job):
+        if self._profile is not None and self._job is None:
+            self._job = job
+
+    def job_finished(self, job, status):
+        if job is self._job:
+            self._status = status
+
+    def pass_started(self, job, pass_number):
+        if job is not self._job:
+            return
+        current = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        if tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._pass_state = (pass_number, time.perf_counter(), current)
+
+    def pass_finished(self, job, pass_number):
+        if job is not self._job or self._pass_state is None:
+            return
+        number, started, before = self._pass_state
+        self._pass_state = None
+        entry = self._passes.setdefault(number, {"seconds": 0.0, "runs": 0, "allocated": 0, "peak": 0})
+        entry["seconds"] += time.perf_counter() - started
+        entry["runs"] += 1
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            entry["allocated"] = max(entry["allocated"], peak - before)
+            entry["peak"] = max(entry["peak"], peak)
+
+    def _write_report(self, wall, user, system, allocation_sites):
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self._job.job_id}"
+        self._profile.dump_stats(str(self.report_dir / f"{stem}.prof"))
+        report_path = self.report_dir / f"{stem}.txt"
+        with open(report_path, "w") as f:
+            f.write(self.render(self._job, self._status, wall, user, system, allocation_sites))
+        self.reports.append(report_path)
+        return report_path
+
+    def render(self, job, status, wall, user, system, allocation_sites=None):
+        buffer = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=buffer)
+        io_seconds, io_calls = builtin_time(stats, IO_CALLS)
+        wait_seconds, _ = builtin_time(stats, WAIT_CALLS)
+        profiled = stats.total_tt
+
+        def share(seconds):
+            return f"{seconds:.3f} s ({seconds / profiled * 100 if profiled else 0:.1f}%)"
+
+        lines = [
+            f"Wipe job profile: {job.job_id}",
+            f"Operation: {job.operation}  Target: {job.target}  Status: {status}",
+            f"Wall time: {wall:.3f} s  Bytes written: {job.bytes_written:,}",
+            f"Process CPU: user {user:.3f} s, system {system:.3f} s",
+            f"Profiled thread: {profiled:.3f} s",
+            f"  I/O system calls:           {share(io_seconds)} in {io_calls:,} calls",
+            f"  Waiting on other threads:   {share(wait_seconds)}",
+            f"  Python and other built-ins: {share(profiled - io_seconds - wait_seconds)}",
+            "",
+            "PASSES",
+            "-" * 40
+        ]
+        for number, entry in sorted(self._passes.items()):
+            line = f"Pass {number}: {entry['seconds']:.3f} s"
+            if entry["runs"] > 1:
+                line += f" over {entry['runs']} files"
+            if self.trace_memory:
+                line += (f", allocated {_format_bytes(entry['allocated'])} "
+                         f"(traced peak {_format_bytes(entry['peak'])})")
+            lines.append(line)
+
+        if allocation_sites:
+            lines += ["", "LARGEST LIVE ALLOCATIONS AT JOB END", "-" * 40]
+            lines += [f"{_format_bytes(stat.size):>10}  {stat.count:>7,} blocks  {stat.traceback}"
+                      for stat in allocation_sites]
+
+        lines += ["", f"TOP {self.top} FUNCTIONS BY OWN TIME", "-" * 40]
+        stats.sort_stats("tottime").print_stats(self.top)
+        lines.append(buffer.getvalue().strip("\n"))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,276 @@
+"""
+Residual Data Scanner
+Searches a wiped device or image for recognisable data left behind
+"""
+
+import importlib.util
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# NumPy is imported when the first scanner is built, keeping it off the
+# startup path of the wipe engine
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+SEGMENT_SIZE = 64 * 1024 * 1024  # Work unit handed to each process
+SCAN_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_REPORTED_HITS = 10000
+# A pattern is residual data once chance alone explains its hit count with
+# probability below this (per pattern)
+RESIDUAL_P_VALUE = 1e-6
+
+# File magic numbers (4+ bytes to keep chance matches on random data rare)
+FILE_SIGNATURES = {
+    "PDF document": b"%PDF-",
+    "ZIP / Office Open XML": b"PK\x03\x04",
+    "PNG image": b"\x89PNG\r\n\x1a\n",
+    "JPEG image (JFIF)": b"\xff\xd8\xff\xe0",
+    "JPEG image (Exif)": b"\xff\xd8\xff\xe1",
+    "GIF image": b"GIF89a",
+    "GIF image (87a)": b"GIF87a",
+    "SQLite database": b"SQLite format 3\x00",
+    "ELF executable": b"\x7fELF",
+    "Windows executable": b"This program cannot be run in DOS mode",
+    "OLE2 / legacy Office": b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",
+    "RAR archive": b"Rar!\x1a\x07",
+    "7-Zip archive": b"7z\xbc\xaf\x27\x1c",
+    "MP4 video": b"ftypisom",
+    "Ogg media": b"OggS\x00",
+    "WAV audio": b"WAVEfmt ",
+    "Outlook PST": b"!BDN",
+}
+
+# Filesystem and partitioning structures
+FILESYSTEM_SIGNATURES = {
+    "NTFS boot sector": b"\xebR\x90NTFS    ",
+    "FAT32 boot sector": b"FAT32   ",
+    "exFAT boot sector": b"\xebv\x90EXFAT   ",
+    "GPT header": b"EFI PART",
+    "LUKS header": b"LUKS\xba\xbe",
+    "XFS superblock": b"XFSB",
+    "Btrfs superblock": b"_BHRfS_M",
+    "Linux swap": b"SWAPSPACE2",
+    "ISO 9660 volume": b"\x01CD001",
+}
+
+def _poisson_tail(count, mean):
+    """P(X >= count) for X ~ Poisson(mean): how likely chance alone gives `count` hits"""
+    if count <= 0:
+        return 1.0
+    if mean <= 0:
+        return 0.0
+    if count <= mean:
+        return 0.5  # Not in the upper tail
+    log_term = -mean + count * math.log(mean) - math.lgamma(count + 1)
+    if log_term < -700:
+        return 0.0
+    term = total = math.exp(log_term)
+    j = count
+    while term > total * 1e-12:
+        j += 1
+        term *= mean / j
+        total += term
+    return min(total, 1.0)
+
+def build_patterns(signatures=None, canaries=()):
+    """Return (name, bytes) search patterns, canaries in UTF-8 and UTF-16LE"""
+    if signatures is None:
+        signatures = {**FILE_SIGNATURES, **FILESYSTEM_SIGNATURES}
+    patterns = list(signatures.items())
+    for canary in canaries:
+        if isinstance(canary, bytes):
+            patterns.append((f"canary {canary!r}", canary))
+            continue
+        patterns.append((f"canary '{canary}'", canary.encode("utf-8")))
+        patterns.append((f"canary '{canary}' (UTF-16)", canary.encode("utf-16-le")))
+    for name, pattern in patterns:
+        if len(pattern) < 2:
+            raise ValueError(f"Pattern '{name}' must be at least 2 bytes long")
+    return patterns
+
+class MultiPatternMatcher:
+    """Finds every occurrence of many byte patterns in one pass over a buffer
+
+    Like Aho-Corasick, the buffer is scanned once regardless of the number of
+    patterns: a 2-byte prefix table (vectorised with NumPy) marks candidate
+    positions, which are then confirmed against the patterns sharing that
+    prefix. Without NumPy a compiled regex alternation is used instead.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+        self.max_length = max(len(p) for _, p in patterns)
+        self.by_prefix = {}
+        for name, pattern in patterns:
+            key = pattern[0] | (pattern[1] << 8)
+            self.by_prefix.setdefault(key, []).append((name, pattern))
+
+        if HAS_NUMPY:
+            import numpy as np
+            self.prefix_table = np.zeros(65536, dtype=bool)
+            self.prefix_table[list(self.by_prefix)] = True
+        else:
+            ordered = sorted({p for _, p in patterns}, key=len, reverse=True)
+            self.regex = re.compile(b"(?=(" + b"|".join(re.escape(p) for p in ordered) + b"))")
+
+    def _candidates(self, data, limit):
+        """Positions below `limit` whose 2-byte prefix belongs to some pattern"""
+        import numpy as np
+        arr = np.frombuffer(data, dtype=np.uint8)
+        n = len(arr)
+        even = arr[:n - n % 2].view("<u2")
+        odd = arr[1:1 + (n - 1) - (n - 1) % 2].view("<u2")
+        positions = np.concatenate((np.flatnonzero(self.prefix_table[even]) * 2,
+                                    np.flatnonzero(self.prefix_table[odd]) * 2 + 1))
+        positions.sort()
+        return positions[positions < limit]
+
+    def find(self, data, limit=None):
+        """Yield (position, name) for matches starting before `limit`"""
+        if limit is None:
+            limit = len(data)
+
+        if not HAS_NUMPY:
+            for match in self.regex.finditer(data, 0, min(len(data), limit + self.max_length)):
+                if match.start() >= limit:
+                    break
+                found = match.group(1)
+                for name, pattern in self.by_prefix[found[0] | (found[1] << 8)]:
+                    if data.startswith(pattern, match.start()):
+                        yield match.start(), name
+            return
+
+        for position in self._candidates(data, limit):
+            position = int(position)
+            for name, pattern in self.by_prefix[data[position] | (data[position + 1] << 8)]:
+                if data.startswith(pattern, position):
+                    yield position, name
+
+def _scan_segment(path, start, end, patterns, chunk_size, max_hits):
+    """Worker: scan [start, end) of a target, reading past `end` for overlaps"""
+    matcher = MultiPatternMatcher(patterns)
+    overlap = matcher.max_length - 1
+    hits = []
+    counts = {}
+
+    with open(path, "rb", buffering=0) as f:
+        offset = start
+        while offset < end:
+            f.seek(offset)
+            length = min(chunk_size, end - offset)
+            data = f.read(length + overlap)
+            if not data:
+                break
+            for position, name in matcher.find(data, limit=min(length, len(data))):
+                counts[name] = counts.get(name, 0) + 1
+                if len(hits) < max_hits:
+                    hits.append((offset + position, name))
+            offset += length
+
+    return start, min(offset, end) - start, hits, counts
+
+class ResidualScanner:
+    """Scans a device or image across worker processes for residual data
+
+    Short signatures also occur by chance in random data (a 4-byte one about
+    once per 4 GiB), so after a random final pass a pattern only counts as
+    residual when its hits clearly exceed the number expected by chance.
+    After a fixed-pattern pass every hit counts.
+    """
+
+    def __init__(self, signatures=None, canaries=(), workers=None,
+                 segment_size=SEGMENT_SIZE, chunk_size=SCAN_CHUNK_SIZE, max_hits=MAX_REPORTED_HITS):
+        self.patterns = build_patterns(signatures, canaries)
+        self.workers = workers or os.cpu_count() or 1
+        self.segment_size = segment_size
+        self.chunk_size = chunk_size
+        self.max_hits = max_hits
+
+    def scan(self, path, size=None, stop_flag=None, progress_callback=None, random_fill=True):
+        """Scan `path` and return a report of every pattern hit
+
+        `random_fill` says the final pass wrote random data; the report's
+        `residual` is then judged against chance matches.
+        """
+        if size is None:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                size = os.lseek(fd, 0, os.SEEK_END)
+            finally:
+                os.close(fd)
+
+        segments = [(start, min(start + self.segment_size, size))
+                    for start in range(0, size, self.segment_size)]
+        hits = []
+        counts = {}
+        bytes_scanned = 0
+        start_time = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=max(1, min(self.workers, len(segments)))) as pool:
+            futures = [pool.submit(_scan_segment, path, start, end, self.patterns,
+                                   self.chunk_size, self.max_hits) for start, end in segments]
+            for future in as_completed(futures):
+                if stop_flag is not None and stop_flag.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                _, scanned, segment_hits, segment_counts = future.result()
+                bytes_scanned += scanned
+                hits.extend(segment_hits)
+                for name, count in segment_counts.items():
+                    counts[name] = counts.get(name, 0) + count
+                if progress_callback:
+                    progress_callback(bytes_scanned, size)
+
+        duration = time.perf_counter() - start_time
+        hits.sort()
+
+        # Chance matches expected in the bytes scanned if they held only random data
+        expected = {name: bytes_scanned / 256 ** len(pattern) if random_fill else 0.0
+                    for name, pattern in self.patterns}
+        residual_hits = {name: count for name, count in counts.items()
+                         if _poisson_tail(count, expected[name]) < RESIDUAL_P_VALUE}
+
+        return {
+            "target": path,
+            "size": size,
+            "bytes_scanned": bytes_scanned,
+            "complete": bytes_scanned == size,
+            "patterns": len(self.patterns),
+            "hit_count": sum(counts.values()),
+            "hit_counts": counts,
+            "hits": [{"offset": offset, "pattern": name} for offset, name in hits[:self.max_hits]],
+            "hits_truncated": sum(counts.values()) > self.max_hits,
+            "expected_random_hits": expected,
+            "residual_hits": residual_hits,
+            "residual": bool(residual_hits),
+            "duration": duration,
+            "throughput_mbps": (bytes_scanned / (1024 * 1024)) / duration if duration > 0 else 0.0
+        }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan a wiped device or image for residual data")
+    parser.add_argument("target", help="Device or image file to scan")
+    parser.add_argument("--canary", action="append", default=[], help="Canary string to search for (repeatable)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--fixed-fill", action="store_true",
+                        help="The final pass wrote a fixed pattern, so every hit is residual data")
+    args = parser.parse_args()
+
+    scanner = ResidualScanner(canaries=args.canary, workers=args.workers)
+    report = scanner.scan(args.target, random_fill=not args.fixed_fill)
+
+    print(f"Scanned {report['bytes_scanned']:,} bytes in {report['duration']:.1f}s "
+          f"({report['throughput_mbps']:.1f} MB/s)")
+    for name, count in sorted(report["hit_counts"].items()):
+        verdict = "RESIDUAL" if name in report["residual_hits"] else "chance"
+        print(f"  {name}: {count} hit(s), {report['expected_random_hits'][name]:.3f} expected by chance ({verdict})")
+    for hit in report["hits"][:50]:
+        if hit["pattern"] in report["residual_hits"]:
+            print(f"  0x{hit['offset']:012x}  {hit['pattern']}")
+    sys.exit(1 if report["residual"] else 0)
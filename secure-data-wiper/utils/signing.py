@@ -0,0 +1,169 @@
+"""
+Certificate Signing Module
+Ed25519 signatures for wipe certificates using a local key file
+"""
+
+import base64
+import hashlib
+import importlib.util
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from utils import cbor
+except ImportError:
+    import cbor
+
+# Like ReportLab, cryptography is only imported when a key is first used
+HAS_CRYPTOGRAPHY = importlib.util.find_spec("cryptography") is not None
+
+SIGNATURE_ALGORITHM = "Ed25519"
+LEGACY_ALGORITHM = "SHA-512"  # Unkeyed digest written before signing keys existed
+
+def signing_payload(cert_data, encoding=None):
+    """Canonical bytes covered by a certificate's signature
+
+    Certificates are signed over their deterministic CBOR encoding; older
+    ones (no "encoding" in the signature block) over sorted-key JSON.
+    """
+    if encoding is None:
+        encoding = (cert_data.get("digital_signature") or {}).get("encoding", "json")
+    data_copy = cert_data.copy()
+    data_copy.pop("digital_signature", None)
+    if encoding == "cbor":
+        return cbor.dumps(data_copy)
+    return json.dumps(data_copy, sort_keys=True).encode()
+
+def public_key_id(public_key_bytes):
+    """Short fingerprint identifying a raw Ed25519 public key"""
+    return hashlib.sha256(public_key_bytes).hexdigest()[:16]
+
+class CertificateSigner:
+    """Signs certificates with an Ed25519 key kept in a local PEM file
+
+    The key pair is generated on first use; the private key is written
+    with owner-only permissions and the public key next to it as .pub.pem.
+    """
+
+    def __init__(self, key_path):
+        self.key_path = Path(key_path)
+        self._private_key = None
+
+    @property
+    def public_key_path(self):
+        return self.key_path.with_suffix(".pub.pem")
+
+    @property
+    def private_key(self):
+        if self._private_key is None:
+            from cryptography.hazmat.primitives import serialization
+            from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+            if self.key_path.exists():
+                with open(self.key_path, "rb") as f:
+                    self._private_key = serialization.load_pem_private_key(f.read(), password=None)
+            else:
+                self._private_key = Ed25519PrivateKey.generate()
+                self.key_path.parent.mkdir(parents=True, exist_ok=True)
+                pem = self._private_key.private_bytes(serialization.Encoding.PEM,
+                                                      serialization.PrivateFormat.PKCS8,
+                                                      serialization.NoEncryption())
+                fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(pem)
+                with open(self.public_key_path, "wb") as f:
+                    f.write(self._private_key.public_key().public_bytes(
+                        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo))
+        return self._private_key
+
+    @property
+    def public_key_bytes(self):
+        from cryptography.hazmat.primitives import serialization
+        return self.private_key.public_key().public_bytes(serialization.Encoding.Raw,
+                                                          serialization.PublicFormat.Raw)
+
+    @property
+    def key_id(self):
+        return public_key_id(self.public_key_bytes)
+
+    def sign(self, cert_data, payload=None):
+        """Return the digital_signature block for a certificate (or its CBOR payload)"""
+        if payload is None:
+            payload = signing_payload(cert_data, "cbor")
+        signature = self.private_key.sign(payload)
+        public_key = self.public_key_bytes
+        return {
+            "algorithm": SIGNATURE_ALGORITHM,
+            "encoding": "cbor",
+            "signature": base64.b64encode(signature).decode(),
+            "public_key": public_key.hex(),
+            "key_id": public_key_id(public_key),
+            "timestamp": datetime.now().isoformat()
+        }
+
+def legacy_signature(cert_data):
+    """Unkeyed SHA-512 digest, used when cryptography is not installed"""
+    return {
+        "algorithm": LEGACY_ALGORITHM,
+        "signature": hashlib.sha512(signing_payload(cert_data, "json")).hexdigest(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+def verify_signature(cert_data, trusted_keys=None, payload=None):
+    """Check a certificate's signature
+
+    `trusted_keys` is a collection of key IDs; when given, a certificate
+    is only valid if it carries an Ed25519 signature by one of them, and an
+    empty collection rejects every certificate. Legacy SHA-512 digests can
+    be recomputed by anyone, so they are never valid against a trust set:
+    a matching digest is reported as `integrity_only`. With `trusted_keys`
+    None only integrity is checked. `payload` is the signed bytes when read
+    straight from a CBOR certificate file, which saves re-encoding the
+    certificate.
+    """
+    signature = cert_data.get("digital_signature") or {}
+    algorithm = signature.get("algorithm")
+    result = {"valid": False, "trusted": False, "algorithm": algorithm, "key_id": signature.get("key_id")}
+
+    if algorithm == LEGACY_ALGORITHM:
+        matches = hashlib.sha512(signing_payload(cert_data, "json")).hexdigest() == signature.get("signature")
+        result["integrity_only"] = matches
+        if not matches:
+            result["message"] = "Certificate signature verification failed"
+        elif trusted_keys is not None:
+            result["message"] = "Unsigned legacy certificate: the digest matches but anyone could have computed it"
+        else:
+            result["valid"] = True
+            result["message"] = "Certificate digest matches (unsigned legacy certificate)"
+        return result
+
+    if algorithm != SIGNATURE_ALGORITHM:
+        result["message"] = f"Unsupported signature algorithm: {algorithm}"
+        return result
+    if not HAS_CRYPTOGRAPHY:
+        result["message"] = "Ed25519 verification requires the cryptography package"
+        return result
+
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+
+    try:
+        public_key = bytes.fromhex(signature["public_key"])
+        result["key_id"] = public_key_id(public_key)
+        if payload is None:
+            payload = signing_payload(cert_data)
+        Ed25519PublicKey.from_public_bytes(public_key).verify(base64.b64decode(signature["signature"]), payload)
+    except (InvalidSignature, KeyError, ValueError):
+        result["message"] = "Certificate signature verification failed"
+        return result
+
+    result["trusted"] = trusted_keys is not None and result["key_id"] in trusted_keys
+    if trusted_keys is not None and not result["trusted"]:
+        result["message"] = (f"Certificate signed by untrusted key {result['key_id']}" if trusted_keys
+                             else "No trusted signing keys configured")
+        return result
+    result["valid"] = True
+    result["message"] = "Certificate is valid and authentic"
+    return result
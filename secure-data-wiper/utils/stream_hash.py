@@ -0,0 +1,102 @@
+"""
+Stream Hash Module
+Hashes the data written by a wipe pass on a helper thread
+"""
+
+import hashlib
+import queue
+import threading
+
+HASH_ALGORITHMS = ("sha256", "blake2b")
+HANDOFF_SIZE = 1024 * 1024  # Small writes are gathered into 1MB hand-offs
+MAX_PENDING = 16
+
+class BackgroundHasher(threading.Thread):
+    """Feeds written buffers to a digest and/or a Merkle RegionHasher
+
+    hashlib releases the GIL while hashing large buffers, so the work
+    overlaps with the writer's I/O instead of adding to it.
+    """
+
+    def __init__(self, algorithm="sha256", region_hasher=None, max_pending=MAX_PENDING):
+        super().__init__(daemon=True)
+        if algorithm is not None and algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unsupported stream hash algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.digest = hashlib.new(algorithm) if algorithm else None
+        self.region_hasher = region_hasher
+        self.bytes_hashed = 0
+        self.error = None
+        self._queue = queue.Queue(max_pending)
+        self._pending = []
+        self._pending_size = 0
+
+    def update(self, data):
+        """Queue the next written buffer (must not be modified afterwards)"""
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= HANDOFF_SIZE:
+            self._handoff()
+
+    def _handoff(self):
+        if not self._pending:
+            return
+        data = self._pending[0] if len(self._pending) == 1 else b"".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        self._put(data)
+
+    def _put(self, item):
+        # Never block forever on a hasher thread that has died
+        while True:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if not self.is_alive():
+                    return
+
+    def run(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            try:
+                if self.digest is not None:
+                    self.digest.update(data)
+                if self.region_hasher is not None:
+                    self.region_hasher.update(data)
+                self.bytes_hashed += len(data)
+            except Exception as e:
+                self.error = e
+                return
+
+    def stop(self):
+        """Abandon hashing, e.g. when the wipe is cancelled or fails"""
+        self._pending = []
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._put(None)
+        self.join()
+
+    def finish(self):
+        """Hash any remaining data and wait for the helper thread"""
+        self._handoff()
+        self._put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+        return self.summary()
+
+    def summary(self):
+        """Digest of everything written, for wipe stats and certificates"""
+        if self.digest is None:
+            return None
+        return {
+            "algorithm": self.algorithm,
+            "digest": self.digest.hexdigest(),
+            "bytes": self.bytes_hashed
+        }
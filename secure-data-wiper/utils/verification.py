@@ -0,0 +1,569 @@
+"""
+Wipe Verification Module
+Reads a wiped target back and compares it with the content of the final pass
+"""
+
+import os
+import importlib.util
+import mmap
+import time
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from utils.keystream import Keystream
+    from utils.byte_statistics import RegionStatistics, REGION_SIZE
+except ImportError:
+    from keystream import Keystream
+    from byte_statistics import RegionStatistics, REGION_SIZE
+
+# NumPy is imported on first comparison, keeping it off the startup path
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+READ_CHUNK_SIZE = 4 * 1024 * 1024  # 4MB read buffers
+SECTOR_SIZE = 512
+SAMPLE_SECTOR_SIZE = 4096
+MAX_RECORDED_OFFSETS = 10000
+DIRECT_IO_ALIGNMENT = 4096
+
+# Page-cache policies for verification reads:
+#   "drop"   - fsync and evict the target from the page cache before reading
+#   "direct" - O_DIRECT reads into aligned buffers (falls back to "drop" where
+#              O_DIRECT is rejected; reports say which policy the reads got)
+#   "none"   - plain buffered reads, may be served from RAM
+CACHE_MODES = ("drop", "direct", "none")
+
+class ExpectedContent:
+    """Reproduces the bytes a wipe pass wrote at any offset"""
+
+    def __init__(self, pattern_data=None, keystream=None):
+        if pattern_data is None and keystream is None:
+            raise ValueError("Either pattern data or a keystream is required")
+        self.pattern_data = pattern_data
+        self.keystream = keystream
+        self._tiled = b""
+
+    @property
+    def is_random(self):
+        return self.keystream is not None
+
+    def read(self, offset, length):
+        """Return the `length` bytes expected at byte `offset`"""
+        if self.keystream is not None:
+            return self.keystream.read(offset, length)
+
+        pattern_len = len(self.pattern_data)
+        phase = offset % pattern_len
+        if len(self._tiled) < phase + length:
+            repeats = (phase + length) // pattern_len + 1
+            self._tiled = self.pattern_data * repeats
+        return self._tiled[phase:phase + length]
+
+    def copy(self):
+        """Independent copy safe to use from another thread"""
+        if self.keystream is not None:
+            return ExpectedContent(keystream=Keystream(self.keystream.seed))
+        return ExpectedContent(pattern_data=self.pattern_data)
+
+    def describe(self):
+        """Short description of the expected content for reports"""
+        if self.keystream is not None:
+            return "random keystream"
+        return f"pattern 0x{self.pattern_data[:4].hex()}"
+
+def get_target_size(path):
+    """Size of a file or block device in bytes"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.lseek(fd, 0, os.SEEK_END)
+    finally:
+        os.close(fd)
+
+def drop_page_cache(path, offset=0, length=0):
+    """Flush a target and evict it (or one range of it) from the OS page cache"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+class TargetReader:
+    """Positional reads from a target, optionally bypassing the page cache"""
+
+    def __init__(self, path, direct=False, buffer_size=READ_CHUNK_SIZE):
+        self.path = path
+        self.direct = False
+        self.cache_dropped = False
+        fd = None
+        if direct and hasattr(os, "O_DIRECT"):
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_DIRECT)
+                self.direct = True
+            except OSError:
+                # Filesystem does not support O_DIRECT (e.g. tmpfs)
+                fd = None
+        if fd is None:
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            if direct:
+                # Evict the target instead, so reads still come from the medium
+                self.cache_dropped = drop_page_cache(path)
+        self.file = os.fdopen(fd, "rb", buffering=0)
+        
+        # Anonymous mmaps are page aligned, as O_DIRECT requires
+        self.buffer_size = -(-(buffer_size + DIRECT_IO_ALIGNMENT) // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+        self._buffer = mmap.mmap(-1, self.buffer_size)
+
+    @property
+    def cache_mode(self):
+        """Cache policy the reads actually get: "direct", "drop" or "none" """
+        if self.direct:
+            return "direct"
+        return "drop" if self.cache_dropped else "none"
+
+    def read_at(self, offset, length):
+        """Return a view of up to `length` bytes at `offset`, valid until the next read"""
+        start = offset % DIRECT_IO_ALIGNMENT if self.direct else 0
+        span = start + length
+        if self.direct:
+            span = -(-span // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+        if span > self.buffer_size:
+            raise ValueError(f"Read of {length} bytes exceeds reader buffer")
+        
+        self.file.seek(offset - start)
+        view = memoryview(self._buffer)
+        n = self.file.readinto(view[:span]) or 0
+        return view[start:max(start, min(n, start + length))]
+
+    def close(self):
+        self.file.close()
+        try:
+            self._buffer.close()
+        except BufferError:
+            # A caller still holds a view; the mapping is freed with it
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def prepare_cache(path, cache_mode):
+    """Apply a cache policy before verification, returning the mode in effect"""
+    if cache_mode not in CACHE_MODES:
+        raise ValueError(f"Unknown cache mode: {cache_mode}")
+    if cache_mode == "direct" and hasattr(os, "O_DIRECT"):
+        return "direct"
+    if cache_mode in ("drop", "direct"):
+        return "drop" if drop_page_cache(path) else "none"
+    return "none"
+
+def _timed_read(path, size, chunk_size, direct=False):
+    """Read `size` bytes of `path` and return (MB/s, whether O_DIRECT was used)"""
+    with TargetReader(path, direct=direct, buffer_size=chunk_size) as reader:
+        offset = 0
+        start_time = time.perf_counter()
+        while offset < size:
+            n = len(reader.read_at(offset, min(chunk_size, size - offset)))
+            if not n:
+                break
+            offset += n
+        duration = time.perf_counter() - start_time
+    return ((offset / (1024 * 1024)) / duration if duration > 0 else 0.0), reader.direct
+
+def measure_cache_effect(path, size=None, chunk_size=READ_CHUNK_SIZE):
+    """Compare read throughput served from the page cache with reads from the medium"""
+    if size is None:
+        size = get_target_size(path)
+    
+    # Warm the cache, then time a read that should be served entirely from RAM
+    _timed_read(path, size, chunk_size)
+    cached_mbps, _ = _timed_read(path, size, chunk_size)
+    
+    cache_dropped = drop_page_cache(path)
+    media_mbps, direct = _timed_read(path, size, chunk_size, direct=not cache_dropped)
+    
+    return {
+        "size": size,
+        "cached_mbps": cached_mbps,
+        "media_mbps": media_mbps,
+        "cache_bypassed": cache_dropped or direct,
+        "method": "drop" if cache_dropped else ("direct" if direct else "none"),
+        "cache_speedup": cached_mbps / media_mbps if media_mbps > 0 else 0.0
+    }
+
+def buffers_equal(actual, expected):
+    """Fast equality of two buffers (memoryview comparison is per element)"""
+    if HAS_NUMPY:
+        import numpy as np
+        return np.array_equal(np.frombuffer(actual, dtype=np.uint8), np.frombuffer(expected, dtype=np.uint8))
+    return bytes(actual) == expected
+
+def find_mismatch_ranges(actual, expected, base_offset=0):
+    """Return [start, end) byte ranges where two equal-length buffers differ"""
+    if HAS_NUMPY:
+        import numpy as np
+        diff = np.frombuffer(actual, dtype=np.uint8) != np.frombuffer(expected, dtype=np.uint8)
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], diff, [False])).view(np.int8)))
+        return [[base_offset + int(s), base_offset + int(e)] for s, e in zip(edges[::2], edges[1::2])]
+
+    # Without NumPy, narrow differences down to sector granularity
+    ranges = []
+    view_a, view_e = memoryview(actual), memoryview(expected)
+    for start in range(0, len(view_a), SECTOR_SIZE):
+        end = min(start + SECTOR_SIZE, len(view_a))
+        if view_a[start:end] != view_e[start:end]:
+            if ranges and ranges[-1][1] == base_offset + start:
+                ranges[-1][1] = base_offset + end
+            else:
+                ranges.append([base_offset + start, base_offset + end])
+    return ranges
+
+class ReadbackTally:
+    """Running totals for a read-back comparison"""
+
+    def __init__(self, statistics=True, region_size=REGION_SIZE):
+        self.ranges = []
+        self.mismatched_bytes = 0
+        self.bytes_checked = 0
+        self.stats = RegionStatistics(region_size) if statistics else None
+
+    def add_mismatch(self, start, end):
+        """Record a mismatching [start, end) range, merging with the previous one"""
+        self.mismatched_bytes += end - start
+        if self.ranges and self.ranges[-1][1] == start:
+            self.ranges[-1][1] = end
+        else:
+            self.ranges.append([start, end])
+
+class ReadbackVerifier:
+    """Streams a whole target and checks it against the expected final pass"""
+
+    def __init__(self, chunk_size=READ_CHUNK_SIZE, max_ranges=1000, cache_mode="drop",
+                 statistics=True, region_size=REGION_SIZE):
+        self.chunk_size = chunk_size
+        self.max_ranges = max_ranges
+        self.cache_mode = cache_mode
+        self.statistics = statistics
+        self.region_size = region_size
+        # Optional LatencyHistogram recording each read call
+        self.latency = None
+
+    def new_tally(self):
+        return ReadbackTally(self.statistics, self.region_size)
+
+    def check_range(self, reader, expected, start, end, tally, stop_flag=None):
+        """Compare bytes [start, end) of an open target, adding to `tally`"""
+        offset = start
+        latency = self.latency
+        while offset < end:
+            if stop_flag is not None and stop_flag.is_set():
+                break
+
+            if latency is None:
+                actual = reader.read_at(offset, min(self.chunk_size, end - offset))
+            else:
+                read_started = time.perf_counter_ns()
+                actual = reader.read_at(offset, min(self.chunk_size, end - offset))
+                latency.record(time.perf_counter_ns() - read_started)
+            n = len(actual)
+            if not n:
+                break
+
+            if tally.stats is not None:
+                tally.stats.update(offset, actual)
+            wanted = expected.read(offset, n)
+            if not buffers_equal(actual, wanted):
+                for mismatch_start, mismatch_end in find_mismatch_ranges(actual, wanted, offset):
+                    tally.add_mismatch(mismatch_start, mismatch_end)
+
+            offset += n
+        tally.bytes_checked += offset - start
+
+        # A short read means the tail of the range was never checked
+        if offset < end:
+            tally.add_mismatch(offset, end)
+        return offset
+
+    def report(self, tally, expected, size, cache_mode, duration, mode="full"):
+        """Build a verification report from a finished tally"""
+        return {
+            "verified": tally.mismatched_bytes == 0 and tally.bytes_checked == size,
+            "mode": mode,
+            "cache_mode": cache_mode,
+            "expected": expected.describe(),
+            "size": size,
+            "bytes_checked": tally.bytes_checked,
+            "mismatched_bytes": tally.mismatched_bytes,
+            "mismatch_ranges": tally.ranges[:self.max_ranges],
+            "ranges_truncated": len(tally.ranges) > self.max_ranges,
+            "duration": duration,
+            "throughput_mbps": (tally.bytes_checked / (1024 * 1024)) / duration if duration > 0 else 0.0,
+            "statistics": tally.stats.results() if tally.stats is not None else None
+        }
+
+    def verify(self, path, expected, size=None, stop_flag=None):
+        """Compare `path` with `expected` and return a verification report"""
+        if size is None:
+            size = get_target_size(path)
+
+        tally = self.new_tally()
+        cache_mode = prepare_cache(path, self.cache_mode)
+        start_time = time.perf_counter()
+
+        with TargetReader(path, direct=cache_mode == "direct", buffer_size=self.chunk_size) as reader:
+            self.check_range(reader, expected, 0, size, tally, stop_flag)
+
+        if cache_mode == "direct":
+            cache_mode = reader.cache_mode
+        return self.report(tally, expected, size, cache_mode, time.perf_counter() - start_time)
+
+class VerifyBehindWorker(threading.Thread):
+    """Checks durable windows of the final pass while the writer carries on
+    
+    The writer fsyncs each window and hands it over with submit(); this
+    thread evicts the window from the page cache and reads it back, so a
+    failing medium is noticed long before the pass completes.
+    """
+
+    def __init__(self, path, expected, size, verifier=None, max_pending=4, stop_flag=None):
+        super().__init__(name="verify-behind", daemon=True)
+        self.path = path
+        self.expected = expected.copy()
+        self.size = size
+        self.verifier = verifier or ReadbackVerifier()
+        self.stop_flag = stop_flag
+        self.failed = threading.Event()
+        self.first_mismatch = None
+        self.windows_checked = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._tally = self.verifier.new_tally()
+        self._busy_time = 0.0
+        self.cache_mode = self.verifier.cache_mode
+
+    def submit(self, start, end):
+        """Queue a durable window; blocks when verification falls behind"""
+        self._put((start, end))
+
+    def _put(self, item):
+        # Never block forever on a worker that has already died
+        while True:
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                if not self.is_alive():
+                    return
+
+    def run(self):
+        direct = self.cache_mode == "direct" and hasattr(os, "O_DIRECT")
+        if self.cache_mode == "direct" and not direct:
+            self.cache_mode = "drop"
+        try:
+            with TargetReader(self.path, direct=direct, buffer_size=self.verifier.chunk_size) as reader:
+                if direct and not reader.direct:
+                    self.cache_mode = "drop"
+                while True:
+                    window = self._queue.get()
+                    if window is None:
+                        break
+                    start, end = window
+                    window_start_time = time.perf_counter()
+                    if self.cache_mode == "drop" and not drop_page_cache(self.path, start, end - start):
+                        self.cache_mode = "none"
+                    self.verifier.check_range(reader, self.expected, start, end,
+                                              self._tally, self.stop_flag)
+                    self.windows_checked += 1
+                    self._busy_time += time.perf_counter() - window_start_time
+                    if self._tally.ranges and self.first_mismatch is None:
+                        self.first_mismatch = self._tally.ranges[0][0]
+                        self.failed.set()
+        except Exception as e:
+            self.error = str(e)
+            self.failed.set()
+
+    def stop(self):
+        """Abandon verification after a failed write and wait for the thread to exit"""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._put(None)
+        self.join()
+
+    def finish(self):
+        """Wait for queued windows and return the verification report"""
+        self._put(None)
+        self.join()
+        report = self.verifier.report(self._tally, self.expected, self.size, self.cache_mode,
+                                      self._busy_time, mode="pipelined")
+        report["windows_checked"] = self.windows_checked
+        report["first_mismatch_offset"] = self.first_mismatch
+        if self.error:
+            report["verified"] = False
+            report["error"] = self.error
+        return report
+
+class SamplingVerifier:
+    """Checks a random sample of sectors spread across the target
+    
+    The target is split into equal strata and one sector is drawn from each,
+    so samples never overlap and cover the whole address range. The offsets
+    are derived from a recorded seed and can be regenerated by an auditor.
+    """
+
+    def __init__(self, percent=1.0, sector_size=SAMPLE_SECTOR_SIZE, workers=8,
+                 max_recorded=MAX_RECORDED_OFFSETS, cache_mode="drop", region_size=REGION_SIZE):
+        if not 0 < percent <= 100:
+            raise ValueError("Sample percentage must be in (0, 100]")
+        self.percent = percent
+        self.sector_size = sector_size
+        self.workers = workers
+        self.max_recorded = max_recorded
+        self.cache_mode = cache_mode
+        self.region_size = region_size
+
+    def sample_offsets(self, size, seed):
+        """Return the sorted byte offsets sampled for a target of `size` bytes"""
+        total_sectors = -(-size // self.sector_size)
+        if total_sectors == 0:
+            return []
+        count = min(total_sectors, max(1, round(total_sectors * self.percent / 100)))
+        
+        rng = random.Random(seed)
+        stride = total_sectors / count
+        offsets = []
+        for i in range(count):
+            low = int(i * stride)
+            high = max(low + 1, int((i + 1) * stride))
+            offsets.append(rng.randrange(low, high) * self.sector_size)
+        return offsets
+
+    def _check_batch(self, path, offsets, size, expected, stop_flag, direct):
+        """Read and compare one contiguous batch of sample offsets"""
+        failed = []
+        checked = 0
+        stats = RegionStatistics(self.region_size)
+        with TargetReader(path, direct=direct, buffer_size=self.sector_size) as reader:
+            for offset in offsets:
+                if stop_flag is not None and stop_flag.is_set():
+                    break
+                length = min(self.sector_size, size - offset)
+                data = reader.read_at(offset, length)
+                stats.update(offset, data)
+                if not buffers_equal(data, expected.read(offset, length)):
+                    failed.append(offset)
+                checked += len(data)
+        return failed, checked, stats, reader.cache_mode
+
+    def verify(self, path, expected, size=None, seed=None, stop_flag=None):
+        """Verify a sample of `path` against `expected` and return a report"""
+        if size is None:
+            size = get_target_size(path)
+        if seed is None:
+            seed = os.urandom(16).hex()
+
+        offsets = self.sample_offsets(size, seed)
+        cache_mode = prepare_cache(path, self.cache_mode)
+        start_time = time.perf_counter()
+
+        # Each worker gets a contiguous run of offsets so its reads stay ordered.
+        # Keystreams cache their current block, so every batch gets its own copy.
+        workers = max(1, min(self.workers, len(offsets)))
+        batch_len = -(-len(offsets) // workers) if offsets else 0
+        batches = [offsets[i:i + batch_len] for i in range(0, len(offsets), batch_len)] if offsets else []
+
+        failed = []
+        bytes_checked = 0
+        stats = RegionStatistics(self.region_size)
+        reader_modes = set()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._check_batch, path, batch, size,
+                                   expected.copy(), stop_flag, cache_mode == "direct")
+                       for batch in batches]
+            for future in futures:
+                batch_failed, batch_checked, batch_stats, batch_mode = future.result()
+                reader_modes.add(batch_mode)
+                failed.extend(batch_failed)
+                bytes_checked += batch_checked
+                # Batches are in offset order, but a region can straddle two of them
+                stats.merge(batch_stats)
+
+        duration = time.perf_counter() - start_time
+        if cache_mode == "direct" and reader_modes - {"direct"}:
+            # Report the weakest policy any batch's reads got
+            cache_mode = "none" if "none" in reader_modes else "drop"
+        recorded = len(offsets) <= self.max_recorded
+        complete = bytes_checked == sum(min(self.sector_size, size - o) for o in offsets)
+
+        return {
+            "verified": complete and not failed,
+            "mode": "sample",
+            "cache_mode": cache_mode,
+            "expected": expected.describe(),
+            "size": size,
+            "percent": self.percent,
+            "sector_size": self.sector_size,
+            "sample_seed": seed,
+            "sample_count": len(offsets),
+            "sample_offsets": offsets if recorded else None,
+            "failed_offsets": failed[:self.max_recorded],
+            "failed_count": len(failed),
+            "bytes_checked": bytes_checked,
+            "duration": duration,
+            "throughput_mbps": (bytes_checked / (1024 * 1024)) / duration if duration > 0 else 0.0,
+            "statistics": stats.results()
+        }
+
+def scan_statistics(path, size=None, chunk_size=READ_CHUNK_SIZE, cache_mode="drop",
+                    region_size=REGION_SIZE, stop_flag=None):
+    """Stream a target through the randomness statistics when its final pass is unknown"""
+    if size is None:
+        size = get_target_size(path)
+
+    stats = RegionStatistics(region_size)
+    bytes_checked = 0
+    cache_mode = prepare_cache(path, cache_mode)
+    start_time = time.perf_counter()
+
+    with TargetReader(path, direct=cache_mode == "direct", buffer_size=chunk_size) as reader:
+        while bytes_checked < size:
+            if stop_flag is not None and stop_flag.is_set():
+                break
+            data = reader.read_at(bytes_checked, min(chunk_size, size - bytes_checked))
+            if not len(data):
+                break
+            stats.update(bytes_checked, data)
+            bytes_checked += len(data)
+
+    if cache_mode == "direct":
+        cache_mode = reader.cache_mode
+    duration = time.perf_counter() - start_time
+    results = stats.results()
+    # Every region must look like a fill pattern or random data
+    wiped = bytes_checked == size and all(
+        region["classification"] in ("uniform", "random") for region in results["regions"])
+
+    return {
+        "verified": wiped,
+        "mode": "statistical",
+        "cache_mode": cache_mode,
+        "size": size,
+        "bytes_checked": bytes_checked,
+        "duration": duration,
+        "throughput_mbps": (bytes_checked / (1024 * 1024)) / duration if duration > 0 else 0.0,
+        "statistics": results
+    }
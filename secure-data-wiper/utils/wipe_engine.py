@@ -4,14 +4,41 @@ Implements DoD 5220.22-M and other secure data wiping standards
 """
 
 import os
+import errno
+import functools
 import random
 import hashlib
 import time
 import json
+import uuid
 from datetime import datetime
 from pathlib import Path
 import threading
 
+try:
+    from utils.keystream import Keystream
+    from utils.verification import (ExpectedContent, ReadbackVerifier, SamplingVerifier,
+                                    VerifyBehindWorker, get_target_size, scan_statistics)
+    from utils.residual_scanner import ResidualScanner
+    from utils.merkle import MERKLE_REGION_SIZE, RegionHasher
+    from utils.stream_hash import BackgroundHasher
+    from utils.latency import LatencyRecorder, TimedSource, TimedWriter
+    from utils.metrics import JobProgress
+    from utils.logger import DEBUG, ERROR, INFO, LEVELS, WARNING, level_number
+except ImportError:
+    from keystream import Keystream
+    from verification import (ExpectedContent, ReadbackVerifier, SamplingVerifier,
+                              VerifyBehindWorker, get_target_size, scan_statistics)
+    from residual_scanner import ResidualScanner
+    from merkle import MERKLE_REGION_SIZE, RegionHasher
+    from stream_hash import BackgroundHasher
+    from latency import LatencyRecorder, TimedSource, TimedWriter
+    from metrics import JobProgress
+    from logger import DEBUG, ERROR, INFO, LEVELS, WARNING, level_number
+
+DEVICE_CHUNK_SIZE = 1024 * 1024  # 1MB writes for whole-device wipes
+VERIFY_WINDOW_SIZE = 64 * 1024 * 1024  # Final-pass window handed to verify-behind
+
 class WipePattern:
     """Define various wipe patterns for secure erasure"""
     
@@ -78,80 +105,326 @@ class WipePattern:
     # Simple 3-pass with random data
     TRIPLE_RANDOM = [None, None, None]
 
+def pattern_name(pattern):
+    """Name of a WipePattern constant, or a description of a custom pattern"""
+    for name, value in vars(WipePattern).items():
+        if not name.startswith("_") and value == pattern:
+            return name
+    return f"CUSTOM_{len(pattern)}_PASS"
+
+def device_model(device_path):
+    """Drive model reported by Linux sysfs for a block device or one of its partitions"""
+    name = os.path.basename(os.path.realpath(device_path))
+    for path in (f"/sys/class/block/{name}/device/model", f"/sys/class/block/{name}/../device/model"):
+        try:
+            with open(path) as f:
+                return f.read().strip() or None
+        except OSError:
+            continue
+    return None
+
+def _mbps(size, seconds):
+    return size / (1024 * 1024) / seconds if seconds > 0 else 0.0
+
+def _profiled(method):
+    """Run a top-level wipe job under the engine's profiler, when one is attached"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.profiler is None or self._in_directory_job:
+            return method(self, *args, **kwargs)
+        result, report = self.profiler.run(method, self, *args, **kwargs)
+        if report is not None:
+            self.wipe_stats["profile_report"] = str(report)
+            self.info("Profile report written to %s", report)
+        return result
+    return wrapper
+
 class SecureWipeEngine:
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, verification_mode="full", sample_percent=1.0,
+                 merkle_hashing=False, stream_hash=None, latency_histograms=False,
+                 console_level=INFO, file_level=INFO):
         self.logger = logger
+        # Messages below these levels are dropped before they are formatted;
+        # per-file messages inside a directory job are logged at DEBUG
+        self._console_level = self._file_level = INFO
+        self.console_level = console_level
+        self.file_level = file_level
         self.stop_flag = threading.Event()
         self.progress = 0
         self.current_status = "Idle"
         self.wipe_stats = {}
+        self.verifier = ReadbackVerifier()
+        self.sampler = SamplingVerifier(percent=sample_percent)
+        self.verification_mode = verification_mode
+        self.verify_window_size = VERIFY_WINDOW_SIZE
+        # Hash the final pass per region into a Merkle tree for later audits
+        self.merkle_hashing = merkle_hashing
+        self.merkle_region_size = MERKLE_REGION_SIZE
+        self.merkle_tree = None
+        # Leaf digests are saved per job so region proofs can be produced after
+        # the wipe; defaults to the logger's log directory
+        self.merkle_leaves_dir = None
+        # Digest ("sha256" or "blake2b") of everything the final pass writes
+        self.stream_hash = stream_hash
+        # Structured job events go to the logger's event stream, if it has one;
+        # job_metadata (e.g. {"device_model": ...}) is added to each job_start
+        self.job_id = None
+        self.job_metadata = {}
+        self._job_started = None
+        self._in_directory_job = False
+        # Per-pass latency histograms of content generation, write, flush
+        # and fsync calls, plus verification reads; off by default
+        self.latency_histograms = latency_histograms
+        self._latency = None
+        # Live counters of the current job, read by a WipeMetrics exporter if one is attached
+        self.metrics = None
+        self.job = None
+        # JobProfiler writing a cProfile (and optional tracemalloc) report per job
+        self.profiler = None
         
-    def log(self, message, level="INFO"):
-        """Log message with timestamp"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] [{level}] {message}"
-        print(log_message)
-        
-        if self.logger:
+    @property
+    def console_level(self):
+        return self._console_level
+    
+    @console_level.setter
+    def console_level(self, level):
+        self._console_level = level_number(level)
+        self._log_threshold = min(self._console_level, self._file_level)
+    
+    @property
+    def file_level(self):
+        return self._file_level
+    
+    @file_level.setter
+    def file_level(self, level):
+        self._file_level = level_number(level)
+        self._log_threshold = min(self._console_level, self._file_level)
+    
+    def log(self, message, level="INFO", *args):
+        """Log message with timestamp; `args` are %-formatted into it only if it is logged"""
+        levelno = LEVELS.get(level, INFO)
+        if levelno >= self._log_threshold:
+            self._emit(levelno, level, message, args)
+    
+    def debug(self, message, *args):
+        if DEBUG >= self._log_threshold:
+            self._emit(DEBUG, "DEBUG", message, args)
+    
+    def info(self, message, *args):
+        if INFO >= self._log_threshold:
+            self._emit(INFO, "INFO", message, args)
+    
+    def warning(self, message, *args):
+        if WARNING >= self._log_threshold:
+            self._emit(WARNING, "WARNING", message, args)
+    
+    def error(self, message, *args):
+        if ERROR >= self._log_threshold:
+            self._emit(ERROR, "ERROR", message, args)
+    
+    def _emit(self, levelno, level, message, args):
+        if args:
+            message = message % args
+        to_console = levelno >= self._console_level
+        to_file = self.logger is not None and levelno >= self._file_level
+        if to_file and getattr(self.logger, "console", False):
+            # The logger's writer thread prints it, off this thread
+            self.logger.log(message, level, echo=to_console)
+            return
+        if to_console:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[{timestamp}] [{level}] {message}")
+        if to_file:
             self.logger.log(message, level)
     
+    def event(self, event_type, **fields):
+        """Record a structured event for the current job"""
+        if event_type == "error" and self.metrics is not None:
+            self.metrics.error(self.job.operation if self.job is not None else "unknown")
+        emit = getattr(self.logger, "event", None)
+        # Files inside a directory job are summarised by the directory's
+        # events; only their errors are recorded individually
+        if emit is not None and (not self._in_directory_job or event_type == "error"):
+            emit(event_type, job=self.job_id, **fields)
+    
+    def _start_job(self, operation, target, pattern, size, **fields):
+        if self._in_directory_job:
+            return
+        # Results of the previous job must not reach this job's certificate
+        self.wipe_stats = {}
+        self.merkle_tree = None
+        self._reset_latency()
+        self.job_id = uuid.uuid4().hex[:12]
+        self.job = JobProgress(self.job_id, operation, target, len(pattern), size)
+        if self.metrics is not None:
+            self.metrics.job_started(self.job)
+        if self.profiler is not None:
+            self.profiler.job_started(self.job)
+        if getattr(self.logger, "event", None) is None:
+            return
+        self._job_started = time.perf_counter()
+        fields.update(self.job_metadata)
+        self.event("job_start", operation=operation, target=str(target), method=pattern_name(pattern),
+                   passes=len(pattern), size=size, **fields)
+    
+    def _end_job(self, status, bytes_written, **fields):
+        if self._in_directory_job:
+            return
+        if self._latency is not None:
+            self.wipe_stats["latency"] = self.latency_summary()
+        if self.metrics is not None and self.job is not None:
+            self.metrics.job_finished(self.job, status)
+        if self.profiler is not None and self.job is not None:
+            self.profiler.job_finished(self.job, status)
+        self.job = None
+        if self._job_started is None:
+            return
+        duration = time.perf_counter() - self._job_started
+        self.event("job_end", status=status, bytes=bytes_written, duration=duration,
+                   mbps=_mbps(bytes_written, duration), **fields)
+        self._job_started = None
+    
+    def _reset_latency(self):
+        """Start fresh histograms for a new job (files in a directory job share the directory's)"""
+        if not self.latency_histograms:
+            self._latency = None
+            self.verifier.latency = None
+            return
+        self._latency = {"passes": {}, "verify": LatencyRecorder()}
+        self.verifier.latency = self._latency["verify"].histogram("read")
+    
+    def _pass_latency(self, pass_num):
+        """Recorder for one pass, or None when histograms are disabled"""
+        if self._latency is None:
+            return None
+        recorder = self._latency["passes"].get(pass_num)
+        if recorder is None:
+            recorder = self._latency["passes"][pass_num] = LatencyRecorder()
+        return recorder
+    
+    def _timed(self, f, expected, pattern_data, recorder):
+        """The file and pass content, wrapped to record call latencies when `recorder` is set"""
+        if recorder is None:
+            return f, expected
+        source = TimedSource(expected, recorder.histogram("rng" if pattern_data is None else "pattern"))
+        return TimedWriter(f, recorder), source
+    
+    def latency_summary(self):
+        """Percentiles (microseconds) per pass and operation for the current job"""
+        if self._latency is None:
+            return None
+        return {
+            "passes": [{"pass_number": pass_num, "operations": recorder.summary()}
+                       for pass_num, recorder in sorted(self._latency["passes"].items())],
+            "verify": self._latency["verify"].summary()
+        }
+    
+    def _pass_started(self, pass_num, passes, pattern_data):
+        if self.profiler is not None:
+            self.profiler.pass_started(self.job, pass_num)
+        self.event("pass_start", pass_number=pass_num, passes=passes,
+                   pattern="random" if pattern_data is None else pattern_data[:3].hex())
+        return time.perf_counter()
+    
+    def _pass_finished(self, pass_num, bytes_written, started, fsync_seconds):
+        duration = time.perf_counter() - started
+        if self.profiler is not None:
+            self.profiler.pass_finished(self.job, pass_num)
+        self.event("pass_end", pass_number=pass_num, bytes=bytes_written, duration=duration,
+                   mbps=_mbps(bytes_written, duration), fsync_seconds=fsync_seconds)
+    
     def generate_random_data(self, size=512):
         """Generate cryptographically secure random data"""
         return os.urandom(size)
     
+    @_profiled
     def wipe_file(self, file_path, pattern=WipePattern.DOD_522022M, verify=True):
         """Securely wipe a single file"""
+        hasher = None
         try:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
             
             file_size = os.path.getsize(file_path)
-            self.log(f"Starting wipe of file: {file_path} (Size: {file_size} bytes)")
+            # Per-file detail is debug output within a directory job
+            log_detail = self.debug if self._in_directory_job else self.info
+            log_detail("Starting wipe of file: %s (Size: %d bytes)", file_path, file_size)
+            self._start_job("file", file_path, pattern, file_size)
+            
+            expected = None
+            total_written = 0
             
             # Open file in binary write mode
             with open(file_path, "r+b") as f:
                 for pass_num, pattern_data in enumerate(pattern, 1):
                     if self.stop_flag.is_set():
-                        self.log("Wipe operation cancelled by user", "WARNING")
+                        self.warning("Wipe operation cancelled by user")
+                        self._end_job("cancelled", total_written)
                         return False
                     
                     self.current_status = f"Pass {pass_num}/{len(pattern)}"
-                    self.log(f"Executing pass {pass_num} of {len(pattern)}")
+                    log_detail("Executing pass %d of %d", pass_num, len(pattern))
+                    pass_started = self._pass_started(pass_num, len(pattern), pattern_data)
+                    job = self.job
+                    job.start_pass(pass_num, file_size)
                     
                     f.seek(0)
                     bytes_written = 0
                     
+                    # Random passes use a seeded keystream so the final pass
+                    # can be regenerated for read-back verification
+                    if pattern_data is None:
+                        expected = ExpectedContent(keystream=Keystream())
+                    else:
+                        expected = ExpectedContent(pattern_data=pattern_data)
+                    hasher = self._final_pass_hasher(pass_num == len(pattern))
+                    recorder = self._pass_latency(pass_num)
+                    out, source = self._timed(f, expected, pattern_data, recorder)
+                    
                     while bytes_written < file_size:
                         if self.stop_flag.is_set():
+                            if hasher:
+                                hasher.stop()
+                            self._end_job("cancelled", total_written + bytes_written)
                             return False
                         
                         # Determine chunk to write
                         chunk_size = min(4096, file_size - bytes_written)
+                        data = source.read(bytes_written, chunk_size)
                         
-                        if pattern_data is None:
-                            # Random data
-                            data = self.generate_random_data(chunk_size)
-                        else:
-                            # Pattern data
-                            data = pattern_data[:chunk_size]
-                        
-                        f.write(data)
+                        out.write(data)
+                        if hasher:
+                            hasher.update(data)
                         bytes_written += chunk_size
+                        job.bytes_written += chunk_size
+                        job.pass_bytes = bytes_written
                         
                         # Update progress
                         total_passes = len(pattern)
                         pass_progress = bytes_written / file_size
                         self.progress = ((pass_num - 1) + pass_progress) / total_passes * 100
                     
-                    f.flush()
+                    out.flush()
+                    fsync_started = time.perf_counter_ns()
                     os.fsync(f.fileno())
+                    fsync_ns = time.perf_counter_ns() - fsync_started
+                    if recorder is not None:
+                        recorder.record("fsync", fsync_ns)
+                    self._pass_finished(pass_num, bytes_written, pass_started, fsync_ns * 1e-9)
+                    total_written += bytes_written
+                    if hasher:
+                        self._record_final_pass_hashes(hasher)
             
             # Verify wipe if requested
             if verify:
-                if self.verify_wipe(file_path):
-                    self.log(f"Wipe verification successful for {file_path}")
+                verify_started = time.perf_counter()
+                verified = self.verify_wipe(file_path, expected)
+                self.event("verify", mode=self.verification_mode, passed=verified,
+                           duration=time.perf_counter() - verify_started)
+                if verified:
+                    log_detail("Wipe verification successful for %s", file_path)
                 else:
-                    self.log(f"Wipe verification failed for {file_path}", "WARNING")
+                    self.warning("Wipe verification failed for %s", file_path)
             
             # Rename file with random name before deletion
             random_name = self.generate_random_filename(file_path)
@@ -160,22 +433,28 @@ class SecureWipeEngine:
             # Delete the file
             os.remove(random_name)
             
-            self.log(f"File successfully wiped and deleted: {file_path}")
+            log_detail("File successfully wiped and deleted: %s", file_path)
+            self._end_job("completed", total_written)
             return True
             
         except Exception as e:
-            self.log(f"Error wiping file {file_path}: {str(e)}", "ERROR")
+            self._stop_helpers(hasher)
+            self.error("Error wiping file %s: %s", file_path, e)
+            self.event("error", target=str(file_path), message=str(e))
+            self._end_job("failed", 0)
             return False
     
+    @_profiled
     def wipe_directory(self, dir_path, pattern=WipePattern.DOD_522022M, recursive=True):
         """Securely wipe all files in a directory"""
         try:
             if not os.path.exists(dir_path):
                 raise FileNotFoundError(f"Directory not found: {dir_path}")
             
-            self.log(f"Starting directory wipe: {dir_path}")
+            self.info("Starting directory wipe: %s", dir_path)
             
             files_wiped = 0
+            bytes_wiped = 0
             files_failed = 0
             
             # Get all files in directory
@@ -187,31 +466,45 @@ class SecureWipeEngine:
             # Filter only files (not directories)
             files = [f for f in files if f.is_file()]
             total_files = len(files)
+            self._start_job("directory", dir_path, pattern, None, files=total_files)
             
-            for idx, file_path in enumerate(files):
-                if self.stop_flag.is_set():
-                    self.log("Directory wipe cancelled by user", "WARNING")
-                    break
-                
-                self.current_status = f"Wiping file {idx + 1}/{total_files}"
-                
-                if self.wipe_file(str(file_path), pattern, verify=False):
-                    files_wiped += 1
-                else:
-                    files_failed += 1
+            self._in_directory_job = True
+            try:
+                for idx, file_path in enumerate(files):
+                    if self.stop_flag.is_set():
+                        self.warning("Directory wipe cancelled by user")
+                        break
+                    
+                    self.current_status = f"Wiping file {idx + 1}/{total_files}"
+                    
+                    try:
+                        file_size = file_path.stat().st_size
+                    except OSError:
+                        file_size = 0
+                    if self.wipe_file(str(file_path), pattern, verify=False):
+                        files_wiped += 1
+                        bytes_wiped += file_size * len(pattern)
+                    else:
+                        files_failed += 1
+            finally:
+                self._in_directory_job = False
             
-            self.log(f"Directory wipe completed. Files wiped: {files_wiped}, Failed: {files_failed}")
+            self.info("Directory wipe completed. Files wiped: %d, Failed: %d", files_wiped, files_failed)
+            self._end_job("cancelled" if self.stop_flag.is_set() else "completed", bytes_wiped,
+                          files_wiped=files_wiped, files_failed=files_failed)
             
             return files_wiped, files_failed
             
         except Exception as e:
-            self.log(f"Error wiping directory {dir_path}: {str(e)}", "ERROR")
+            self.error("Error wiping directory %s: %s", dir_path, e)
+            self.event("error", message=str(e))
+            self._end_job("failed", 0)
             return 0, 0
     
     def wipe_free_space(self, drive_path, pattern=WipePattern.SINGLE_RANDOM):
         """Wipe free space on a drive"""
         try:
-            self.log(f"Starting free space wipe on drive: {drive_path}")
+            self.info("Starting free space wipe on drive: %s", drive_path)
             
             # Create temporary file to fill free space
             temp_file = os.path.join(drive_path, f"WIPE_TEMP_{int(time.time())}.tmp")
@@ -234,7 +527,7 @@ class SecureWipeEngine:
                         
                 except IOError:
                     # Disk full - this is expected
-                    self.log(f"Free space filled: {written / (1024**3):.2f} GB written")
+                    self.info("Free space filled: %.2f GB written", written / (1024**3))
                 
                 f.flush()
                 os.fsync(f.fileno())
@@ -242,11 +535,11 @@ class SecureWipeEngine:
             # Remove temporary file
             os.remove(temp_file)
             
-            self.log("Free space wipe completed")
+            self.info("Free space wipe completed")
             return True
             
         except Exception as e:
-            self.log(f"Error wiping free space: {str(e)}", "ERROR")
+            self.error("Error wiping free space: %s", e)
             # Try to clean up temp file if it exists
             if 'temp_file' in locals() and os.path.exists(temp_file):
                 try:
@@ -255,35 +548,272 @@ class SecureWipeEngine:
                     pass
             return False
     
-    def verify_wipe(self, file_path):
-        """Verify that a file has been properly wiped"""
+    @_profiled
+    def wipe_device(self, device_path, pattern=WipePattern.DOD_522022M, verify=True, pipelined=True):
+        """Overwrite a whole block device or disk image in place
+        
+        With `pipelined`, each durable window of the final pass is verified
+        by a background worker while the next window is written, and the
+        wipe is aborted as soon as a window fails to read back correctly.
+        """
+        worker = None
+        hasher = None
         try:
-            # For MVP, basic verification by checking if file contains only zeros or random patterns
-            # In production, this would be more sophisticated
-            with open(file_path, "rb") as f:
-                # Read first and last portions of file
-                f.seek(0)
-                start_data = f.read(1024)
-                
-                f.seek(-1024, 2)  # Seek to last 1KB
-                end_data = f.read(1024)
-                
-                # Check if data appears random or zeroed
-                # Simple entropy check
-                entropy_start = len(set(start_data)) / len(start_data) if start_data else 0
-                entropy_end = len(set(end_data)) / len(end_data) if end_data else 0
-                
-                # If entropy is very low (all same bytes) or very high (random), consider it wiped
-                if entropy_start < 0.1 or entropy_start > 0.9:
-                    if entropy_end < 0.1 or entropy_end > 0.9:
-                        return True
+            size = get_target_size(device_path)
+            self.info("Starting device wipe: %s (Size: %d bytes)", device_path, size)
+            self._start_job("device", device_path, pattern, size,
+                            device_model=self.job_metadata.get("device_model") or device_model(device_path))
+            start_time = time.time()
+            expected = None
+            total_written = 0
             
+            with open(device_path, "r+b", buffering=0) as f:
+                for pass_num, pattern_data in enumerate(pattern, 1):
+                    if self.stop_flag.is_set():
+                        self.warning("Device wipe cancelled by user")
+                        self._end_job("cancelled", total_written)
+                        return False
+                    
+                    self.current_status = f"Pass {pass_num}/{len(pattern)}"
+                    self.info("Executing pass %d of %d", pass_num, len(pattern))
+                    pass_started = self._pass_started(pass_num, len(pattern), pattern_data)
+                    job = self.job
+                    job.start_pass(pass_num, size)
+                    fsync_ns = 0
+                    
+                    if pattern_data is None:
+                        expected = ExpectedContent(keystream=Keystream())
+                    else:
+                        expected = ExpectedContent(pattern_data=pattern_data)
+                    
+                    final_pass = pass_num == len(pattern)
+                    hasher = self._final_pass_hasher(final_pass)
+                    recorder = self._pass_latency(pass_num)
+                    out, source = self._timed(f, expected, pattern_data, recorder)
+                    if verify and pipelined and final_pass:
+                        worker = VerifyBehindWorker(device_path, expected, size, self.verifier,
+                                                    stop_flag=self.stop_flag)
+                        worker.start()
+                    
+                    f.seek(0)
+                    bytes_written = 0
+                    window_start = 0
+                    while bytes_written < size:
+                        if self.stop_flag.is_set():
+                            if worker:
+                                worker.finish()
+                            if hasher:
+                                hasher.stop()
+                            self._end_job("cancelled", total_written + bytes_written)
+                            return False
+                        
+                        chunk_size = min(DEVICE_CHUNK_SIZE, size - bytes_written)
+                        data = source.read(bytes_written, chunk_size)
+                        written = out.write(data)
+                        if written != chunk_size:
+                            self._write_remaining(out, data, written)
+                        if hasher:
+                            hasher.update(data)
+                        bytes_written += chunk_size
+                        job.bytes_written += chunk_size
+                        job.pass_bytes = bytes_written
+                        
+                        if worker and (bytes_written - window_start >= self.verify_window_size or bytes_written == size):
+                            # Only durable data is handed to the verifier
+                            fsync_started = time.perf_counter_ns()
+                            os.fsync(f.fileno())
+                            elapsed = time.perf_counter_ns() - fsync_started
+                            fsync_ns += elapsed
+                            if recorder is not None:
+                                recorder.record("fsync", elapsed)
+                            worker.submit(window_start, bytes_written)
+                            window_start = bytes_written
+                            
+                            if worker.failed.is_set():
+                                report = worker.finish()
+                                if hasher:
+                                    hasher.stop()
+                                self.wipe_stats["verification"] = report
+                                if report["first_mismatch_offset"] is not None:
+                                    self.error("Read-back mismatch at offset %d on %s, aborting wipe",
+                                               report["first_mismatch_offset"], device_path)
+                                else:
+                                    # The worker died before comparing anything
+                                    self.error("Read-back verification of %s failed: %s, aborting wipe",
+                                               device_path, report.get("error"))
+                                self.event("verify", mode="pipelined", passed=False,
+                                           first_mismatch_offset=report["first_mismatch_offset"])
+                                self._end_job("failed", total_written + bytes_written)
+                                return False
+                        
+                        self.progress = ((pass_num - 1) + bytes_written / size) / len(pattern) * 100
+                    
+                    fsync_started = time.perf_counter_ns()
+                    os.fsync(f.fileno())
+                    elapsed = time.perf_counter_ns() - fsync_started
+                    fsync_ns += elapsed
+                    if recorder is not None:
+                        recorder.record("fsync", elapsed)
+                    self._pass_finished(pass_num, bytes_written, pass_started, fsync_ns * 1e-9)
+                    total_written += bytes_written
+                    if hasher:
+                        self._record_final_pass_hashes(hasher)
+            
+            verified = None
+            verify_started = time.perf_counter()
+            if worker:
+                self.wipe_stats["verification"] = worker.finish()
+                verified = self.wipe_stats["verification"]["verified"]
+            elif verify:
+                verified = self.verify_wipe(device_path, expected)
+            if verified is not None:
+                self.event("verify", mode="pipelined" if worker else self.verification_mode, passed=verified,
+                           duration=time.perf_counter() - verify_started)
+            
+            self.wipe_stats.update({
+                "target_path": device_path,
+                "bytes_wiped": size * len(pattern),
+                "passes_completed": len(pattern),
+                "duration": time.time() - start_time
+            })
+            
+            if verified is False:
+                self.warning("Device wipe verification failed for %s", device_path)
+                self._end_job("failed", total_written)
+                return False
+            self.info("Device wipe completed: %s", device_path)
+            self._end_job("completed", total_written)
+            return True
+            
+        except Exception as e:
+            self._stop_helpers(worker, hasher)
+            self.error("Error wiping device %s: %s", device_path, e)
+            self.event("error", message=str(e))
+            self._end_job("failed", 0)
             return False
+    
+    @staticmethod
+    def _write_remaining(out, data, written):
+        """Finish a short write to an unbuffered device, which may accept part of a chunk"""
+        view = memoryview(data)
+        written = written or 0
+        while written < len(view):
+            n = out.write(view[written:])
+            if not n:
+                raise OSError(errno.EIO, f"Write stalled after {written} of {len(view)} bytes")
+            written += n
+    
+    @staticmethod
+    def _stop_helpers(*helpers):
+        """Stop the verify-behind and hashing threads of a job that failed mid-pass"""
+        for helper in helpers:
+            if helper is not None and helper.is_alive():
+                try:
+                    helper.stop()
+                except Exception:
+                    pass
+    
+    def _final_pass_hasher(self, final_pass):
+        """Helper-thread hasher for the final pass, if stream or Merkle hashing is enabled"""
+        # One root cannot cover the files of a directory job, so its files get no tree
+        merkle_hashing = self.merkle_hashing and not self._in_directory_job
+        if not final_pass or not (self.stream_hash or merkle_hashing):
+            return None
+        region_hasher = RegionHasher(self.merkle_region_size) if merkle_hashing else None
+        hasher = BackgroundHasher(self.stream_hash, region_hasher)
+        hasher.start()
+        return hasher
+    
+    def _record_final_pass_hashes(self, hasher):
+        """Record the final pass digest and Merkle root in the wipe stats"""
+        write_hash = hasher.finish()
+        if write_hash:
+            self.wipe_stats["write_hash"] = write_hash
+            self.info("Final pass %s: %s", write_hash["algorithm"], write_hash["digest"])
+        if hasher.region_hasher is not None:
+            self.merkle_tree = hasher.region_hasher.finish()
+            summary = self.merkle_tree.summary()
+            summary.update(self._save_merkle_leaves())
+            self.wipe_stats["merkle"] = summary
+            self.info("Final pass Merkle root over %d regions: %s", summary["leaf_count"], summary["root"])
+    
+    def _save_merkle_leaves(self):
+        """Write the job's leaf digests to disk; returns their path and digest for the Merkle block"""
+        leaves_dir = Path(self.merkle_leaves_dir or getattr(self.logger, "log_dir", None) or "logs")
+        path = leaves_dir / f"merkle_{self.job_id}.leaves"
+        try:
+            leaves_dir.mkdir(parents=True, exist_ok=True)
+            self.merkle_tree.save_leaves(path)
+        except OSError as e:
+            self.error("Could not save Merkle leaves to %s: %s", path, e)
+            return {}
+        return {
+            "leaves_file": str(path.resolve()),
+            "leaves_sha256": hashlib.sha256(b"".join(self.merkle_tree.leaves)).hexdigest()
+        }
+    
+    def verify_wipe(self, file_path, expected=None):
+        """Verify that a file has been properly wiped
+        
+        When the content of the final pass is known, the file is read back
+        (fully, or a random sample of sectors when `verification_mode` is
+        "sample") and compared with it; otherwise the whole file is run
+        through the byte statistics.
+        """
+        try:
+            if expected is not None and self.verification_mode == "sample":
+                result = self.sampler.verify(file_path, expected, stop_flag=self.stop_flag)
+                self.wipe_stats["verification"] = result
+                if not result["verified"]:
+                    self.warning("Sample verification failed for %s: %d of %d sampled sectors differ",
+                                 file_path, result["failed_count"], result["sample_count"])
+                return result["verified"]
+            
+            if expected is not None:
+                result = self.verifier.verify(file_path, expected, stop_flag=self.stop_flag)
+                self.wipe_stats["verification"] = result
+                if not result["verified"]:
+                    self.warning("Read-back mismatch in %s: %d bytes in %d range(s)",
+                                 file_path, result["mismatched_bytes"], len(result["mismatch_ranges"]))
+                return result["verified"]
+            
+            # Final pass unknown: every region must look like a fill pattern or random data
+            result = scan_statistics(file_path, stop_flag=self.stop_flag)
+            self.wipe_stats["verification"] = result
+            return result["verified"]
             
         except Exception as e:
-            self.log(f"Error verifying wipe: {str(e)}", "ERROR")
+            self.error("Error verifying wipe: %s", e)
             return False
     
+    def scan_residual_data(self, target_path, canaries=(), workers=None, random_fill=True):
+        """Search a wiped device or image for file, filesystem and canary signatures
+        
+        `random_fill` says the final pass was random, so chance matches of
+        short signatures are expected and only an excess counts as residual.
+        """
+        try:
+            self.info("Scanning %s for residual data", target_path)
+            self.current_status = "Scanning for residual data"
+            scanner = ResidualScanner(canaries=canaries, workers=workers)
+            report = scanner.scan(target_path, stop_flag=self.stop_flag, random_fill=random_fill)
+            self.wipe_stats["residual_scan"] = report
+            
+            if report["residual"]:
+                self.warning("Residual scan found data on %s: %s",
+                             target_path, ", ".join(sorted(report["residual_hits"])))
+            elif report["hit_count"]:
+                self.info("Residual scan clean: %d signature hit(s), within chance for random data",
+                          report["hit_count"])
+            else:
+                self.info("Residual scan clean: %d bytes, %.1f MB/s",
+                          report["bytes_scanned"], report["throughput_mbps"])
+            return report
+            
+        except Exception as e:
+            self.error("Error scanning for residual data: %s", e)
+            return None
+    
     def generate_random_filename(self, original_path):
         """Generate a random filename for secure deletion"""
         directory = os.path.dirname(original_path)
@@ -303,7 +833,7 @@ class SecureWipeEngine:
     def stop_wipe(self):
         """Stop ongoing wipe operation"""
         self.stop_flag.set()
-        self.log("Stop signal sent to wipe engine")
+        self.info("Stop signal sent to wipe engine")
     
     def reset(self):
         """Reset wipe engine state"""
@@ -0,0 +1,115 @@
+"""
+Wipe Events Module
+Reads the JSON Lines event stream written by SecureWipeLogger and aggregates throughput
+
+    python -m utils.wipe_events logs/ --by device_model,method,pass_number
+    python -m utils.wipe_events logs/events_20250101.jsonl --level job --by method --json
+"""
+
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+
+try:
+    from utils.logger import log_segment_key
+except ImportError:
+    from logger import log_segment_key
+
+# Fields of a job's job_start event copied onto each of its pass_end / job_end events
+JOB_FIELDS = ("operation", "target", "method", "passes", "size", "device_model")
+
+def read_events(sources):
+    """Events from .jsonl(.gz) files and from the event files in directories, oldest first"""
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            paths = sorted((path for path in source.glob("events_*.jsonl*") if path.suffix in (".jsonl", ".gz")),
+                           key=log_segment_key)
+        else:
+            paths = [source]
+        for path in paths:
+            with (gzip.open(path, "rt") if path.suffix == ".gz" else open(path, "r")) as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line of a log still being written
+
+def throughput(events, group_by=("device_model", "method", "pass_number"), level="pass", **filters):
+    """Aggregate pass_end (level "pass") or job_end (level "job") events
+
+    Each event is joined with its job's job_start, so any job field can be
+    grouped or filtered on. Returns one row per group with the event count,
+    total bytes and seconds, aggregate MB/s (total bytes over total time)
+    and the slowest and fastest individual MB/s.
+    """
+    wanted = "pass_end" if level == "pass" else "job_end"
+    jobs = {}
+    groups = {}
+    for event in events:
+        kind = event.get("event")
+        if kind == "job_start":
+            jobs[event.get("job")] = {field: event.get(field) for field in JOB_FIELDS}
+            continue
+        if kind != wanted:
+            continue
+        record = dict(jobs.get(event.get("job"), {}))
+        record.update(event)
+        if any(record.get(field) != value for field, value in filters.items() if value is not None):
+            continue
+
+        key = tuple(record.get(field) for field in group_by)
+        group = groups.setdefault(key, {"count": 0, "bytes": 0, "seconds": 0.0, "fsync_seconds": 0.0,
+                                        "min_mbps": None, "max_mbps": None})
+        group["count"] += 1
+        group["bytes"] += record.get("bytes") or 0
+        group["seconds"] += record.get("duration") or 0.0
+        group["fsync_seconds"] += record.get("fsync_seconds") or 0.0
+        mbps = record.get("mbps")
+        if mbps is not None:
+            group["min_mbps"] = mbps if group["min_mbps"] is None else min(group["min_mbps"], mbps)
+            group["max_mbps"] = mbps if group["max_mbps"] is None else max(group["max_mbps"], mbps)
+
+    rows = []
+    for key, group in sorted(groups.items(), key=lambda item: [str(part) for part in item[0]]):
+        row = dict(zip(group_by, key))
+        row.update(group)
+        row["mbps"] = group["bytes"] / (1024 * 1024) / group["seconds"] if group["seconds"] > 0 else 0.0
+        rows.append(row)
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate wipe throughput from event logs")
+    parser.add_argument("sources", nargs="+", help="Event files, or log directories holding events_*.jsonl")
+    parser.add_argument("--by", default="device_model,method,pass_number",
+                        help="Comma-separated fields to group by (default: device_model,method,pass_number)")
+    parser.add_argument("--level", choices=("pass", "job"), default="pass",
+                        help="Aggregate individual passes or whole jobs (default: pass)")
+    parser.add_argument("--operation", help="Only jobs of this kind (file, directory, device)")
+    parser.add_argument("--method", help="Only jobs using this wipe method")
+    parser.add_argument("--json", action="store_true", help="Print the rows as JSON")
+    args = parser.parse_args(argv)
+
+    group_by = tuple(field for field in args.by.split(",") if field)
+    rows = throughput(read_events(args.sources), group_by, args.level,
+                      operation=args.operation, method=args.method)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    header = list(group_by) + ["count", "GB", "MB/s", "min MB/s", "max MB/s", "fsync s"]
+    table = [[str(row[field]) for field in group_by] +
+             [str(row["count"]), f"{row['bytes'] / 1024 ** 3:.2f}", f"{row['mbps']:.1f}",
+              "-" if row["min_mbps"] is None else f"{row['min_mbps']:.1f}",
+              "-" if row["max_mbps"] is None else f"{row['max_mbps']:.1f}",
+              f"{row['fsync_seconds']:.2f}"]
+             for row in rows]
+    widths = [max(len(line[i]) for line in [header] + table) for i in range(len(header))]
+    for line in [header] + table:
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())